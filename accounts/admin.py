@@ -1,8 +1,9 @@
 from django.contrib import admin
+from django.utils import timezone
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
 from .forms import UserChangeForm, UserCreationForm
-from .models import User
+from .models import QueuedEmail, User
 
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
@@ -12,7 +13,7 @@ class UserAdmin(BaseUserAdmin):
     list_display = ('email', 'display_name', 'is_staff', 'is_superuser', 'is_active')
     list_filter = ('is_staff', 'is_superuser', 'is_active', 'groups')
     fieldsets = (
-        (None, {'fields': ('email', 'password')}),
+        (None, {'fields': ('email', 'phone', 'password')}),
         ('Personal info', {'fields': ('display_name', 'public_slug')}),
         ('Permissions', {'fields': ('is_active', 'is_staff', 'is_superuser', 'groups', 'user_permissions')}),
         ('Important dates', {'fields': ('last_login', 'date_joined')}),
@@ -20,9 +21,27 @@ class UserAdmin(BaseUserAdmin):
     add_fieldsets = (
         (None, {
             'classes': ('wide',),
-            'fields': ('email', 'display_name', 'password1', 'password2', 'is_staff', 'is_active')
+            'fields': ('email', 'phone', 'display_name', 'password1', 'password2', 'is_staff', 'is_active')
         }),
     )
 
     search_fields = ('email', 'display_name', 'public_slug')
     ordering = ('email',)
+
+
+@admin.register(QueuedEmail)
+class QueuedEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to', 'status', 'attempts', 'next_attempt_at', 'created_at')
+    list_filter = ('status',)
+    # El cuerpo puede llevar un enlace de un solo uso (recuperar contraseña):
+    # no se muestra ni se edita; solo se reintenta con la acción
+    fields = ('subject', 'from_email', 'to', 'cc', 'bcc', 'status', 'attempts', 'next_attempt_at', 'last_error', 'created_at')
+    readonly_fields = fields
+    actions = ['retry']
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description='Reintentar ahora')
+    def retry(self, request, queryset):
+        queryset.update(status=QueuedEmail.Status.QUEUED, attempts=0, next_attempt_at=timezone.now())
@@ -1,30 +1,54 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from django.db.models import Q
+
+from bank_details.models import normalize_phone_number
 
 User = get_user_model()
 
 
 class EmailOrPhoneBackend(ModelBackend):
     """
-    Backend de autenticación personalizado que permite login con email o teléfono
+    Backend de autenticación personalizado que permite login con email o teléfono.
+
+    Es el único de AUTHENTICATION_BACKENDS: busca al usuario con una sola
+    consulta por índice único y corre el hasher exactamente una vez por
+    intento, exista o no la cuenta (con ModelBackend detrás, un intento
+    fallido hasheaba dos veces).
     """
     def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
         if username is None or password is None:
             return None
-        
-        try:
-            # Intentar buscar por email primero
-            if '@' in username:
-                user = User.objects.get(email=username)
-            else:
-                # Si no tiene @, asumir que es teléfono
-                user = User.objects.get(phone=username)
-        except User.DoesNotExist:
+
+        user = self._find_user(username.strip())
+        if user is None:
             # Ejecutar el hasher de contraseña por defecto para evitar timing attacks
             User().set_password(password)
             return None
-        
+
         if user.check_password(password) and self.user_can_authenticate(user):
             return user
-        
+
         return None
+
+    @staticmethod
+    def _find_user(username: str):
+        phone = None
+        if '@' in username:
+            query = Q(email=User.objects.normalize_email(username))
+        else:
+            # Si no tiene @, asumir que es teléfono. Se busca con el mismo
+            # criterio que validate_phone_number: 9981234567 y +52 998 123 4567
+            # son la misma cuenta, se haya guardado como se haya guardado
+            phone = normalize_phone_number(username)
+            if phone is None:
+                return None
+            query = Q(phone__in={phone, phone[3:], username})
+
+        users = list(User.objects.filter(query)[:2])
+        if len(users) > 1:
+            # Cuentas de antes de normalizar con el mismo número: gana la forma +52
+            users.sort(key=lambda user: user.phone != phone)
+        return users[0] if users else None
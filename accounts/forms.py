@@ -1,11 +1,32 @@
 from django import forms
 from django.contrib.auth.forms import ReadOnlyPasswordHashField, PasswordResetForm as DjangoPasswordResetForm
+from django.db import IntegrityError
+
+from bank_details.models import normalize_phone_number
+from .models import User, unique_violation_field
+
+# Errores para las restricciones únicas que puede violar un registro
+UNIQUE_ERRORS = {
+    "email": "Este email ya está registrado.",
+    "phone": "Este teléfono ya está registrado.",
+    "public_slug": "No pudimos asignarte un enlace público. Intenta de nuevo.",
+}
+
+def _clean_phone(phone):
+    """Teléfono normalizado a +52XXXXXXXXXX, o None si viene vacío."""
+    if not phone:
+        return None
+    normalized = normalize_phone_number(phone)
+    if normalized is None:
+        raise forms.ValidationError("Formato: +52XXXXXXXXXX o XXXXXXXXXX")
+    return normalized
 
-from .models import User
 
 class UserCreationForm(forms.ModelForm):
     """
-    Formulario de registro personalizado que permite registrarse con email O teléfono
+    Formulario de registro personalizado que permite registrarse con email O teléfono.
+    Es también el add_form del admin, así que valida los campos únicos como
+    cualquier ModelForm; el registro público usa SignupForm.
     """
     email = forms.EmailField(
         label='Email',
@@ -74,24 +95,16 @@ class UserCreationForm(forms.ModelForm):
         return cleaned_data
 
     def clean_email(self):
-        """Validar que el email no exista si se proporciona"""
+        """Email normalizado, o None."""
         email = self.cleaned_data.get('email')
         # Si está vacío, retornar None
         if not email or email == "":
             return None
-        if User.objects.filter(email=email).exists():
-            raise forms.ValidationError("Este email ya está registrado.")
-        return email
+        return User.objects.normalize_email(email)
     
     def clean_phone(self):
-        """Validar que el teléfono no exista si se proporciona"""
-        phone = self.cleaned_data.get('phone')
-        # Si está vacío, retornar None
-        if not phone or phone == "":
-            return None
-        if User.objects.filter(phone=phone).exists():
-            raise forms.ValidationError("Este teléfono ya está registrado.")
-        return phone
+        """Teléfono normalizado a +52XXXXXXXXXX, o None."""
+        return _clean_phone(self.cleaned_data.get('phone'))
 
     def clean_password2(self):
         """Verificar que las dos contraseñas coincidan"""
@@ -102,14 +115,36 @@ class UserCreationForm(forms.ModelForm):
         return p2
 
     def save(self, commit=True):
-        """Guardar el usuario con la contraseña hasheada"""
+        """
+        Guardar el usuario con la contraseña hasheada. Con commit, si el
+        email o el teléfono ya están registrados agrega el error al campo y
+        regresa None.
+        """
         user = super().save(commit=False)
         user.set_password(self.cleaned_data["password1"])
         if commit:
-            user.save()
+            try:
+                user.save()
+            except IntegrityError as e:
+                field = unique_violation_field(e)
+                if field not in UNIQUE_ERRORS:
+                    raise
+                self.add_error(field if field in self.fields else None, UNIQUE_ERRORS[field])
+                return None
         return user
 
 
+class SignupForm(UserCreationForm):
+    """
+    Registro público (SignupView): sin un exists() por campo único. save()
+    intenta el INSERT y traduce el IntegrityError a un error del campo, sin
+    carreras entre dos registros. Solo sirve con save(commit=True).
+    """
+
+    def validate_unique(self):
+        pass
+
+
 class CustomPasswordResetForm(DjangoPasswordResetForm):
     """
     Formulario personalizado para reset de contraseña que soporta
@@ -154,6 +189,10 @@ class UserChangeForm(forms.ModelForm):
                 'user_permissions',
                 )
 
+    def clean_phone(self):
+        """Mismo formato que el registro: +52XXXXXXXXXX, o None (no "")."""
+        return _clean_phone(self.cleaned_data.get('phone'))
+
     def clean_password(self):
         # Keep the existing hash idk why
         return self.initial["password"]
\ No newline at end of file
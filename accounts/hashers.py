@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher as DjangoPBKDF2PasswordHasher
+
+
+class PBKDF2PasswordHasher(DjangoPBKDF2PasswordHasher):
+    """
+    PBKDF2 de Django con iteraciones configurables (PASSWORD_HASH_ITERATIONS;
+    sin definir, las de Django). Mismo algoritmo "pbkdf2_sha256": los hashes
+    existentes siguen sirviendo y se rehacen con el costo nuevo en el
+    siguiente login exitoso.
+    """
+
+    @property
+    def iterations(self):
+        return getattr(settings, "PASSWORD_HASH_ITERATIONS", None) or super().iterations
@@ -0,0 +1,184 @@
+"""
+Outbox de correo. Con EMAIL_BACKEND = "accounts.mail.QueuedEmailBackend",
+send_mail()/EmailMessage.send() solo insertan una fila en QueuedEmail y el
+request sigue sin esperar al servidor SMTP. `manage.py send_queued_mail`
+(send_queued()) las envía por lotes sobre una sola conexión del backend real
+(OUTBOX_EMAIL_BACKEND), con reintentos y backoff exponencial. Los que
+agotan sus reintentos quedan como FAILED hasta que vence
+PASSWORD_RESET_TIMEOUT (purge_failed()): el cuerpo puede llevar un enlace
+de un solo uso.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import QueuedEmail
+
+logger = logging.getLogger(__name__)
+
+# Un envío reclamado por un worker que murió se vuelve a intentar tras esto
+# (como mínimo; ver _lease())
+CLAIM_TIMEOUT = timedelta(minutes=5)
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        rows = []
+        for message in email_messages:
+            if message.attachments:
+                # Ningún correo de la app lleva adjuntos; no se guardan en la cola
+                raise ValueError("QueuedEmailBackend no soporta adjuntos")
+            rows.append(QueuedEmail(
+                subject=message.subject,
+                body=message.body,
+                from_email=message.from_email or settings.DEFAULT_FROM_EMAIL,
+                to=list(message.to),
+                cc=list(message.cc),
+                bcc=list(message.bcc),
+                reply_to=list(message.reply_to),
+                headers=dict(message.extra_headers),
+                alternatives=[[content, mimetype] for content, mimetype in getattr(message, "alternatives", [])],
+            ))
+        try:
+            QueuedEmail.objects.bulk_create(rows)
+        except Exception:
+            if not self.fail_silently:
+                raise
+            return 0
+        return len(rows)
+
+
+def _to_message(row: QueuedEmail, connection) -> EmailMultiAlternatives:
+    return EmailMultiAlternatives(
+        subject=row.subject,
+        body=row.body,
+        from_email=row.from_email,
+        to=row.to,
+        cc=row.cc,
+        bcc=row.bcc,
+        reply_to=row.reply_to,
+        headers=row.headers,
+        alternatives=[tuple(alt) for alt in row.alternatives],
+        connection=connection,
+    )
+
+
+def _per_message() -> float:
+    # Peor caso por correo: abrir la conexión y enviar, EMAIL_TIMEOUT cada uno
+    return 2 * (getattr(settings, "EMAIL_TIMEOUT", None) or 0)
+
+
+def _lease(batch_size: int) -> timedelta:
+    """Cuánto se reserva un lote: el peor caso de enviarlo, nunca menos de CLAIM_TIMEOUT."""
+    return max(CLAIM_TIMEOUT, timedelta(seconds=_per_message() * batch_size))
+
+
+def _claim(batch_size: int, lease: timedelta) -> list[QueuedEmail]:
+    """
+    Reserva hasta `batch_size` correos vencidos corriendo su siguiente
+    intento `lease` hacia adelante, para que otro worker no los tome.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(
+            QueuedEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=QueuedEmail.Status.QUEUED, next_attempt_at__lte=now)
+            .order_by("next_attempt_at")[:batch_size]
+        )
+        if rows:
+            QueuedEmail.objects.filter(pk__in=[row.pk for row in rows]).update(
+                attempts=F("attempts") + 1, next_attempt_at=now + lease,
+            )
+    for row in rows:
+        row.attempts += 1
+    return rows
+
+
+def _failed(row: QueuedEmail, error: Exception) -> None:
+    max_attempts = getattr(settings, "OUTBOX_MAX_ATTEMPTS", 8)
+    backoff = getattr(settings, "OUTBOX_RETRY_BACKOFF", 60)
+    row.last_error = f"{type(error).__name__}: {error}"
+    if row.attempts >= max_attempts:
+        row.status = QueuedEmail.Status.FAILED
+        logger.error("Correo %s descartado tras %s intentos: %s", row.pk, row.attempts, row.last_error)
+    else:
+        # 1, 2, 4, 8... veces OUTBOX_RETRY_BACKOFF, máximo una hora
+        delay = min(backoff * 2 ** (row.attempts - 1), 60 * 60)
+        row.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+    row.save(update_fields=["status", "last_error", "next_attempt_at"])
+
+
+def _release(rows: list[QueuedEmail]) -> None:
+    """Devuelve a la cola, sin contarles el intento, correos reservados que no se intentaron."""
+    QueuedEmail.objects.filter(pk__in=[row.pk for row in rows]).update(
+        attempts=F("attempts") - 1, next_attempt_at=timezone.now(),
+    )
+
+
+def _close(connection) -> None:
+    try:
+        connection.close()
+    except Exception:
+        pass  # p.ej. QUIT sobre una conexión que el servidor ya cerró
+
+
+def send_queued(batch_size: int = 100) -> tuple[int, int]:
+    """Envía un lote de la cola. Regresa (enviados, fallidos)."""
+    lease = _lease(batch_size)
+    started = time.monotonic()
+    rows = _claim(batch_size, lease)
+    if not rows:
+        return 0, 0
+    # Lo que no alcance a salir antes de que venza la reserva vuelve a la
+    # cola: pasado ese punto otro worker podría tomarlo y se enviaría doble
+    deadline = started + lease.total_seconds() - _per_message()
+
+    sent, failed = [], 0
+    connection = get_connection(getattr(settings, "OUTBOX_EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend"))
+    try:
+        for i, row in enumerate(rows):
+            if time.monotonic() >= deadline:
+                _release(rows[i:])
+                break
+            # Una sola conexión para todo el lote; tras un error se abre otra
+            try:
+                connection.open()
+            except Exception as e:
+                # Servidor caído: el resto del lote espera su backoff sin intentar
+                for pending in rows[i:]:
+                    _failed(pending, e)
+                failed += len(rows) - i
+                break
+            try:
+                connection.send_messages([_to_message(row, connection)])
+            except Exception as e:
+                failed += 1
+                _failed(row, e)
+                _close(connection)
+            else:
+                sent.append(row.pk)
+    finally:
+        # Los enviados se borran: el cuerpo puede llevar enlaces de un solo uso
+        QueuedEmail.objects.filter(pk__in=sent).delete()
+        _close(connection)
+    return len(sent), failed
+
+
+def purge_failed() -> int:
+    """
+    Borra los FAILED más viejos que PASSWORD_RESET_TIMEOUT: sus enlaces ya
+    vencieron y reintentarlos no serviría. Regresa cuántos borró.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.PASSWORD_RESET_TIMEOUT)
+    deleted, _ = QueuedEmail.objects.filter(status=QueuedEmail.Status.FAILED, created_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.password_validation import validate_password
+from django.contrib.auth.tokens import default_token_generator
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.urls import reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from accounts.models import User, unique_violation_field
+from bank_details.management.commands._bankdetails_io import RowWriter, open_stream, read_rows
+from bank_details.models import PublicProfileSnapshot, normalize_phone_number
+from bank_details.profile_cache import bump_profile_versions
+
+REJECT_FIELDS = ("line", "email", "phone", "display_name", "error")
+LINK_FIELDS = ("email", "phone", "public_slug", "reset_url")
+
+
+def _init_worker():
+    # Con spawn/forkserver el proceso hijo arranca sin Django configurado
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def _error_text(e: ValidationError) -> str:
+    if hasattr(e, "error_dict"):
+        return "; ".join(f"{field}: {' '.join(msgs)}" for field, msgs in e.message_dict.items())
+    return " ".join(e.messages)
+
+
+class Command(BaseCommand):
+    help = (
+        "Da de alta usuarios desde un CSV (email, phone, display_name, password) en lotes: "
+        "hashea las contraseñas en varios procesos, asigna los public_slug en memoria e "
+        "inserta con bulk_create. Sin contraseña, la cuenta queda con una inutilizable y "
+        "un enlace para definirla (--reset-links)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", nargs="?", default="-", help="CSV a importar ('-' para stdin).")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--workers", type=int, default=os.cpu_count() or 1,
+            help="Procesos para hashear contraseñas (0: en este mismo proceso).",
+        )
+        parser.add_argument(
+            "--unusable-passwords", action="store_true",
+            help="Ignora la columna password: todas las cuentas quedan sin contraseña.",
+        )
+        parser.add_argument("--reset-links", help="CSV donde escribir el enlace para definir contraseña de cada cuenta sin ella.")
+        parser.add_argument("--base-url", default="", help="Prefijo de los enlaces, p.ej. https://cobrando.la")
+        parser.add_argument("--rejects", help="CSV donde escribir las filas rechazadas con su error (sin contraseñas).")
+        parser.add_argument("--dry-run", action="store_true", help="Solo valida, no hashea ni escribe en la base de datos.")
+
+    def handle(self, *args, **options):
+        self.batch_size = max(1, options["batch_size"])
+        self.dry_run = options["dry_run"]
+        self.unusable_passwords = options["unusable_passwords"]
+        self.base_url = options["base_url"].rstrip("/")
+        self.verbosity = options["verbosity"]
+        self.created = self.rejected = self.without_password = 0
+        self.hash_time = self.insert_time = 0.0
+        # Emails y teléfonos ya tomados por filas anteriores del archivo
+        self.seen: set[str] = set()
+        self.started = time.monotonic()
+        # Una sola lectura de los slugs existentes; los nuevos se reservan aquí
+        self.taken_slugs = set(User.objects.values_list("public_slug", flat=True))
+
+        with ExitStack() as stack:
+            fh = stack.enter_context(open_stream(options["input"], "r"))
+            self.rejects = self.links = None
+            if options["rejects"]:
+                rejects_fh = stack.enter_context(open_stream(options["rejects"], "w", default=self.stderr))
+                self.rejects = RowWriter(rejects_fh, "csv", fields=REJECT_FIELDS)
+            if options["reset_links"] and not self.dry_run:
+                links_fh = stack.enter_context(open_stream(options["reset_links"], "w"))
+                self.links = RowWriter(links_fh, "csv", fields=LINK_FIELDS)
+            self.pool = None
+            if options["workers"] > 0 and not self.dry_run and not self.unusable_passwords:
+                self.workers = options["workers"]
+                self.pool = stack.enter_context(ProcessPoolExecutor(self.workers, initializer=_init_worker))
+            self._run(read_rows(fh, "csv"))
+
+        elapsed = time.monotonic() - self.started
+        verb = "validados" if self.dry_run else "creados"
+        rate = self.created / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"{self.created} usuarios {verb}, {self.rejected} rechazados en {elapsed:.1f}s "
+            f"({rate:.0f}/s; hash {self.hash_time:.1f}s, inserción {self.insert_time:.1f}s)."
+        ))
+        if self.without_password:
+            self.stdout.write(f"{self.without_password} cuentas sin contraseña.")
+
+    def _run(self, rows):
+        batch = []
+        for lineno, row in rows:
+            batch.append((lineno, row))
+            if len(batch) >= self.batch_size:
+                self._flush(batch)
+                batch = []
+        if batch:
+            self._flush(batch)
+
+    def _reject(self, lineno: int, row: dict, error: str) -> None:
+        self.rejected += 1
+        if self.rejects is not None:
+            self.rejects.write({**row, "line": lineno, "error": error})
+        else:
+            self.stderr.write(f"línea {lineno}: {error}")
+
+    def _build(self, row: dict) -> tuple[User, str]:
+        """Usuario sin guardar y su contraseña en claro ('' si no tiene); ValidationError si la fila no sirve."""
+        email = (row.get("email") or "").strip()
+        phone = (row.get("phone") or "").strip()
+        user = User(
+            email=User.objects.normalize_email(email) if email else None,
+            phone=normalize_phone_number(phone) if phone else None,
+            display_name=(row.get("display_name") or "").strip(),
+        )
+        if phone and user.phone is None:
+            raise ValidationError({"phone": ["Formato: +52XXXXXXXXXX o XXXXXXXXXX"]})
+        # Mismas reglas que el registro, sin las consultas de validate_unique
+        user.clean_fields(exclude=["password", "public_slug"])
+        user.clean()
+        password = "" if self.unusable_passwords else (row.get("password") or "")
+        if password:
+            try:
+                validate_password(password, user)
+            except ValidationError as e:
+                raise ValidationError({"password": e.messages})
+        return user, password
+
+    def _existing(self, entries) -> set[str]:
+        """Una consulta por lote para los emails y teléfonos que ya tienen cuenta."""
+        emails = {user.email for _, _, user, _ in entries if user.email}
+        phones = {user.phone for _, _, user, _ in entries if user.phone}
+        existing = set()
+        for email, phone in User.objects.filter(Q(email__in=emails) | Q(phone__in=phones)).values_list("email", "phone"):
+            existing.update((email, phone))
+        existing.discard(None)
+        return existing
+
+    def _flush(self, batch) -> None:
+        entries = []
+        for lineno, row in batch:
+            if "__error__" in row:
+                self._reject(lineno, {}, row["__error__"])
+                continue
+            try:
+                user, password = self._build(row)
+            except ValidationError as e:
+                self._reject(lineno, row, _error_text(e))
+                continue
+            entries.append((lineno, row, user, password))
+
+        existing = self._existing(entries) if entries else set()
+        accepted = []
+        for lineno, row, user, password in entries:
+            keys = {user.email, user.phone} - {None}
+            if keys & existing:
+                self._reject(lineno, row, "Ya existe una cuenta con ese email o teléfono.")
+            elif keys & self.seen:
+                self._reject(lineno, row, "Email o teléfono repetido en el archivo.")
+            else:
+                self.seen |= keys
+                accepted.append((lineno, row, user, password))
+        if not accepted:
+            return
+        if self.dry_run:
+            self.created += len(accepted)
+            return
+
+        self._hash(accepted)
+        for _, _, user, _ in accepted:
+            # Mismo formato que save(), pero contra el set en memoria: sin reintentos
+            while (slug := user._new_public_slug()) in self.taken_slugs:
+                pass
+            user.public_slug = slug
+            self.taken_slugs.add(slug)
+
+        started = time.monotonic()
+        users = self._insert(accepted)
+        self.insert_time += time.monotonic() - started
+        self.created += len(users)
+        for user in users:
+            if not user.has_usable_password():
+                self.without_password += 1
+                if self.links is not None:
+                    self._write_link(user)
+        if self.verbosity > 1:
+            elapsed = time.monotonic() - self.started
+            self.stdout.write(f"{self.created} usuarios ({self.created / elapsed:.0f}/s)")
+
+    def _hash(self, accepted) -> None:
+        started = time.monotonic()
+        with_password = [(user, password) for _, _, user, password in accepted if password]
+        passwords = [password for _, password in with_password]
+        if self.pool is not None and passwords:
+            # Pedazos grandes: cada tarea cruza el pipe una vez por proceso, no por contraseña
+            chunksize = max(1, len(passwords) // (self.workers * 4))
+            hashes = self.pool.map(make_password, passwords, chunksize=chunksize)
+        else:
+            hashes = map(make_password, passwords)
+        for (user, _), encoded in zip(with_password, hashes):
+            user.password = encoded
+        for _, _, user, password in accepted:
+            if not password:
+                user.set_unusable_password()
+        self.hash_time += time.monotonic() - started
+
+    def _insert(self, accepted) -> list[User]:
+        users = [user for _, _, user, _ in accepted]
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+                # PostgreSQL regresa los pk en bulk_create; SQLite puede que no
+                if users[0].pk is None:
+                    pks = dict(User.objects.filter(public_slug__in=[u.public_slug for u in users]).values_list("public_slug", "pk"))
+                    for user in users:
+                        user.pk = pks[user.public_slug]
+                PublicProfileSnapshot.rebuild_many(user.pk for user in users)
+        except IntegrityError:
+            # Alguien se registró con el mismo email/teléfono mientras corría
+            # el comando: el lote entero se deshizo, se guarda fila por fila
+            return self._insert_one_by_one(accepted)
+        # bulk_create no pasa por save(): invalida los perfiles a mano
+        bump_profile_versions(user.public_slug for user in users)
+        return users
+
+    def _insert_one_by_one(self, accepted) -> list[User]:
+        users = []
+        for lineno, row, user, _ in accepted:
+            # save() elige el slug con sus propios reintentos
+            user.public_slug = ""
+            try:
+                user.save()
+            except IntegrityError as e:
+                self._reject(lineno, row, f"Ya existe una cuenta con ese {unique_violation_field(e) or 'dato'}.")
+                continue
+            users.append(user)
+        return users
+
+    def _write_link(self, user: User) -> None:
+        path = reverse("password_reset_confirm", kwargs={
+            "uidb64": urlsafe_base64_encode(force_bytes(user.pk)),
+            "token": default_token_generator.make_token(user),
+        })
+        self.links.write({
+            "email": user.email, "phone": user.phone,
+            "public_slug": user.public_slug, "reset_url": self.base_url + path,
+        })
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from accounts.mail import purge_failed, send_queued
+
+PURGE_INTERVAL = 60 * 60  # segundos entre purgas de FAILED vencidos
+
+
+class Command(BaseCommand):
+    help = (
+        "Envía los correos de la cola (QueuedEmail) por lotes, con una sola "
+        "conexión SMTP por lote, y borra los fallidos cuyos enlaces ya vencieron. "
+        "Con --loop se queda corriendo como worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--loop", action="store_true", help="No terminar: revisar la cola cada --interval segundos.")
+        parser.add_argument("--interval", type=float, default=2.0)
+
+    def handle(self, *args, **opts):
+        next_purge = 0.0
+        while True:
+            if time.monotonic() >= next_purge:
+                purged = purge_failed()
+                if purged:
+                    self.stdout.write(f"{purged} fallidos vencidos borrados.")
+                next_purge = time.monotonic() + PURGE_INTERVAL
+            total_sent = total_failed = 0
+            while True:
+                sent, failed = send_queued(opts["batch_size"])
+                total_sent += sent
+                total_failed += failed
+                if sent + failed < opts["batch_size"]:
+                    break
+            if total_sent or total_failed or not opts["loop"]:
+                self.stdout.write(f"{total_sent} enviados, {total_failed} fallidos.")
+            if not opts["loop"]:
+                return
+            # Como un request: no quedarse con una conexión rota o vieja
+            close_old_connections()
+            time.sleep(opts["interval"])
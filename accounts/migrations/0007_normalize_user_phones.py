@@ -0,0 +1,36 @@
+import re
+
+from django.db import migrations
+
+
+def normalize_phones(apps, schema_editor):
+    """
+    Guarda los teléfonos como +52XXXXXXXXXX (lo que hace el registro desde
+    ahora), para que el índice único compare números y no formatos. Si dos
+    cuentas tienen el mismo número en formatos distintos, la segunda se deja
+    como está.
+    """
+    User = apps.get_model("accounts", "User")
+    rows = list(User.objects.filter(phone__isnull=False).values_list("pk", "phone"))
+    taken = {phone for _, phone in rows}
+    for pk, phone in rows:
+        match = re.fullmatch(r"(?:\+52)?(\d{10})", re.sub(r"[\s\-()]+", "", phone))
+        if not match:
+            continue
+        normalized = f"+52{match[1]}"
+        if normalized == phone or normalized in taken:
+            continue
+        User.objects.filter(pk=pk).update(phone=normalized)
+        taken.discard(phone)
+        taken.add(normalized)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_queuedemail'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_phones, migrations.RunPython.noop),
+    ]
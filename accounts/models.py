@@ -1,23 +1,52 @@
 from __future__ import annotations
 
 import re
+from functools import lru_cache
+
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.core.signals import setting_changed
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
-from django.db import models
+from django.db import IntegrityError, models, router, transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.utils import timezone
 from django.utils.crypto import get_random_string
 from django.utils.text import slugify
 
+from bank_details.profile_cache import bump_profile_version
+
 SLUG_RE = re.compile(r"^[a-z0-9]+(?:-[a-z0-9]+)*$")
 
-def _reserved_set():
+# Campos del usuario que se muestran en su perfil público
+PUBLIC_PROFILE_FIELDS = frozenset({"email", "display_name", "public_slug", "is_active"})
+
+# Intentos de INSERT con un slug aleatorio nuevo antes de rendirse
+SLUG_ALLOCATION_ATTEMPTS = 5
+
+@lru_cache(maxsize=None)
+def _reserved_set() -> frozenset[str]:
     default = {
         "admin", "u", "accounts", "login", "logout", "signup",
         "dashboard", "static", "media", "api", "robots.txt", "favicon.ico",
     }
-    return set(getattr(settings, "RESERVED_PUBLIC_SLUGS", default))
+    return frozenset(getattr(settings, "RESERVED_PUBLIC_SLUGS", default))
+
+@receiver(setting_changed)
+def _reset_reserved_set(*, setting, **kwargs):
+    if setting == "RESERVED_PUBLIC_SLUGS":
+        _reserved_set.cache_clear()
+
+def unique_violation_field(exc: IntegrityError) -> str | None:
+    """Campo único de User que violó el INSERT/UPDATE (public_slug, email o phone), si alguno."""
+    # PostgreSQL: ...constraint "accounts_user_public_slug_key" (o ..._<hash>_uniq)
+    # DETAIL: Key (public_slug)=(...); SQLite: ...accounts_user.public_slug
+    message = str(exc)
+    for field in ("public_slug", "email", "phone"):
+        if any(p in message for p in (f"accounts_user_{field}_", f"accounts_user.{field}", f"Key ({field})=")):
+            return field
+    return None
 
 def validate_public_slug(value: str):
     if value in _reserved_set():
@@ -109,6 +138,20 @@ class User(AbstractBaseUser, PermissionsMixin):
         if not self.email and not self.phone:
             raise ValidationError('Debes proporcionar un email o un número de teléfono.')
 
+    def validate_constraints(self, exclude=None):
+        # email_or_phone_required ya la revisa clean() en Python; evaluarla
+        # aquí costaría un SELECT por cada formulario de usuario validado
+        if {c.name for c in self._meta.constraints} <= {'email_or_phone_required'}:
+            return
+        super().validate_constraints(exclude=exclude)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Recordar el slug cargado para invalidar el perfil viejo si cambia
+        instance._loaded_public_slug = instance.__dict__.get("public_slug")
+        return instance
+
     def __str__(self) -> str: # Useful in admin and shell idk why copilot says that
         return self.email or self.phone or f"User {self.pk}"
     
@@ -119,28 +162,127 @@ class User(AbstractBaseUser, PermissionsMixin):
         if self.phone == '':
             self.phone = None
         
+        # p.ej. update_last_login() en cada login: no afecta el perfil público
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and not PUBLIC_PROFILE_FIELDS.intersection(update_fields):
+            self._save_user(*args, **kwargs)
+            return
+
+        from bank_details.models import PublicProfileSnapshot
+
+        created = self._state.adding
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        for attempt in range(SLUG_ALLOCATION_ATTEMPTS):
+            new_slug = not self.public_slug
+            if new_slug:
+                self.public_slug = self._new_public_slug()
+            try:
+                # Un intento = usuario + snapshot en una transacción, sin
+                # exists() previos: los índices únicos deciden. Solo hay
+                # savepoint si quien llama ya abrió una transacción
+                with transaction.atomic(using=using):
+                    self._save_user(*args, **kwargs)
+                    PublicProfileSnapshot.rebuild_for(self, created=created)
+                break
+            except IntegrityError as e:
+                if created:
+                    # Se deshizo el INSERT: el objeto sigue siendo nuevo
+                    self.pk = None
+                    self._state.adding = True
+                if new_slug:
+                    self.public_slug = ""
+                # Si el slug aleatorio chocó se repite el intento completo con otro
+                if not (new_slug and unique_violation_field(e) == "public_slug") \
+                        or attempt == SLUG_ALLOCATION_ATTEMPTS - 1:
+                    raise
+
+        loaded_slug = getattr(self, "_loaded_public_slug", None)
+        if loaded_slug and loaded_slug != self.public_slug:
+            bump_profile_version(loaded_slug)
+        bump_profile_version(self.public_slug)
+        self._loaded_public_slug = self.public_slug
+    
+    def _save_user(self, *args, **kwargs):
         if not self.public_slug:
-            base = None
-            if self.display_name:
-                base = self.display_name
-            elif self.email:
-                base = self.email.split("@")[0]
-            elif self.phone:
-                base = self.phone
-            
-            slug = _generate_public_slug(base)
-            # Evita reservados y colisiones
-            Model = type(self)
-            while slug in _reserved_set() or Model.objects.filter(public_slug=slug).exists():
-                slug = _generate_public_slug(base)
-            self.public_slug = slug
+            self._save_with_new_slug(*args, **kwargs)
         else:
             # Si viene definido (p.ej. desde admin), valida
             validate_public_slug(self.public_slug)
+            super().save(*args, **kwargs)
+
+    def _new_public_slug(self) -> str:
+        base = None
+        if self.display_name:
+            base = self.display_name
+        elif self.email:
+            base = self.email.split("@")[0]
+        elif self.phone:
+            base = self.phone
+        while (slug := _generate_public_slug(base)) in _reserved_set():
+            pass
+        return slug
+
+    def _save_with_new_slug(self, *args, **kwargs):
+        """
+        Para save(update_fields=...) sin slug: genera uno aleatorio y deja
+        que el índice único decida; si choca en public_slug, reintenta con
+        otro dentro de un savepoint.
+        """
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        for attempt in range(SLUG_ALLOCATION_ATTEMPTS):
+            self.public_slug = self._new_public_slug()
+            try:
+                # Savepoint: un choque no debe romper la transacción de afuera
+                with transaction.atomic(using=using):
+                    super().save(*args, **kwargs)
+                return
+            except IntegrityError as e:
+                self.public_slug = ""
+                if unique_violation_field(e) != "public_slug" or attempt == SLUG_ALLOCATION_ATTEMPTS - 1:
+                    raise
 
-        super().save(*args, **kwargs)
-    
     @property
     def public_path(self) -> str:
         # For public routes type "/<slug/>"
-        return f"/{self.public_slug}/"
\ No newline at end of file
+        return f"/{self.public_slug}/"
+
+@receiver(post_delete, sender=User)
+def _invalidate_deleted_profile(sender, instance, **kwargs):
+    # También borrados por queryset (acción del admin): el snapshot se va en
+    # cascada, pero el HTML cacheado bajo la versión actual seguiría vivo
+    bump_profile_version(instance.public_slug)
+
+class QueuedEmail(models.Model):
+    """
+    Correo pendiente de envío (accounts/mail.py). El request solo inserta la
+    fila; `manage.py send_queued_mail` la envía y la borra. Las que agotan
+    sus reintentos quedan como FAILED, con el último error.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "En cola"
+        FAILED = "failed", "Falló"
+
+    subject = models.TextField()
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list)
+    bcc = models.JSONField(default=list)
+    reply_to = models.JSONField(default=list)
+    headers = models.JSONField(default=dict)
+    # [[contenido, mimetype], ...], p.ej. la versión HTML
+    alternatives = models.JSONField(default=list)
+
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["next_attempt_at"]
+        indexes = [models.Index(fields=["status", "next_attempt_at"], name="queuedemail_due_idx")]
+
+    def __str__(self) -> str:
+        return f"{self.subject} → {', '.join(self.to)}"
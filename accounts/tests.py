@@ -1,3 +1,274 @@
-from django.test import TestCase
+import csv
+import socketserver
+import tempfile
+import threading
+from io import StringIO
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import MD5PasswordHasher
+from django.core.mail import send_mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from bank_details.models import PublicProfileSnapshot
+from .forms import SignupForm
+from .mail import purge_failed, send_queued
+from .models import QueuedEmail, User
+
+
+class CountingHasher(MD5PasswordHasher):
+    calls = 0
+
+    def encode(self, password, salt):
+        CountingHasher.calls += 1
+        return super().encode(password, salt)
+
+
+@override_settings(PASSWORD_HASHERS=["accounts.tests.CountingHasher"])
+class EmailOrPhoneBackendTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User(phone="9981234567")
+        cls.user.set_password("secreto-123")
+        cls.user.save()
+
+    def setUp(self):
+        CountingHasher.calls = 0
+
+    def test_phone_formats_find_the_same_user(self):
+        for username in ("9981234567", "+529981234567", "+52 998 123 4567", "(998) 123-4567"):
+            with self.subTest(username=username), self.assertNumQueries(1):
+                self.assertEqual(authenticate(username=username, password="secreto-123"), self.user)
+
+    def test_failed_attempts_hash_once(self):
+        for username, password in (("9981234567", "incorrecta"), ("nadie@example.com", "secreto-123")):
+            with self.subTest(username=username):
+                CountingHasher.calls = 0
+                self.assertIsNone(authenticate(username=username, password=password))
+                self.assertEqual(CountingHasher.calls, 1)
+
+
+class SignupFormTests(TestCase):
+    def _form(self, **data):
+        return SignupForm({"password1": "xk-39dkslq2", "password2": "xk-39dkslq2", **data})
+
+    def test_signup_is_one_write_attempt(self):
+        form = self._form(email="ana@example.com", phone="998 123 4567", display_name="Ana")
+        with self.assertNumQueries(0):
+            self.assertTrue(form.is_valid())
+        # Savepoint (el test corre en una transacción) + INSERT usuario + INSERT snapshot
+        with self.assertNumQueries(4):
+            user = form.save()
+        self.assertEqual(user.phone, "+529981234567")
+
+    def test_duplicates_become_form_errors(self):
+        User.objects.create(email="ana@example.com", phone="+529981234567")
+        for data, field in (({"email": "ana@example.com"}, "email"), ({"phone": "(998) 123-4567"}, "phone")):
+            with self.subTest(field=field):
+                form = self._form(**data)
+                self.assertTrue(form.is_valid())
+                self.assertIsNone(form.save())
+                self.assertIn(field, form.errors)
+                self.assertEqual(User.objects.count(), 1)
+
+    def test_signup_view_shows_duplicate_error(self):
+        User.objects.create(email="ana@example.com")
+        response = self.client.post(reverse("signup"), {
+            "email": "ana@example.com", "password1": "xk-39dkslq2", "password2": "xk-39dkslq2",
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("email", response.context["form"].errors)
+
+
+
+class UserAdminTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create(email="admin@example.com", is_staff=True, is_superuser=True)
+        self.client.force_login(self.admin)
+
+    def test_add_existing_email_is_a_form_error(self):
+        User.objects.create(email="ana@example.com")
+        response = self.client.post(reverse("admin:accounts_user_add"), {
+            "email": "ana@example.com", "password1": "xk-39dkslq2", "password2": "xk-39dkslq2",
+            "is_active": "on",
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("email", response.context["adminform"].form.errors)
+        self.assertEqual(User.objects.filter(email="ana@example.com").count(), 1)
+
+    def test_add_and_change_normalize_phone(self):
+        response = self.client.post(reverse("admin:accounts_user_add"), {
+            "phone": "998 123 4567", "password1": "xk-39dkslq2", "password2": "xk-39dkslq2", "is_active": "on",
+        })
+        self.assertEqual(response.status_code, 302)
+        user = User.objects.get(phone="+529981234567")
+
+        response = self.client.post(reverse("admin:accounts_user_change", args=[user.pk]), {
+            "email": "", "phone": "(998) 765-4321", "display_name": "", "public_slug": user.public_slug,
+            "is_active": "on", "date_joined_0": "2026-10-18", "date_joined_1": "00:00:00",
+        })
+        self.assertEqual(response.status_code, 302)
+        user.refresh_from_db()
+        self.assertEqual((user.phone, user.email), ("+529987654321", None))
+
+class BulkCreateUsersTests(TestCase):
+    def setUp(self):
+        self.tmp = Path(self.enterContext(tempfile.TemporaryDirectory()))
+
+    def _run(self, rows, *args):
+        path = self.tmp / "users.csv"
+        with open(path, "w", newline="") as fh:
+            writer = csv.DictWriter(fh, fieldnames=("email", "phone", "display_name", "password"))
+            writer.writeheader()
+            writer.writerows(rows)
+        out = StringIO()
+        call_command("bulk_create_users", str(path), "--rejects", str(self.tmp / "rejects.csv"), *args, stdout=out)
+        with open(self.tmp / "rejects.csv", newline="") as fh:
+            return out.getvalue(), list(csv.DictReader(fh))
+
+    def test_creates_users_with_slugs_and_snapshots(self):
+        User.objects.create(email="ya@example.com")
+        out, rejects = self._run([
+            {"email": "ana@example.com", "display_name": "Tacos Ana", "password": "xk-39dkslq2"},
+            {"phone": "(998) 123-4567", "password": "xk-39dkslq2"},
+            {"email": "ya@example.com"},
+            {"phone": "+529981234567"},
+            {"phone": "123"},
+            {"display_name": "Sin contacto"},
+        ], "--workers", "2", "--batch-size", "2")
+        self.assertIn("2 usuarios creados, 4 rechazados", out)
+        self.assertEqual([r["line"] for r in rejects], ["4", "5", "6", "7"])
+        ana = User.objects.get(email="ana@example.com")
+        self.assertTrue(ana.public_slug.startswith("tacos-ana-"))
+        self.assertTrue(ana.check_password("xk-39dkslq2"))
+        self.assertTrue(User.objects.get(phone="+529981234567").check_password("xk-39dkslq2"))
+        self.assertEqual(PublicProfileSnapshot.objects.filter(owner__in=[ana]).count(), 1)
+
+    def test_unusable_passwords_get_reset_links(self):
+        links = self.tmp / "links.csv"
+        self._run([{"email": "ana@example.com", "password": "xk-39dkslq2"}],
+                  "--unusable-passwords", "--reset-links", str(links), "--base-url", "https://cobrando.la/")
+        self.assertFalse(User.objects.get().has_usable_password())
+        with open(links, newline="") as fh:
+            (link,) = csv.DictReader(fh)
+        self.assertTrue(link["reset_url"].startswith("https://cobrando.la/accounts/reset/"))
+        response = self.client.get(link["reset_url"].removeprefix("https://cobrando.la"), follow=True)
+        self.assertTrue(response.context["validlink"])
+
+    def test_dry_run_writes_nothing(self):
+        out, rejects = self._run([{"email": "ana@example.com", "password": "xk-39dkslq2"}], "--dry-run")
+        self.assertIn("1 usuarios validados", out)
+        self.assertFalse(User.objects.exists())
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Lo mínimo de SMTP para que smtplib entregue: cuenta conexiones y mensajes."""
+
+    def handle(self):
+        self.server.connections += 1
+        self.wfile.write(b"220 localhost\r\n")
+        while line := self.rfile.readline():
+            command = line.strip().upper()
+            if command == b"DATA":
+                self.wfile.write(b"354 end with .\r\n")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                self.server.messages += 1
+                self.wfile.write(b"250 OK\r\n")
+            elif command == b"QUIT":
+                self.wfile.write(b"221 bye\r\n")
+                return
+            else:
+                self.wfile.write(b"250 OK\r\n")
+
+
+class _SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    connections = 0
+    messages = 0
+
+
+@override_settings(
+    EMAIL_BACKEND="accounts.mail.QueuedEmailBackend",
+    OUTBOX_EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+    EMAIL_HOST="127.0.0.1",
+    EMAIL_HOST_USER="",
+    EMAIL_HOST_PASSWORD="",
+    EMAIL_USE_TLS=False,
+)
+class OutboxTests(TestCase):
+    def setUp(self):
+        self.smtp = _SMTPServer(("127.0.0.1", 0), _SMTPHandler)
+        threading.Thread(target=self.smtp.serve_forever, daemon=True).start()
+        self.addCleanup(self.smtp.server_close)
+        self.addCleanup(self.smtp.shutdown)
+        self.enterContext(self.settings(EMAIL_PORT=self.smtp.server_address[1]))
+
+    def test_password_reset_only_enqueues(self):
+        user = User.objects.create(email="ana@example.com")
+        user.set_password("secreto-123")
+        user.save()
+        response = self.client.post(reverse("password_reset"), {"email": "ana@example.com"})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.smtp.messages, 0)
+        self.assertEqual(QueuedEmail.objects.get().to, ["ana@example.com"])
+
+    def test_batch_reuses_one_connection(self):
+        for i in range(3):
+            send_mail("Hola", "Cuerpo", None, [f"user{i}@example.com"])
+        self.assertEqual(send_queued(), (3, 0))
+        self.assertEqual((self.smtp.connections, self.smtp.messages), (1, 3))
+        self.assertFalse(QueuedEmail.objects.exists())
+
+    def test_server_down_backs_off(self):
+        send_mail("Hola", "Cuerpo", None, ["ana@example.com"])
+        self.smtp.shutdown()
+        self.smtp.server_close()
+        self.assertEqual(send_queued(), (0, 1))
+        row = QueuedEmail.objects.get()
+        self.assertEqual((row.status, row.attempts), (QueuedEmail.Status.QUEUED, 1))
+        self.assertTrue(row.last_error)
+        # Con backoff pendiente no se vuelve a intentar
+        self.assertEqual(send_queued(), (0, 0))
+
+    @override_settings(EMAIL_TIMEOUT=10)
+    def test_lease_covers_the_whole_batch(self):
+        send_mail("Hola", "Cuerpo", None, ["ana@example.com"])
+        self.smtp.shutdown()
+        self.smtp.server_close()
+        before = timezone.now()
+        with mock.patch("accounts.mail._failed"):
+            send_queued(batch_size=100)
+        # 100 correos x (abrir + enviar) x 10 s, más que los 5 min de CLAIM_TIMEOUT
+        self.assertGreaterEqual(QueuedEmail.objects.get().next_attempt_at, before + timedelta(seconds=2000))
+
+    @override_settings(EMAIL_TIMEOUT=0)
+    def test_rows_past_the_lease_go_back_to_the_queue(self):
+        send_mail("Hola", "Cuerpo", None, ["ana@example.com"])
+        with mock.patch("accounts.mail.CLAIM_TIMEOUT", timedelta(0)):
+            self.assertEqual(send_queued(), (0, 0))
+        row = QueuedEmail.objects.get()
+        self.assertEqual((row.attempts, self.smtp.messages), (0, 0))
+        self.assertLessEqual(row.next_attempt_at, timezone.now())
+
+    def test_failed_bodies_are_hidden_and_purged(self):
+        send_mail("Recupera tu cuenta", "https://cobrando.la/reset/abc/token/", None, ["ana@example.com"])
+        row = QueuedEmail.objects.get()
+        row.status = QueuedEmail.Status.FAILED
+        row.save()
+        admin = User.objects.create(email="admin@example.com", is_staff=True, is_superuser=True)
+        self.client.force_login(admin)
+        response = self.client.get(reverse("admin:accounts_queuedemail_change", args=[row.pk]))
+        self.assertContains(response, "Recupera tu cuenta")
+        self.assertNotContains(response, "/reset/abc/token/")
+
+        self.assertEqual(purge_failed(), 0)
+        QueuedEmail.objects.update(created_at=timezone.now() - timedelta(days=4))
+        self.assertEqual(purge_failed(), 1)
+        self.assertFalse(QueuedEmail.objects.exists())
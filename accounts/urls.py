@@ -1,28 +1,31 @@
 from django.urls import path, include
 from django.contrib.auth import views as auth_views
-from .views import logout_view, SignupView
+from cobrando_la.ratelimit import ratelimit
+from .views import form_identifiers, logged_in, logout_view, SignupView
 from .forms import CustomPasswordResetForm
 
+# Login, registro y recuperación limitan sus POST antes de hashear nada
+# (settings.RATE_LIMITS, cobrando_la/ratelimit.py)
 urlpatterns = [
     # Login personalizado (usando el template existente)
-    path("login/", auth_views.LoginView.as_view(
+    path("login/", ratelimit("login", form_identifiers("username"), refund_if=logged_in)(auth_views.LoginView.as_view(
         template_name="registration/login.html"
-    ), name="login"),
+    )), name="login"),
     
     # Logout personalizado
     path("logout/", logout_view, name="logout"),
     
     # Registro con vista personalizada
-    path("signup/", SignupView.as_view(), name="signup"),
+    path("signup/", ratelimit("signup", form_identifiers("email", "phone"))(SignupView.as_view()), name="signup"),
     
     # Password reset views (usando templates personalizados)
-    path("password-reset/", auth_views.PasswordResetView.as_view(
+    path("password-reset/", ratelimit("password_reset", form_identifiers("email"))(auth_views.PasswordResetView.as_view(
         template_name="registration/password_reset.html",
         email_template_name="registration/password_reset_email.html",
         subject_template_name="registration/password_reset_subject.txt",
         form_class=CustomPasswordResetForm,
         success_url="/accounts/password-reset/done/"
-    ), name="password_reset"),
+    )), name="password_reset"),
     
     path("password-reset/done/", auth_views.PasswordResetDoneView.as_view(
         template_name="registration/password_reset_done.html"
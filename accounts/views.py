@@ -1,7 +1,34 @@
 from django.contrib.auth import logout, login
 from django.shortcuts import redirect, render
 from django.views import View
-from .forms import UserCreationForm
+from bank_details.models import normalize_phone_number
+from .forms import SignupForm
+
+
+def form_identifiers(*fields):
+    """
+    Identificadores del POST para el límite de intentos (cobrando_la.ratelimit):
+    emails en minúsculas y teléfonos en forma +52, para que 9981234567 y
+    +52 998 123 4567 compartan bucket.
+    """
+    def identifiers(request):
+        values = set()
+        for field in fields:
+            value = request.POST.get(field, "").strip()
+            if not value:
+                continue
+            if "@" in value:
+                values.add(value.lower())
+            else:
+                values.add(normalize_phone_number(value) or value)
+        return values
+    return identifiers
+
+
+def logged_in(request, response) -> bool:
+    """Login correcto: no le cuenta al bucket del identificador (ver ratelimit)."""
+    # Un POST fallido responde el formulario (200), aunque ya hubiera sesión
+    return response.status_code == 302 and request.user.is_authenticated
 
 def logout_view(request):
     """
@@ -17,7 +44,7 @@ class SignupView(View):
     Vista personalizada de registro que soporta email O teléfono
     """
     template_name = "accounts/signup.html"
-    form_class = UserCreationForm
+    form_class = SignupForm
     success_url = "/dashboard/"
     
     def get(self, request):
@@ -31,10 +58,11 @@ class SignupView(View):
             return redirect(self.success_url)
         
         form = self.form_class(request.POST)
-        if form.is_valid():
-            user = form.save()
+        # Un solo INSERT: si el email o el teléfono ya existen, save()
+        # regresa None y deja el error en el formulario
+        if form.is_valid() and (user := form.save()) is not None:
             # Autenticar e iniciar sesión automáticamente
-            login(request, user, backend='django.contrib.auth.backends.ModelBackend')
+            login(request, user, backend='accounts.backends.EmailOrPhoneBackend')
             return redirect(self.success_url)
         
         return render(request, self.template_name, {"form": form})
@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import BankDetails
+from django.db import transaction
+from django.utils import timezone
+from .models import BankDetails, PublicProfileSnapshot
+from .profile_cache import bump_profile_versions
 
 
 @admin.register(BankDetails)
@@ -24,10 +27,10 @@ class BankDetailsAdmin(admin.ModelAdmin):
         "alias",
     )
     autocomplete_fields = ("owner",)
-    readonly_fields = ("created_at", "updated_at", "masked_value", "bank_code", "brand")
+    readonly_fields = ("created_at", "updated_at", "masked_value", "bank_code", "plaza", "brand")
     fieldsets = (
         (None, {"fields": ("owner", "kind", "value", "alias")}),
-        ("Card/CLABE meta", {"fields": ("brand", "bank_code")}),
+        ("Card/CLABE meta", {"fields": ("brand", "bank_code", "plaza")}),
         ("Bank info", {"fields": ("bank_name", "bank_name_source")}),
         ("Visibility", {"fields": ("is_public",)}),
         ("Timestamps", {"fields": ("created_at", "updated_at")}),
@@ -38,8 +41,16 @@ class BankDetailsAdmin(admin.ModelAdmin):
 
     @admin.action(description="Mark selected as PUBLIC")
     def make_public(self, request, queryset):
-        queryset.update(is_public=True)
+        with transaction.atomic():
+            queryset.update(is_public=True, updated_at=timezone.now())
+            # update() no pasa por save(): toca updated_at (ETag), reconstruye
+            # los snapshots e invalida a mano los perfiles afectados
+            PublicProfileSnapshot.rebuild_many(queryset.values_list("owner_id", flat=True))
+        bump_profile_versions(queryset.values_list("owner__public_slug", flat=True))
 
     @admin.action(description="Mark selected as PRIVATE")
     def make_private(self, request, queryset):
-        queryset.update(is_public=False)
+        with transaction.atomic():
+            queryset.update(is_public=False, updated_at=timezone.now())
+            PublicProfileSnapshot.rebuild_many(queryset.values_list("owner_id", flat=True))
+        bump_profile_versions(queryset.values_list("owner__public_slug", flat=True))
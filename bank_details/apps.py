@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class BankDetailsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'bank_details'
+
+    def ready(self):
+        # Deja los logos de marcas en memoria antes del primer request
+        from .templatetags.inline_svg import warm_svg_cache
+        warm_svg_cache()
@@ -0,0 +1,137 @@
+"""
+Catálogo de participantes de Banxico para resolver CLABEs sin tocar la BD.
+
+Una CLABE es BBB PPP CCCCCCCCCCC D: banco (dígitos 1–3), plaza (4–6),
+cuenta y verificador. El catálogo vive en un snapshot JSON versionado
+(settings.BANK_CODES_FILE) que `manage.py sync_bank_codes` reescribe de forma
+atómica. Cada worker lo carga una vez en un índice inmutable y revisa el
+mtime del archivo cada BANK_CODES_RELOAD_INTERVAL segundos, así que los
+cambios se toman sin reiniciar. sync_bank_codes además publica el catálogo en
+el caché compartido (alias "bank_codes"), para workers en otros hosts que no
+ven el archivo; gana el más reciente de los dos según su `timestamp`.
+"""
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping, NamedTuple
+
+from django.conf import settings
+
+from cobrando_la.cache import namespace
+
+DEFAULT_BANK_CODES_FILE = Path(__file__).resolve().parent / "data" / "bank_codes.json"
+
+
+class BankRegistry(NamedTuple):
+    version: str     # etiqueta para humanos
+    timestamp: int   # epoch de la generación; es lo que se compara
+    banks: Mapping[str, str]   # "012" -> "BBVA"
+    plazas: Mapping[str, str]  # "180" -> "Ciudad de México"
+
+
+def registry_path() -> Path:
+    return Path(getattr(settings, "BANK_CODES_FILE", DEFAULT_BANK_CODES_FILE))
+
+
+# Llaves en el alias "bank_codes" de CACHES
+VERSION_CACHE_KEY = "version"
+TIMESTAMP_CACHE_KEY = "timestamp"
+REGISTRY_CACHE_KEY = "registry"
+shared_cache = namespace("bank_codes")
+
+
+def _registry_from_data(data: Mapping) -> BankRegistry:
+    return BankRegistry(
+        version=str(data.get("version", "")),
+        timestamp=int(data.get("timestamp") or 0),
+        banks=MappingProxyType(dict(data.get("banks", {}))),
+        plazas=MappingProxyType(dict(data.get("plazas", {}))),
+    )
+
+
+def load_registry(path: str | Path) -> BankRegistry:
+    with open(path, encoding="utf-8") as f:
+        return _registry_from_data(json.load(f))
+
+
+def publish_registry(registry: BankRegistry) -> None:
+    """Publica el catálogo en el caché compartido (sin expiración)."""
+    data = {
+        "version": registry.version, "timestamp": registry.timestamp,
+        "banks": dict(registry.banks), "plazas": dict(registry.plazas),
+    }
+    shared_cache.set(REGISTRY_CACHE_KEY, data, None)
+    shared_cache.set(VERSION_CACHE_KEY, registry.version, None)
+    shared_cache.set(TIMESTAMP_CACHE_KEY, registry.timestamp, None)
+
+
+def _newer_shared_registry(current: BankRegistry) -> BankRegistry | None:
+    # Primero el timestamp (una llave chica); el catálogo solo si es más nuevo.
+    # Las etiquetas de versión no se comparan: el bundled y las de
+    # sync_bank_codes tienen formatos distintos
+    timestamp = shared_cache.get(TIMESTAMP_CACHE_KEY)
+    if not timestamp or timestamp <= current.timestamp:
+        return None
+    data = shared_cache.get(REGISTRY_CACHE_KEY)
+    return _registry_from_data(data) if data else None
+
+
+def write_registry(
+    path: str | Path, banks: Mapping[str, str], plazas: Mapping[str, str], version: str, timestamp: int,
+) -> None:
+    """Escribe el snapshot a un temporal y lo renombra: los workers nunca leen medio archivo."""
+    path = Path(path)
+    data = {
+        "version": version, "timestamp": timestamp,
+        "banks": dict(sorted(banks.items())), "plazas": dict(sorted(plazas.items())),
+    }
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+_registry: BankRegistry | None = None
+_registry_mtime: float | None = None
+_next_check = 0.0
+_lock = threading.Lock()
+
+
+def get_registry() -> BankRegistry:
+    """Snapshot vigente del proceso (lazy; se recarga si el archivo cambió)."""
+    global _registry, _registry_mtime, _next_check
+    now = time.monotonic()
+    if _registry is not None and now < _next_check:
+        return _registry
+    with _lock:
+        if _registry is not None and now < _next_check:
+            return _registry
+        path = registry_path()
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            mtime = None
+        if _registry is None or (mtime is not None and mtime != _registry_mtime):
+            _registry = load_registry(path)
+            _registry_mtime = mtime
+        _registry = _newer_shared_registry(_registry) or _registry
+        _next_check = now + getattr(settings, "BANK_CODES_RELOAD_INTERVAL", 60)
+    return _registry
+
+
+def resolve_clabe(clabe: str) -> tuple[str, str]:
+    """(banco, plaza) de una CLABE; cadenas vacías si no están en el catálogo."""
+    registry = get_registry()
+    return registry.banks.get(clabe[:3], ""), registry.plazas.get(clabe[3:6], "")
@@ -0,0 +1,89 @@
+"""
+Versiones por lote (NumPy) de luhn_check, clabe_checksum_ok y
+validate_phone_number, para importaciones masivas y re-validaciones nocturnas.
+
+Reciben una secuencia o arreglo de strings y regresan una máscara booleana
+(np.ndarray) con un elemento por entrada. Cualquier entrada con formato
+inválido (letras, longitud incorrecta, vacía) es False.
+"""
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+_ZERO = ord("0")
+
+# Ponderaciones CLABE 3,7,1 sobre los primeros 17 dígitos
+_CLABE_WEIGHTS = np.resize(np.array([3, 7, 1], dtype=np.int32), 17)
+
+# Mismos caracteres que quita validate_phone_number (r"[\s\-()]+")
+_PHONE_STRIP = " \t\n\r\f\v-()"
+
+
+def _as_str_array(values: Sequence[str] | np.ndarray) -> np.ndarray:
+    arr = np.asarray(values, dtype=str)
+    return arr.reshape(-1)
+
+
+def _codes(arr: np.ndarray, width: int) -> np.ndarray:
+    """
+    Matriz (n, width) con los code points de cada string, rellenada con 0.
+    Los strings más largos que `width` se truncan: valida la longitud aparte.
+    """
+    itemsize = arr.dtype.itemsize // 4
+    if itemsize == 0:
+        return np.zeros((arr.shape[0], width), dtype=np.int32)
+    codes = np.ascontiguousarray(arr).view(np.uint32).reshape(arr.shape[0], itemsize)
+    if itemsize < width:
+        codes = np.pad(codes, ((0, 0), (0, width - itemsize)))
+    return codes[:, :width].astype(np.int32)
+
+
+def _digits(codes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(dígitos, máscara de filas donde todo es 0-9)."""
+    digits = codes - _ZERO
+    return digits, ((digits >= 0) & (digits <= 9)).all(axis=1)
+
+
+def luhn_check_batch(numbers: Sequence[str] | np.ndarray) -> np.ndarray:
+    """Luhn mod-10 para muchos números de tarjeta a la vez (cualquier longitud)."""
+    arr = _as_str_array(numbers)
+    if arr.size == 0:
+        return np.zeros(0, dtype=bool)
+    lengths = np.char.str_len(arr)
+    width = int(lengths.max())
+    # Alinear a la derecha con ceros: no cambian la suma y la paridad
+    # se cuenta desde el último dígito, igual que en luhn_check
+    digits, ok = _digits(_codes(np.char.rjust(arr, width, "0"), width))
+    ok &= lengths > 0
+    doubled = (np.arange(width) % 2) == (width % 2)
+    d = np.where(doubled, digits * 2, digits)
+    d = np.where(d > 9, d - 9, d)
+    return ok & (d.sum(axis=1) % 10 == 0)
+
+
+def clabe_checksum_ok_batch(clabes: Sequence[str] | np.ndarray) -> np.ndarray:
+    """Dígito verificador de CLABE (18 dígitos) para muchas CLABEs a la vez."""
+    arr = _as_str_array(clabes)
+    digits, ok = _digits(_codes(arr, 18))
+    ok &= np.char.str_len(arr) == 18
+    total = ((digits[:, :17] * _CLABE_WEIGHTS) % 10).sum(axis=1)
+    check = (10 - (total % 10)) % 10
+    return ok & (check == digits[:, 17])
+
+
+def validate_phone_number_batch(phones: Sequence[str] | np.ndarray) -> np.ndarray:
+    """Teléfonos mexicanos (+52 y 10 dígitos, o 10 dígitos) para muchos números a la vez."""
+    arr = _as_str_array(phones)
+    # Solo quitamos los separadores que de verdad aparecen (lo normal es ninguno)
+    raw = _codes(arr, arr.dtype.itemsize // 4)
+    for c in _PHONE_STRIP:
+        if (raw == ord(c)).any():
+            arr = np.char.replace(arr, c, "")
+    lengths = np.char.str_len(arr)
+    codes = _codes(arr, 13)
+    plain_digits, plain_ok = _digits(codes[:, :10])
+    prefixed_digits, prefixed_ok = _digits(codes[:, 3:13])
+    has_prefix = (codes[:, 0] == ord("+")) & (codes[:, 1] == ord("5")) & (codes[:, 2] == ord("2"))
+    return ((lengths == 10) & plain_ok) | ((lengths == 13) & has_prefix & prefixed_ok)
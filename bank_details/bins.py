@@ -0,0 +1,124 @@
+"""
+Clasificador de tarjetas por BIN/IIN (primeros dígitos) a partir de una
+tabla de datos (bank_details/data/card_bins.csv, o settings.BIN_DATA_FILE).
+
+Cada fila de la tabla es un prefijo o un rango de prefijos ("2221-2720").
+Los rangos se descomponen en el mínimo de prefijos equivalentes al cargar,
+así que una consulta es a lo más MAX_PREFIX búsquedas en un dict (gana el
+prefijo más largo), sin importar el tamaño de la tabla.
+"""
+from __future__ import annotations
+
+import csv
+import threading
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+from django.conf import settings
+
+MAX_PREFIX = 8  # BINs de 8 dígitos (ISO/IEC 7812 desde 2022)
+
+DEFAULT_BIN_FILE = Path(__file__).resolve().parent / "data" / "card_bins.csv"
+
+
+class CardInfo(NamedTuple):
+    brand: str
+    bank: str
+    card_type: str  # "DEBIT", "CREDIT" o "" si la tabla no lo dice
+
+
+def _range_to_prefixes(lo: str, hi: str) -> list[str]:
+    """
+    Descompone el rango cerrado [lo, hi] de prefijos de igual longitud en
+    el mínimo de prefijos: 2221-2720 -> 2221..2229, 223..229, 23..26, 270, 271, 2720.
+    """
+    width = len(lo)
+    a, b = int(lo), int(hi)
+    out = []
+    while a <= b:
+        k = 0
+        while k < width - 1 and a % 10 ** (k + 1) == 0 and a + 10 ** (k + 1) - 1 <= b:
+            k += 1
+        out.append(str(a).zfill(width)[: width - k])
+        a += 10 ** k
+    return out
+
+
+class BinIndex:
+    """Índice inmutable prefijo -> CardInfo, con contadores de aciertos/fallos."""
+
+    def __init__(self, rows: Iterable[tuple[str, CardInfo]]):
+        table: dict[str, CardInfo] = {}
+        for prefix, info in rows:
+            lo, _, hi = prefix.partition("-")
+            hi = hi or lo
+            if not (lo.isdigit() and hi.isdigit() and len(lo) == len(hi) <= MAX_PREFIX and lo <= hi):
+                raise ValueError(f"Prefijo BIN inválido: {prefix!r}")
+            for p in _range_to_prefixes(lo, hi):
+                table[p] = info
+        self._table = table
+        self._lengths = sorted({len(p) for p in table}, reverse=True)
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> "BinIndex":
+        def rows():
+            with open(path, encoding="utf-8", newline="") as f:
+                reader = csv.DictReader(line for line in f if not line.startswith("#"))
+                for row in reader:
+                    yield row["prefix"].strip(), CardInfo(
+                        brand=(row.get("brand") or "").strip(),
+                        bank=(row.get("bank") or "").strip(),
+                        card_type=(row.get("card_type") or "").strip().upper(),
+                    )
+        return cls(rows())
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def lookup(self, number: str) -> CardInfo | None:
+        """Prefijo más largo que coincide con `number`, o None."""
+        table = self._table
+        for n in self._lengths:
+            info = table.get(number[:n])
+            if info is not None:
+                self.hits += 1
+                return info
+        self.misses += 1
+        return None
+
+    def lookup_many(self, numbers: Iterable[str]) -> list[CardInfo | None]:
+        return [self.lookup(n) for n in numbers]
+
+    @property
+    def stats(self) -> dict[str, int]:
+        # Aproximados: se incrementan sin lock desde varios threads
+        return {"entries": len(self._table), "hits": self.hits, "misses": self.misses}
+
+
+_index: BinIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_bin_index() -> BinIndex:
+    """Índice del proceso; se construye la primera vez que se usa."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = BinIndex.from_file(getattr(settings, "BIN_DATA_FILE", DEFAULT_BIN_FILE))
+    return _index
+
+
+def bin_index_stats() -> dict[str, int]:
+    """stats del índice del proceso; vacío si todavía no se usó (no lo construye)."""
+    return _index.stats if _index is not None else {}
+
+
+def classify_card(number: str) -> CardInfo | None:
+    return get_bin_index().lookup(number)
+
+
+def classify_cards(numbers: Iterable[str]) -> list[CardInfo | None]:
+    return get_bin_index().lookup_many(numbers)
@@ -0,0 +1,90 @@
+"""
+Utilidades compartidas por bankdetails_import / bankdetails_export (y
+bulk_create_users).
+Todo es streaming: se lee y escribe fila por fila para que la memoria no
+crezca con el tamaño del archivo.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import sys
+from contextlib import contextmanager
+from typing import IO, Iterator
+
+from django.core.management.base import CommandError
+
+# Columnas del archivo. `owner` es el email o teléfono del usuario.
+FIELDS = ("owner", "kind", "value", "bank_name", "alias", "phone", "is_public")
+
+FORMATS = ("csv", "jsonl")
+
+
+def guess_format(path: str | None, fmt: str | None) -> str:
+    if fmt:
+        return fmt
+    if path and path.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    return "csv"
+
+
+@contextmanager
+def open_stream(path: str | None, mode: str, default: IO[str] | None = None) -> Iterator[IO[str]]:
+    """Abre `path`, o `default` (stdin/stdout) si es None o '-'."""
+    if not path or path == "-":
+        yield default or (sys.stdin if "r" in mode else sys.stdout)
+        return
+    try:
+        fh = open(path, mode, encoding="utf-8", newline="")
+    except OSError as e:
+        raise CommandError(f"No se pudo abrir {path}: {e}")
+    with fh:
+        yield fh
+
+
+def read_rows(fh: IO[str], fmt: str) -> Iterator[tuple[int, dict]]:
+    """(número de línea, fila) por cada registro; JSON inválido sale como {'__error__': ...}."""
+    if fmt == "csv":
+        reader = csv.DictReader(fh)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for lineno, line in enumerate(fh, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield lineno, {"__error__": f"JSON inválido: {e.msg}"}
+            continue
+        if not isinstance(row, dict):
+            row = {"__error__": "Se esperaba un objeto JSON por línea."}
+        yield lineno, row
+
+
+class RowWriter:
+    """Escribe filas en CSV o JSONL con las columnas dadas."""
+
+    def __init__(self, fh: IO[str], fmt: str, fields=FIELDS):
+        self.fh = fh
+        self.fmt = fmt
+        self.fields = tuple(fields)
+        if fmt == "csv":
+            self._csv = csv.DictWriter(fh, fieldnames=self.fields, extrasaction="ignore")
+            self._csv.writeheader()
+
+    def write(self, row: dict) -> None:
+        if self.fmt == "csv":
+            self._csv.writerow(row)
+        else:
+            # Una sola escritura por fila: OutputWrapper agrega "\n" si falta
+            self.fh.write(json.dumps({f: row.get(f) for f in self.fields}, ensure_ascii=False) + "\n")
+
+
+def parse_bool(value, default: bool = True) -> bool:
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in {"1", "true", "t", "yes", "y", "si", "sí"}
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from bank_details.models import BankDetails, normalize_phone_number
+
+from ._bankdetails_io import FORMATS, RowWriter, guess_format, open_stream
+
+
+class Command(BaseCommand):
+    help = "Exporta BankDetails a CSV o JSONL (archivo o stdout), en el formato que lee bankdetails_import."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", "-o", default="-", help="Archivo de salida ('-' para stdout).")
+        parser.add_argument("--format", choices=FORMATS, help="Por defecto se deduce de la extensión (csv).")
+        parser.add_argument("--owner", help="Exporta solo los datos de este email o teléfono.")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        fmt = guess_format(options["output"], options["format"])
+        qs = (
+            BankDetails.objects.select_related("owner")
+            .only(
+                "kind", "value", "bank_name", "alias", "phone", "is_public",
+                "owner__email", "owner__phone",
+            )
+            .order_by("pk")
+        )
+        if owner := options["owner"]:
+            if "@" in owner:
+                qs = qs.filter(owner__email=owner)
+            else:
+                # Mismos formatos que acepta el import (998 123 4567, +52...)
+                qs = qs.filter(owner__phone__in={normalize_phone_number(owner) or owner, owner})
+
+        count = 0
+        with open_stream(options["output"], "w", default=self.stdout) as fh:
+            writer = RowWriter(fh, fmt)
+            # iterator() evita que el queryset guarde millones de filas en memoria
+            for d in qs.iterator(chunk_size=options["chunk_size"]):
+                writer.write({
+                    "owner": d.owner.email or d.owner.phone,
+                    "kind": d.kind,
+                    "value": d.value,
+                    "bank_name": d.bank_name,
+                    "alias": d.alias,
+                    "phone": d.phone,
+                    "is_public": d.is_public,
+                })
+                count += 1
+        self.stderr.write(self.style.SUCCESS(f"{count} filas exportadas."))
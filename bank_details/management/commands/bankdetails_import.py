@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from accounts.models import User
+from bank_details.models import BankDetails, PublicProfileSnapshot, normalize_phone_number
+from bank_details.profile_cache import bump_profile_versions
+
+from ._bankdetails_io import FIELDS, FORMATS, RowWriter, guess_format, open_stream, parse_bool, read_rows
+
+# Campos que se sobreescriben cuando ya existe la fila (owner, kind)
+UPDATE_FIELDS = [
+    "value", "bank_code", "bank_name", "bank_name_source", "plaza",
+    "brand", "alias", "phone", "is_public", "updated_at",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa BankDetails desde CSV o JSONL (archivo o stdin) en lotes. "
+        "Cada fila pasa por BankDetails.clean(); las inválidas van al archivo de rechazos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", nargs="?", default="-", help="Archivo a importar ('-' para stdin).")
+        parser.add_argument("--format", choices=FORMATS, help="Por defecto se deduce de la extensión (csv).")
+        parser.add_argument("--rejects", help="Archivo donde escribir las filas rechazadas con su error.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="Solo valida, no escribe en la base de datos.")
+
+    def handle(self, *args, **options):
+        fmt = guess_format(options["input"], options["format"])
+        self.batch_size = max(1, options["batch_size"])
+        self.dry_run = options["dry_run"]
+        self.imported = self.rejected = 0
+        started = time.monotonic()
+
+        with open_stream(options["input"], "r") as fh:
+            if options["rejects"]:
+                with open_stream(options["rejects"], "w", default=self.stderr) as rejects_fh:
+                    self.rejects = RowWriter(rejects_fh, fmt, fields=("line",) + FIELDS + ("error",))
+                    self._run(read_rows(fh, fmt))
+            else:
+                self.rejects = None
+                self._run(read_rows(fh, fmt))
+
+        elapsed = time.monotonic() - started
+        verb = "validadas" if self.dry_run else "importadas"
+        self.stdout.write(self.style.SUCCESS(
+            f"{self.imported} filas {verb}, {self.rejected} rechazadas en {elapsed:.1f}s."
+        ))
+
+    def _run(self, rows):
+        batch = []
+        for lineno, row in rows:
+            batch.append((lineno, row))
+            if len(batch) >= self.batch_size:
+                self._flush(batch)
+                batch = []
+        if batch:
+            self._flush(batch)
+
+    def _reject(self, lineno: int, row: dict, error: str) -> None:
+        self.rejected += 1
+        if self.rejects is not None:
+            self.rejects.write({**row, "line": lineno, "error": error})
+        else:
+            self.stderr.write(f"línea {lineno}: {error}")
+
+    @staticmethod
+    def _owner_keys(row: dict) -> list[str]:
+        """
+        Valores con los que se busca al dueño de la fila: su email, o su
+        teléfono como se guarda (+52XXXXXXXXXX) y tal como viene en el archivo.
+        """
+        owner = str(row.get("owner") or "").strip()
+        if "@" in owner:
+            return [User.objects.normalize_email(owner)]
+        return [key for key in (normalize_phone_number(owner), owner) if key]
+
+    def _resolve_owners(self, batch) -> dict[str, User]:
+        """Una consulta por lote para todos los dueños (email o teléfono)."""
+        emails, phones = set(), set()
+        for _, row in batch:
+            for key in self._owner_keys(row):
+                (emails if "@" in key else phones).add(key)
+        users = User.objects.filter(Q(email__in=emails) | Q(phone__in=phones)).only(
+            "pk", "email", "phone", "public_slug"
+        )
+        owners = {}
+        for user in users:
+            if user.email:
+                owners[user.email] = user
+            if user.phone:
+                owners[user.phone] = user
+        return owners
+
+    def _flush(self, batch) -> None:
+        owners = self._resolve_owners(batch)
+        # (owner, kind) -> objeto; la última fila gana para no chocar dos veces
+        # con la misma fila en el ON CONFLICT
+        objs: dict[tuple[int, str], BankDetails] = {}
+
+        for lineno, row in batch:
+            if "__error__" in row:
+                self._reject(lineno, {}, row["__error__"])
+                continue
+            owner = next((owners[key] for key in self._owner_keys(row) if key in owners), None)
+            if owner is None:
+                self._reject(lineno, row, "Usuario no encontrado.")
+                continue
+            obj = BankDetails(
+                owner=owner,
+                kind=(row.get("kind") or "").strip().upper(),
+                value=str(row.get("value") or ""),
+                bank_name=str(row.get("bank_name") or ""),
+                alias=str(row.get("alias") or ""),
+                phone=str(row.get("phone") or ""),
+                is_public=parse_bool(row.get("is_public")),
+            )
+            try:
+                # Mismas reglas que save(), sin las consultas de validate_unique
+                obj.clean_fields(exclude=["owner"])
+                obj.clean()
+            except ValidationError as e:
+                self._reject(lineno, row, "; ".join(
+                    f"{field}: {' '.join(msgs)}" for field, msgs in e.message_dict.items()
+                ))
+                continue
+            objs[(owner.pk, obj.kind)] = obj
+
+        if not objs:
+            return
+        if not self.dry_run:
+            with transaction.atomic():
+                BankDetails.objects.bulk_create(
+                    objs.values(),
+                    update_conflicts=True,
+                    unique_fields=["owner", "kind"],
+                    update_fields=UPDATE_FIELDS,
+                )
+                PublicProfileSnapshot.rebuild_many(owner_pk for owner_pk, _ in objs)
+            # bulk_create no pasa por save(): invalida los perfiles a mano
+            bump_profile_versions(obj.owner.public_slug for obj in objs.values())
+        self.imported += len(objs)
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from accounts.models import User
+from bank_details.models import PublicProfileSnapshot
+from bank_details.profile_cache import bump_profile_versions
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye los snapshots del perfil público (PublicProfileSnapshot). "
+        "Úsalo tras migrar o tras cargas que no pasan por save()."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--owner", action="append", default=[],
+                            help="Email o public_slug; repetible. Por defecto, todos los usuarios.")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **opts):
+        users = User.objects.order_by("pk")
+        if opts["owner"]:
+            users = users.filter(email__in=opts["owner"]) | users.filter(public_slug__in=opts["owner"])
+
+        total = 0
+        batch: list[tuple[int, str]] = []
+        for row in users.values_list("pk", "public_slug").iterator(chunk_size=opts["batch_size"]):
+            batch.append(row)
+            if len(batch) >= opts["batch_size"]:
+                total += self._flush(batch)
+        total += self._flush(batch)
+        self.stdout.write(self.style.SUCCESS(f"{total} snapshots reconstruidos."))
+
+    def _flush(self, batch: list[tuple[int, str]]) -> int:
+        if not batch:
+            return 0
+        PublicProfileSnapshot.rebuild_many(pk for pk, _ in batch)
+        bump_profile_versions(slug for _, slug in batch)
+        n = len(batch)
+        batch.clear()
+        return n
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from bank_details.bank_codes import get_registry, load_registry, publish_registry, registry_path, write_registry
+
+
+def _read_codes(path: str) -> dict[str, str]:
+    """CSV con columnas `code,name` (como la lista de participantes de Banxico)."""
+    codes = {}
+    try:
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            reader = csv.DictReader(f)
+            if not reader.fieldnames or not {"code", "name"} <= {c.strip().lower() for c in reader.fieldnames}:
+                raise CommandError(f"{path}: se esperaban las columnas 'code,name'.")
+            for line, row in enumerate(reader, start=2):
+                row = {k.strip().lower(): (v or "").strip() for k, v in row.items() if k}
+                code, name = row["code"].zfill(3), row["name"]
+                if not (code.isdigit() and len(code) == 3 and name):
+                    raise CommandError(f"{path}:{line}: código o nombre inválido ({row['code']!r}).")
+                codes[code] = name
+    except OSError as e:
+        raise CommandError(f"No se pudo leer {path}: {e}")
+    return codes
+
+
+class Command(BaseCommand):
+    help = (
+        "Actualiza el catálogo de bancos (dígitos 1–3 de la CLABE) y plazas (4–6) "
+        "desde archivos CSV locales. Los workers lo recargan solos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--banks", help="CSV code,name con los participantes (bancos).")
+        parser.add_argument("--plazas", help="CSV code,name con las plazas.")
+        parser.add_argument("--output", help="Snapshot a escribir (por defecto settings.BANK_CODES_FILE).")
+
+    def handle(self, *args, **options):
+        if not options["banks"] and not options["plazas"]:
+            raise CommandError("Indica --banks y/o --plazas.")
+
+        current = get_registry()
+        banks = _read_codes(options["banks"]) if options["banks"] else dict(current.banks)
+        plazas = _read_codes(options["plazas"]) if options["plazas"] else dict(current.plazas)
+
+        digest = hashlib.sha1(
+            json.dumps([banks, plazas], sort_keys=True).encode("utf-8")
+        ).hexdigest()[:8]
+        now = timezone.now()
+        version = f"{now:%Y%m%d%H%M%S}-{digest}"
+        path = options["output"] or registry_path()
+        write_registry(path, banks, plazas, version, int(now.timestamp()))
+        # Para workers que no comparten este disco
+        publish_registry(load_registry(path))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Catálogo {version}: {len(banks)} bancos, {len(plazas)} plazas -> {path}"
+        ))
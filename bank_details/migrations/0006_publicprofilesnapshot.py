@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank_details', '0005_bankdetails_phone_alter_bankdetails_kind'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublicProfileSnapshot',
+            fields=[
+                ('public_slug', models.SlugField(max_length=100, primary_key=True, serialize=False)),
+                ('payload', models.JSONField(default=dict)),
+                ('etag', models.CharField(max_length=32)),
+                ('last_modified', models.DateTimeField(blank=True, null=True)),
+                ('rebuilt_at', models.DateTimeField(auto_now=True)),
+                ('owner', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='public_profile_snapshot', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank_details', '0006_publicprofilesnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bankdetails',
+            name='plaza',
+            field=models.CharField(blank=True, max_length=80),
+        ),
+    ]
@@ -1,14 +1,29 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import re
+import threading
+from collections import defaultdict
+from functools import partial
+from zoneinfo import ZoneInfo
+
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .bank_codes import resolve_clabe
+from .bins import CardInfo, classify_card
+from .profile_cache import bump_profile_version, bump_profile_versions
 
 # Credit Card Checker
 
 def luhn_check(number: str) -> bool:
-    """Luhn mod-10 for card numbers."""
+    """Luhn mod-10 for card numbers. Vacío o con algo que no sea 0-9 es False (igual que luhn_check_batch)."""
+    if not re.fullmatch(r"[0-9]+", number):
+        return False
     digits = [int(d) for d in number]
     checksum = 0
     parity = len(digits) % 2
@@ -35,49 +50,41 @@ def clabe_checksum_ok(clabe: str) -> bool:
     return check == int(clabe[17])
 
 
+def _card_brand(info: CardInfo | None) -> str:
+    # Solo marcas de BankDetails.Brand; cualquier otra es "Other"
+    if info is not None and info.brand in BankDetails.Brand.values:
+        return info.brand
+    return BankDetails.Brand.OTHER
+
+
 def detect_card_brand(number: str) -> str:
-    """
-    Detecta marca básica sin APIs:
-      - VISA: empieza con 4 (16 dígitos en este MVP)
-      - MasterCard: 51–55 o 2221–2720
-      - Si no coincide: OTHER
-    """
+    """Marca de la tarjeta según la tabla de BINs (ver bins.py); OTHER si no son 16 dígitos."""
     if len(number) != 16:
-        return "Other"
-    if number.startswith("4"):
-        return "Visa"
-    two = int(number[:2])
-    four = int(number[:4])
-    if 51 <= two <= 55 or 2221 <= four <= 2720:
-        return "MasterCard"
-    return "Other"
+        return BankDetails.Brand.OTHER
+    return _card_brand(classify_card(number))
 
 
-def validate_phone_number(phone: str) -> bool:
+def normalize_phone_number(phone: str | None) -> str | None:
     """
-    Valida número telefónico mexicano (formato: +52 seguido de 10 dígitos).
-    Acepta formatos: +521234567890, +52 123 456 7890, +52-123-456-7890
+    Forma canónica (+52 y 10 dígitos) de un teléfono mexicano, o None si no
+    es válido. 998 123 4567, +52-998-123-4567 y 9981234567 dan +529981234567.
     """
     if not phone:
-        return False
+        return None
     # Normaliza: quita espacios, guiones y paréntesis
     normalized = re.sub(r"[\s\-()]+", "", phone)
     # Acepta +52 seguido de 10 dígitos o solo 10 dígitos
-    return bool(re.fullmatch(r"\+52\d{10}|\d{10}", normalized))
-
-
-# Mapeo mínimo (extiende cuando quieras)
-BANK_CODE_MAP = {
-    "002": "Citibanamex",
-    "012": "BBVA",
-    "014": "Santander",
-    "021": "HSBC",
-    "072": "Banorte",
-    "638": "Nu Bank",
-    "722": "Mercado Pago",
-    "130": "Compartamos Banco"
-    # TODO: añadir mas codigos de bancos
-}
+    match = re.fullmatch(r"(?:\+52)?(\d{10})", normalized)
+    return f"+52{match[1]}" if match else None
+
+
+def validate_phone_number(phone: str) -> bool:
+    """
+    Valida número telefónico mexicano (formato: +52 seguido de 10 dígitos).
+    Acepta formatos: +521234567890, +52 123 456 7890, +52-123-456-7890
+    """
+    return normalize_phone_number(phone) is not None
+
 
 class BankDetails(models.Model):
     class Kind(models.TextChoices):
@@ -110,6 +117,7 @@ class BankDetails(models.Model):
     bank_name_source = models.CharField(
         max_length=8, choices=BankNameSource.choices, default=BankNameSource.AUTO
     )
+    plaza = models.CharField(max_length=80, blank=True)  # solo para CLABE (dígitos 4–6)
 
     brand = models.CharField(  # solo para CARD
         max_length=16, choices=Brand.choices, blank=True
@@ -174,6 +182,7 @@ class BankDetails(models.Model):
             # Limpia campos que no aplican
             self.bank_code = ""
             self.bank_name = ""
+            self.plaza = ""
             self.brand = ""
             self.phone = ""  # El número ya está en value
 
@@ -184,8 +193,9 @@ class BankDetails(models.Model):
                 raise ValidationError({"value": "La CLABE Interbancaria no es válida."})
 
             self.bank_code = val[:3]
+            # Banco y plaza en una sola lectura del catálogo (en memoria)
+            suggestion, self.plaza = resolve_clabe(val)
             # Autocompleta bank_name si está vacío o si está en modo AUTO
-            suggestion = BANK_CODE_MAP.get(self.bank_code, "")
             if self.bank_name and self.bank_name.strip():
                 self.bank_name_source = self.BankNameSource.MANUAL
             else:
@@ -201,14 +211,18 @@ class BankDetails(models.Model):
             if not luhn_check(val):
                 raise ValidationError({"value": "El número de tarjeta falló la verificación Luhn."})
             self.brand = detect_card_brand(val)
-            # bank_code no aplica a tarjetas; limpia por si acaso
+            # bank_code y plaza no aplican a tarjetas; limpia por si acaso.
+            # La tabla de BINs incluida no trae emisores: bank_name queda como
+            # lo haya puesto el usuario
             self.bank_code = ""
+            self.plaza = ""
 
         elif self.kind == self.Kind.ACCOUNT:
             if not re.fullmatch(r"\d{6,20}", val):
                 raise ValidationError({"value": "El número de cuenta debe tener entre 6 y 20 dígitos."})
             # No hay autocompletado; respeta bank_name manual si existe
             self.bank_code = ""
+            self.plaza = ""
             self.brand = ""
 
         else:
@@ -217,7 +231,12 @@ class BankDetails(models.Model):
     def save(self, *args, **kwargs):
         # Garantiza que clean() se ejecute al guardar (incluye normalización)
         self.full_clean()
-        return super().save(*args, **kwargs)
+        # El snapshot del perfil público se reconstruye en la misma transacción
+        with transaction.atomic():
+            result = super().save(*args, **kwargs)
+            PublicProfileSnapshot.rebuild_for(self.owner)
+        bump_profile_version(self.owner.public_slug)
+        return result
 
     # ---- Utilidades de presentación -----------------------------------------
     @property
@@ -233,4 +252,148 @@ class BankDetails(models.Model):
         if self.kind == self.Kind.CLABE:
             return f"{v[:3]}{'*' * 12}{v[-3:]}"  # 123 ************ 456
         # ACCOUNT: muestra últimos 4
-        return f"{'*' * max(0, len(v) - 4)}{v[-4:]}"
\ No newline at end of file
+        return f"{'*' * max(0, len(v) - 4)}{v[-4:]}"
+
+
+class PublicProfileSnapshot(models.Model):
+    """
+    Perfil público ya armado: dueño + datos públicos ordenados y listos para
+    la plantilla (nombre a mostrar, fechas ya formateadas). Se reconstruye
+    en la misma transacción que cualquier cambio de BankDetails o de los
+    campos públicos del usuario (los borrados, al hacer commit; ver
+    _rebuild_after_delete), así /u/<slug>/ es una búsqueda por PK.
+    """
+    public_slug = models.SlugField(max_length=100, primary_key=True)
+    owner = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="public_profile_snapshot",
+    )
+    payload = models.JSONField(default=dict)
+    etag = models.CharField(max_length=32)
+    # max(updated_at) de los datos públicos, para Last-Modified
+    last_modified = models.DateTimeField(null=True, blank=True)
+    rebuilt_at = models.DateTimeField(auto_now=True)
+
+    DISPLAY_TZ = "America/Mexico_City"
+    # Súbelo al cambiar la forma de `payload`: los snapshots viejos se
+    # reconstruyen al primer request (ver views._profile_snapshot)
+    PAYLOAD_FORMAT = 2
+
+    def __str__(self) -> str:
+        return f"Snapshot · {self.public_slug}"
+
+    @classmethod
+    def build(cls, owner, details) -> "PublicProfileSnapshot":
+        """
+        Arma (sin guardar) el snapshot de `owner` con sus BankDetails públicos.
+        `sections` agrupa por tipo en una sola pasada ({"clabe": [...], ...},
+        solo tipos con datos) para que la plantilla no filtre ni ordene.
+        """
+        tz = ZoneInfo(cls.DISPLAY_TZ)
+        sections: dict[str, list[dict]] = {}
+        last_modified = None
+        for d in sorted(details, key=lambda d: d.updated_at, reverse=True):
+            sections.setdefault(d.kind.lower(), []).append({
+                "value": d.value,
+                "bank_code": d.bank_code,
+                "bank_name": d.bank_name,
+                "brand": d.brand,
+                "alias": d.alias,
+                "updated_display": d.updated_at.astimezone(tz).strftime("%d/%m/%Y %H:%M"),
+                "created_display": d.created_at.astimezone(tz).strftime("%d/%m/%Y"),
+            })
+            last_modified = last_modified or d.updated_at
+        payload = {
+            "format": cls.PAYLOAD_FORMAT,
+            "owner": {
+                "name": owner.display_name or owner.email or "",
+                "public_slug": owner.public_slug,
+            },
+            "sections": sections,
+        }
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        return cls(
+            public_slug=owner.public_slug,
+            owner_id=owner.pk,
+            payload=payload,
+            etag=hashlib.md5(raw).hexdigest(),
+            last_modified=last_modified,
+        )
+
+    @classmethod
+    def _save_all(cls, owner_ids, snapshots: list[PublicProfileSnapshot]) -> list[PublicProfileSnapshot]:
+        """
+        Guarda los snapshots de `owner_ids` con un upsert por slug: dos
+        rebuilds concurrentes del mismo perfil no chocan en el PK. Antes borra
+        los que ya no van (dueño inactivo o borrado, o slug cambiado).
+        """
+        with transaction.atomic():
+            cls.objects.filter(owner_id__in=owner_ids).exclude(
+                public_slug__in=[s.public_slug for s in snapshots]
+            ).delete()
+            return cls.objects.bulk_create(
+                snapshots,
+                update_conflicts=True,
+                unique_fields=["public_slug"],
+                update_fields=["owner", "payload", "etag", "last_modified", "rebuilt_at"],
+            )
+
+    @classmethod
+    def rebuild_for(cls, owner, *, created: bool = False) -> PublicProfileSnapshot | None:
+        """
+        Reconstruye el snapshot de un usuario (None si está inactivo).
+        `created`: usuario recién insertado, sin datos ni snapshot previos.
+        """
+        if not owner.is_active:
+            if not created:
+                cls.objects.filter(owner_id=owner.pk).delete()
+            return None
+        details = [] if created else list(BankDetails.objects.filter(owner_id=owner.pk, is_public=True))
+        snapshot = cls.build(owner, details)
+        if created:
+            snapshot.save(force_insert=True)
+        else:
+            cls._save_all([owner.pk], [snapshot])
+        return snapshot
+
+    @classmethod
+    def rebuild_many(cls, owner_ids) -> list[PublicProfileSnapshot]:
+        """
+        Igual que rebuild_for() para muchos usuarios, con un número fijo de
+        consultas. Regresa los snapshots armados (solo usuarios activos).
+        """
+        from django.contrib.auth import get_user_model
+
+        owner_ids = set(owner_ids)
+        by_owner: dict[int, list[BankDetails]] = {pk: [] for pk in owner_ids}
+        for d in BankDetails.objects.filter(owner_id__in=owner_ids, is_public=True):
+            by_owner[d.owner_id].append(d)
+        owners = get_user_model().objects.filter(pk__in=owner_ids, is_active=True)
+        return cls._save_all(owner_ids, [cls.build(o, by_owner[o.pk]) for o in owners])
+
+
+class _PendingRebuilds(threading.local):
+    def __init__(self):
+        self.owner_ids: dict[str, set[int]] = defaultdict(set)  # alias de BD -> dueños
+
+
+_pending_rebuilds = _PendingRebuilds()
+
+
+@receiver(post_delete, sender=BankDetails)
+def _rebuild_after_delete(sender, instance, using, **kwargs):
+    # Cubre también los borrados que no pasan por delete(): acción "eliminar
+    # seleccionados" del admin, queryset.delete() y cascadas. Se junta por
+    # transacción y se reconstruye al hacer commit, cuando el dueño pudo haber
+    # sido borrado también (rebuild_many lo omite)
+    _pending_rebuilds.owner_ids[using].add(instance.owner_id)
+    transaction.on_commit(partial(_rebuild_deleted_owners, using), using=using)
+
+
+def _rebuild_deleted_owners(using: str) -> None:
+    # El primer callback del commit se lleva todos; los demás no encuentran nada
+    owner_ids = _pending_rebuilds.owner_ids.pop(using, None)
+    if owner_ids:
+        snapshots = PublicProfileSnapshot.rebuild_many(owner_ids)
+        bump_profile_versions(s.public_slug for s in snapshots)
@@ -0,0 +1,133 @@
+"""
+Caché del perfil público (/u/<slug>/).
+
+El HTML renderizado se guarda bajo una llave que incluye la versión del
+perfil; las entradas viejas quedan huérfanas y expiran solas.
+
+Con un caché compartido (Redis) cada slug tiene un contador de versión y
+para invalidar basta con incrementarlo (bump) al confirmar la transacción:
+un hit no toca la base de datos. Sin él, un bump solo lo vería el proceso
+que lo hizo, así que la versión es el ETag del snapshot, leído de la BD en
+cada request (ver views.public_profile).
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import time
+from functools import lru_cache, partial
+from typing import Iterable
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+
+from cobrando_la.cache import is_shared, namespace
+
+KEY_PREFIX = "public_profile"
+
+TEMPLATE_NAME = "bank_details/public_profile.html"
+
+# Alias "profiles" de CACHES: versiones, HTML y validadores del perfil
+cache = namespace("profiles")
+
+
+def versions_shared() -> bool:
+    """True si los contadores de versión los ven todos los workers y comandos."""
+    return is_shared("profiles")
+
+
+def _version_key(slug: str) -> str:
+    return f"{KEY_PREFIX}:version:{slug}"
+
+
+def _initial_version() -> int:
+    # Si la llave de versión se pierde (eviction/reinicio), no podemos volver
+    # a empezar en 1: reutilizaríamos páginas viejas. Usamos el reloj.
+    return time.time_ns()
+
+
+def get_profile_version(slug: str) -> int:
+    """Versión actual del perfil; la inicializa si no existe."""
+    key = _version_key(slug)
+    version = cache.get(key)
+    if version is None:
+        version = _initial_version()
+        if not cache.add(key, version, timeout=None):
+            # Otro worker la creó primero
+            version = cache.get(key, version)
+    return version
+
+
+async def aget_profile_version(slug: str) -> int:
+    """Versión async de get_profile_version() para vistas async."""
+    key = _version_key(slug)
+    version = await cache.aget(key)
+    if version is None:
+        version = _initial_version()
+        if not await cache.aadd(key, version, timeout=None):
+            version = await cache.aget(key, version)
+    return version
+
+
+def _bump(slugs: set[str]) -> None:
+    for slug in slugs:
+        key = _version_key(slug)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial_version(), timeout=None)
+
+
+def bump_profile_versions(slugs: Iterable[str | None]) -> None:
+    """
+    Invalida todas las páginas cacheadas de estos slugs al confirmar la
+    transacción en curso (de inmediato si no hay). Antes del COMMIT otro
+    worker podría cachear los datos viejos bajo la versión nueva.
+    """
+    slugs = {slug for slug in slugs if slug}
+    if slugs and versions_shared():
+        transaction.on_commit(partial(_bump, slugs))
+
+
+def bump_profile_version(slug: str | None) -> None:
+    bump_profile_versions([slug])
+
+
+@lru_cache(maxsize=None)
+def render_version() -> tuple[str, int]:
+    """
+    (hash, mtime) de lo que cambia el HTML sin cambiar los datos del perfil:
+    la plantilla, el manifest de collectstatic (nombres con hash de CSS, JS y
+    SVG) y DEPLOY_VERSION. Entra al ETag, a Last-Modified y a la llave del
+    HTML: tras un deploy nadie recibe un 304 con el markup viejo.
+    """
+    from django.contrib.staticfiles.storage import staticfiles_storage
+    from django.template.loader import get_template
+
+    digest = hashlib.md5(getattr(settings, "DEPLOY_VERSION", "").encode())
+    paths = [get_template(TEMPLATE_NAME).origin.name]
+    manifest = getattr(staticfiles_storage, "manifest_name", None)
+    if manifest and staticfiles_storage.exists(manifest):
+        paths.append(staticfiles_storage.path(manifest))
+    mtime = 0
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+        mtime = max(mtime, int(os.stat(path).st_mtime))
+    return digest.hexdigest()[:8], mtime
+
+
+@receiver(setting_changed)
+def _reset_render_version(*, setting, **kwargs):
+    if setting in {"DEPLOY_VERSION", "STATIC_ROOT", "STORAGES", "TEMPLATES"}:
+        render_version.cache_clear()
+
+
+def render_cache_key(slug: str, version: int | str) -> str:
+    return f"{KEY_PREFIX}:html:{render_version()[0]}:{slug}:{version}"
+
+
+def render_cache_timeout() -> int:
+    return getattr(settings, "PUBLIC_PROFILE_CACHE_TIMEOUT", 60 * 60)
@@ -1,21 +1,72 @@
 # bank_details/templatetags/inline_svg.py
+import os
+
 from django import template
+from django.conf import settings
 from django.contrib.staticfiles import finders
 from django.utils.safestring import mark_safe
 
 register = template.Library()
 
+# Caché por proceso: ruta estática -> (ruta absoluta, mtime, contenido).
+# Una ruta que no existe se guarda como None para no volver a buscarla.
+_svg_cache: dict[str, tuple[str, float, str] | None] = {}
+
+
+def _check_mtime() -> bool:
+    # En DEBUG revisamos el archivo para ver cambios sin reiniciar el server
+    return getattr(settings, "INLINE_SVG_CHECK_MTIME", settings.DEBUG)
+
+
+def _load_svg(path: str, full: str | None = None) -> tuple[str, float, str] | None:
+    full = full or finders.find(path)
+    if not full:
+        return None
+    try:
+        mtime = os.stat(full).st_mtime
+        with open(full, "r", encoding="utf-8") as f:
+            return full, mtime, f.read()
+    except OSError:
+        return None
+
+
+def warm_svg_cache(prefix: str = "brands/") -> int:
+    """
+    Precarga todos los SVG estáticos bajo `prefix` para que el render
+    nunca toque el disco. Se llama desde BankDetailsConfig.ready().
+    """
+    loaded = 0
+    for finder in finders.get_finders():
+        for path, storage in finder.list([]):
+            path = path.replace(os.sep, "/")
+            if not path.startswith(prefix) or not path.endswith(".svg"):
+                continue
+            if _svg_cache.get(path) is not None:
+                continue  # el primer finder gana, igual que finders.find()
+            entry = _load_svg(path, storage.path(path))
+            if entry is not None:
+                _svg_cache[path] = entry
+                loaded += 1
+    return loaded
+
+
 @register.simple_tag
 def inline_svg(path: str) -> str:
     """
     Inserta el contenido de un archivo SVG estático inline en la plantilla.
     Uso: {% inline_svg 'brands/visa.svg' %}
     """
-    full = finders.find(path)
-    if not full:
+    if path in _svg_cache:
+        entry = _svg_cache[path]
+        if _check_mtime():
+            try:
+                stale = entry is None or os.stat(entry[0]).st_mtime != entry[1]
+            except OSError:
+                stale = True
+            if stale:
+                entry = _svg_cache[path] = _load_svg(path)
+    else:
+        entry = _svg_cache[path] = _load_svg(path)
+    if entry is None:
         return ""  # opcional: muestra placeholder
-    try:
-        with open(full, "r", encoding="utf-8") as f:
-            return mark_safe(f.read())
-    except Exception:
-        return ""
+    return mark_safe(entry[2])
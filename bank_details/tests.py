@@ -1,3 +1,419 @@
-from django.test import TestCase
+import tempfile
+from inspect import iscoroutinefunction
+from io import StringIO
+from pathlib import Path
+from unittest import skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import User
+from cobrando_la.instrumentation import render_metrics
+from . import bank_codes
+from .batch_validators import clabe_checksum_ok_batch, luhn_check_batch, validate_phone_number_batch
+from .bins import BinIndex, CardInfo, bin_index_stats, classify_card
+from .models import (
+    BankDetails, PublicProfileSnapshot, clabe_checksum_ok, detect_card_brand, luhn_check, validate_phone_number,
+)
+from .profile_cache import cache as profile_cache
+from .views import public_profile, qr_cache
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+
+def _shared_profiles_cache(location: str) -> dict:
+    """CACHES con el alias "profiles" respaldado por un Redis falso (como en producción)."""
+    shared = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://fake:6379/0",
+        "OPTIONS": {"connection_class": fakeredis.FakeConnection, "server": fakeredis.FakeServer()},
+    }
+    return {**settings.CACHES, "profiles": {
+        "BACKEND": "cobrando_la.cache.TieredCache",
+        "LOCATION": location,
+        "KEY_PREFIX": "profiles",
+        "OPTIONS": {"FRONT_TIMEOUT": 2, "SHARED": shared},
+    }}
+
+
+class DashboardQueryCountTests(TestCase):
+    """El dashboard carga los datos del usuario en una sola consulta, sin importar cuántos kinds haya."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email="ana@example.com")
+        BankDetails.objects.create(owner=cls.user, kind=BankDetails.Kind.CLABE, value="002010077777777771")
+        BankDetails.objects.create(owner=cls.user, kind=BankDetails.Kind.CARD, value="4111111111111111")
+        BankDetails.objects.create(owner=cls.user, kind=BankDetails.Kind.PHONE, value="9981234567")
+        BankDetails.objects.create(owner=cls.user, kind=BankDetails.Kind.ACCOUNT, value="12345678")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_get_runs_bounded_queries(self):
+        # sesión + usuario + BankDetails
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("dashboard"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["instances"]["clabe"].value, "002010077777777771")
+        self.assertEqual(set(response.context["forms"]), set(BankDetails.Kind.values))
+
+    def test_invalid_post_reuses_loaded_instances(self):
+        with self.assertNumQueries(3):
+            response = self.client.post(
+                reverse("dashboard"),
+                {"form_kind": BankDetails.Kind.CLABE, "value": "123"},
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["forms"]["CLABE"].errors)
+        self.assertEqual(response.context["instances"]["card"].value, "4111111111111111")
+
+
+class PublicProfileCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email="ana@example.com", display_name="Tacos Ana")
+        cls.clabe = BankDetails.objects.create(owner=cls.user, kind=BankDetails.Kind.CLABE, value="002010077777777771")
+
+    def setUp(self):
+        profile_cache.clear()
+        self.url = reverse("public_profile", args=[self.user.public_slug])
+
+    def test_hit_only_reads_the_snapshot_etag(self):
+        self.assertContains(self.client.get(self.url), "002010077777777771")
+        # Sin Redis: una búsqueda por PK del ETag, sin renderizar
+        with self.assertNumQueries(1):
+            self.assertContains(self.client.get(self.url), "002010077777777771")
+
+    def test_changes_made_by_other_processes_are_served(self):
+        self.client.get(self.url)
+        # Como un comando en otro proceso: su bump no llega a la LRU de este worker
+        BankDetails.objects.filter(pk=self.clabe.pk).update(alias="Nómina")
+        PublicProfileSnapshot.rebuild_many([self.user.pk])
+        self.assertContains(self.client.get(self.url), "Nómina")
+
+    def test_deleted_user_is_not_served(self):
+        self.client.get(self.url)
+        self.user.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    @skipUnless(fakeredis, "requiere fakeredis")
+    def test_shared_versions_are_bumped_on_delete(self):
+        with override_settings(CACHES=_shared_profiles_cache(self.id())):
+            self.client.get(self.url)
+            # Con Redis un hit no toca la base de datos
+            with self.assertNumQueries(0):
+                self.assertEqual(self.client.get(self.url).status_code, 200)
+            with self.captureOnCommitCallbacks(execute=True):
+                User.objects.filter(pk=self.user.pk).delete()
+            self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class PublicProfileConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email="ana@example.com")
+        cls.card = BankDetails.objects.create(owner=cls.user, kind=BankDetails.Kind.CARD, value="4111111111111111")
+
+    def setUp(self):
+        profile_cache.clear()
+        self.url = reverse("public_profile", args=[self.user.public_slug])
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertIn("Last-Modified", response)
+
+    def test_edit_changes_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.card.alias = "Nómina"
+        self.card.save()
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_deploy_changes_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        with override_settings(DEPLOY_VERSION="nuevo-deploy"):
+            response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+
+class PublicProfileAsyncTests(TestCase):
+    """La vista es async: corre igual bajo ASGI (AsyncClient) que bajo WSGI."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email="ana@example.com", display_name="Tacos Ana")
+        BankDetails.objects.create(owner=cls.user, kind=BankDetails.Kind.CLABE, value="002010077777777771")
+
+    def setUp(self):
+        profile_cache.clear()
+        self.url = reverse("public_profile", args=[self.user.public_slug])
+
+    def test_view_is_a_coroutine(self):
+        self.assertTrue(iscoroutinefunction(public_profile))
+
+    async def test_asgi_get_and_conditional_get(self):
+        response = await self.async_client.get(self.url)
+        self.assertContains(response, "Tacos Ana")
+        self.assertEqual(response["Cache-Control"], "no-cache")
+        response = await self.async_client.get(self.url, headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_asgi_unknown_slug_is_404(self):
+        response = await self.async_client.get(reverse("public_profile", args=["nadie"]))
+        self.assertEqual(response.status_code, 404)
+
+
+class PublicProfileSnapshotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email="ana@example.com")
+        cls.clabe = BankDetails.objects.create(owner=cls.user, kind=BankDetails.Kind.CLABE, value="002010077777777771")
+        cls.card = BankDetails.objects.create(owner=cls.user, kind=BankDetails.Kind.CARD, value="4111111111111111")
+
+    def setUp(self):
+        profile_cache.clear()
+        self.url = reverse("public_profile", args=[self.user.public_slug])
+
+    def test_queryset_delete_rebuilds_snapshot(self):
+        self.assertContains(self.client.get(self.url), "002010077777777771")
+        with self.captureOnCommitCallbacks(execute=True):
+            BankDetails.objects.filter(owner=self.user, kind=BankDetails.Kind.CLABE).delete()
+        response = self.client.get(self.url)
+        self.assertNotContains(response, "002010077777777771")
+        self.assertContains(response, "4111111111111111")
+
+    def test_admin_delete_selected_rebuilds_snapshot(self):
+        admin = User.objects.create(email="admin@example.com", is_staff=True, is_superuser=True)
+        self.client.force_login(admin)
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("admin:bank_details_bankdetails_changelist"), {
+                "action": "delete_selected", "post": "yes",
+                "_selected_action": [self.clabe.pk, self.card.pk],
+            })
+        self.assertFalse(BankDetails.objects.exists())
+        self.assertEqual(PublicProfileSnapshot.objects.get(owner=self.user).payload["sections"], {})
+        self.assertNotContains(self.client.get(self.url), "4111111111111111")
+
+    def test_user_cascade_drops_snapshot(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.filter(pk=self.user.pk).delete()
+        self.assertFalse(PublicProfileSnapshot.objects.exists())
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_missing_or_old_snapshot_is_rebuilt_on_request(self):
+        PublicProfileSnapshot.objects.all().delete()
+        self.assertContains(self.client.get(self.url), "002010077777777771")
+        self.assertTrue(PublicProfileSnapshot.objects.filter(pk=self.user.public_slug).exists())
+
+        PublicProfileSnapshot.objects.update(payload={"format": 1})
+        profile_cache.clear()
+        self.assertContains(self.client.get(self.url), "002010077777777771")
+        self.assertEqual(PublicProfileSnapshot.objects.get().payload["format"], PublicProfileSnapshot.PAYLOAD_FORMAT)
+
+    def test_rebuild_is_an_upsert(self):
+        # Dos rebuilds del mismo perfil (p.ej. dos requests a la vez) no chocan en el PK
+        PublicProfileSnapshot.rebuild_for(self.user)
+        PublicProfileSnapshot.rebuild_many([self.user.pk])
+        self.assertEqual(PublicProfileSnapshot.objects.count(), 1)
+        # Si cambia el slug se va el snapshot viejo
+        User.objects.filter(pk=self.user.pk).update(public_slug="nuevo-slug")
+        PublicProfileSnapshot.rebuild_many([self.user.pk])
+        self.assertEqual(list(PublicProfileSnapshot.objects.values_list("pk", flat=True)), ["nuevo-slug"])
+
+class BankDetailsImportTests(TestCase):
+    def test_phone_owner_in_any_format(self):
+        user = User.objects.create(phone="+529981234567")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "datos.csv"
+            path.write_text(
+                "owner,kind,value\n"
+                "998 123 4567,CLABE,002010077777777771\n"
+                "(998) 123-4567,CARD,4111111111111111\n"
+                "5512345678,CARD,4111111111111111\n",
+                encoding="utf-8",
+            )
+            out, err = StringIO(), StringIO()
+            call_command("bankdetails_import", str(path), stdout=out, stderr=err)
+        self.assertIn("2 filas importadas, 1 rechazadas", out.getvalue())
+        self.assertIn("línea 4: Usuario no encontrado.", err.getvalue())
+        self.assertEqual(set(user.bank_details.values_list("kind", flat=True)), {"CLABE", "CARD"})
+
+        out = StringIO()
+        call_command("bankdetails_export", "--owner", "9981234567", stdout=out, stderr=StringIO())
+        self.assertEqual(len(out.getvalue().splitlines()), 3)
+        out = StringIO()
+        call_command("bankdetails_export", "--format", "jsonl", stdout=out, stderr=StringIO())
+        self.assertEqual(len(out.getvalue().splitlines()), 2)
+
+
+    def test_reimport_updates_plaza(self):
+        user = User.objects.create(email="ana@example.com")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "datos.csv"
+            for value in ("002180000000000009", "002320000000000005"):
+                path.write_text(f"owner,kind,value\nana@example.com,CLABE,{value}\n", encoding="utf-8")
+                call_command("bankdetails_import", str(path), stdout=StringIO(), stderr=StringIO())
+        clabe = user.bank_details.get(kind="CLABE")
+        self.assertEqual((clabe.value, clabe.plaza), ("002320000000000005", "Guadalajara"))
+
+class BinIndexTests(TestCase):
+    def test_longest_prefix_wins(self):
+        index = BinIndex([
+            ("4", CardInfo("Visa", "", "")),
+            ("2221-2720", CardInfo("MasterCard", "", "")),
+            ("415231", CardInfo("Visa", "BBVA", "DEBIT")),
+        ])
+        self.assertEqual(index.lookup("4152310000000000").bank, "BBVA")
+        self.assertEqual(index.lookup("4000000000000000").bank, "")
+        self.assertEqual(index.lookup("2720990000000000").brand, "MasterCard")
+        self.assertIsNone(index.lookup("2721000000000000"))
+        self.assertEqual((index.stats["hits"], index.stats["misses"]), (3, 1))
+
+    def test_card_clean_looks_up_once_and_is_exported(self):
+        classify_card("4111111111111111")  # construye el índice del proceso
+        before = bin_index_stats()
+        details = BankDetails(owner=User.objects.create(email="ana@example.com"), kind="CARD", value="5555 5555 5555 4444")
+        details.clean()
+        after = bin_index_stats()
+        self.assertEqual(details.brand, BankDetails.Brand.MASTERCARD)
+        self.assertEqual(after["hits"] + after["misses"] - before["hits"] - before["misses"], 1)
+        self.assertIn(f"cobrando_card_bin_hits_total {after['hits']}", render_metrics())
+
+    def test_detect_card_brand_needs_16_digits(self):
+        self.assertEqual(detect_card_brand("4111111111111111"), BankDetails.Brand.VISA)
+        self.assertEqual(detect_card_brand("5555555555554444"), BankDetails.Brand.MASTERCARD)
+        for number in ("411111111111111", "4111111111111111000", "", "4111 1111 1111 1111"):
+            with self.subTest(number=number):
+                self.assertEqual(detect_card_brand(number), BankDetails.Brand.OTHER)
+
+    def test_card_clean_keeps_bank_name(self):
+        owner = User.objects.create(email="ana@example.com")
+        details = BankDetails(owner=owner, kind="CARD", value="4111111111111111")
+        details.clean()
+        self.assertEqual(details.bank_name, "")
+        details = BankDetails(owner=owner, kind="CARD", value="4111111111111111", bank_name="BBVA")
+        details.clean()
+        self.assertEqual(details.bank_name, "BBVA")
+
+
+@override_settings(BANK_CODES_RELOAD_INTERVAL=0)
+class BankRegistryTests(TestCase):
+    def setUp(self):
+        bank_codes.shared_cache.clear()
+        bank_codes._registry = None
+        self.addCleanup(setattr, bank_codes, "_registry", None)
+        self.addCleanup(bank_codes.shared_cache.clear)
+        self.bundled = bank_codes.get_registry()
+
+    def _publish(self, version, timestamp, banks):
+        bank_codes.publish_registry(bank_codes.BankRegistry(version, timestamp, banks, self.bundled.plazas))
+
+    def test_clabe_clean_resolves_bank_and_plaza(self):
+        details = BankDetails(owner=User.objects.create(email="ana@example.com"), kind="CLABE", value="002 180 000000000012")
+        details.clean()
+        self.assertEqual((details.bank_code, details.bank_name, details.plaza), ("002", "Citibanamex", "Ciudad de México"))
+
+    def test_shared_registry_is_compared_by_timestamp(self):
+        # Etiqueta "mayor" como texto pero generada antes que el bundled: se ignora
+        self._publish("9999-old", self.bundled.timestamp - 1, {"002": "Viejo"})
+        self.assertEqual(bank_codes.get_registry().banks["002"], "Citibanamex")
+        # Etiqueta "menor" como texto pero más reciente: gana
+        self._publish("20261019000000-abcd1234", self.bundled.timestamp + 1, {"002": "Nuevo"})
+        self.assertEqual(bank_codes.get_registry().banks["002"], "Nuevo")
+
+    def test_sync_writes_a_newer_timestamp(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            banks = Path(tmp) / "banks.csv"
+            banks.write_text("code,name\n2,Banamex\n", encoding="utf-8")
+            output = Path(tmp) / "bank_codes.json"
+            call_command("sync_bank_codes", "--banks", str(banks), "--output", str(output), stdout=StringIO())
+            written = bank_codes.load_registry(output)
+        self.assertEqual(dict(written.banks), {"002": "Banamex"})
+        self.assertGreater(written.timestamp, self.bundled.timestamp)
+
+
+class PublicProfileQRTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email="ana@example.com")
+
+    def setUp(self):
+        qr_cache.clear()
+        self.addCleanup(qr_cache.clear)
+
+    def test_svg_and_png(self):
+        svg = self.client.get(reverse("public_profile_qr_svg", args=[self.user.public_slug]))
+        png = self.client.get(reverse("public_profile_qr_png", args=[self.user.public_slug]))
+        self.assertEqual(svg["Content-Type"], "image/svg+xml")
+        self.assertIn(b"<svg", svg.content)
+        self.assertEqual(png["Content-Type"], "image/png")
+        self.assertTrue(png.content.startswith(b"\x89PNG"))
+        self.assertIn("max-age=31536000", png["Cache-Control"])
+
+    def test_size_is_clamped(self):
+        url = reverse("public_profile_qr_png", args=[self.user.public_slug])
+        default = self.client.get(url).content
+        self.assertEqual(self.client.get(url, {"size": "nope"}).content, default)
+        self.assertEqual(self.client.get(url, {"size": 500}).content, self.client.get(url, {"size": 20}).content)
+        self.assertEqual(self.client.get(url, {"size": -3}).content, self.client.get(url, {"size": 1}).content)
+        self.assertLess(len(self.client.get(url, {"size": 1}).content), len(default))
+
+    def test_profile_edit_keeps_cached_qr(self):
+        url = reverse("public_profile_qr_svg", args=[self.user.public_slug])
+        self.client.get(url)
+        BankDetails.objects.create(owner=self.user, kind=BankDetails.Kind.CLABE, value="002010077777777771")
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_unknown_slug_is_404(self):
+        self.assertEqual(self.client.get(reverse("public_profile_qr_svg", args=["nadie"])).status_code, 404)
+
+
+class BatchValidatorTests(SimpleTestCase):
+    """Las versiones por lote dan lo mismo que las escalares, entrada por entrada."""
+
+    CASES = {
+        "luhn": (luhn_check, luhn_check_batch, [
+            "4111111111111111", "5555555555554444", "378282246310005", "0", "18", "79927398713",
+            "4111111111111112", "411111111111111", "41111111111111111", "4111-1111-1111-1111",
+            "4111 1111 1111 1111", "4111a11111111111", "",
+        ]),
+        "clabe": (clabe_checksum_ok, clabe_checksum_ok_batch, [
+            "002010077777777771", "002180000000000012", "002320000000000005",
+            "002010077777777772", "00201007777777777", "0020100777777777710", "002-010077777777771",
+            "00201007777777777a", "",
+        ]),
+        "phone": (validate_phone_number, validate_phone_number_batch, [
+            "9981234567", "+529981234567", "998 123 4567", "(998) 123-4567", "+52 998-123-4567",
+            "998123456", "99812345678", "+52998123456", "+519981234567", "52 9981234567",
+            "998.123.4567", "99812345a7", "",
+        ]),
+    }
+
+    def test_batch_matches_scalar(self):
+        for name, (scalar, batch, values) in self.CASES.items():
+            with self.subTest(validator=name):
+                self.assertEqual(batch(values).tolist(), [scalar(v) for v in values])
+                self.assertFalse(scalar(""))
+                # Cada entrada sola (otro ancho de arreglo) da lo mismo
+                for value in values:
+                    self.assertEqual(batch([value]).tolist(), [scalar(value)], value)
+
+    def test_empty_batch(self):
+        for name, (_, batch, _) in self.CASES.items():
+            with self.subTest(validator=name):
+                self.assertEqual(batch([]).tolist(), [])
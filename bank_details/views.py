@@ -1,21 +1,128 @@
+import hashlib
+import io
+
+import segno
+from asgiref.sync import sync_to_async
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.shortcuts import render, redirect, get_object_or_404
+from django.http import Http404, HttpResponse
+from django.shortcuts import render, redirect
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.utils.http import http_date
+from django.views.decorators.cache import cache_control
 from accounts.models import User
-from .models import BankDetails
+from .models import BankDetails, PublicProfileSnapshot
 from .forms import BankDetailsForm
+from cobrando_la.cache import namespace
+from .profile_cache import (
+    TEMPLATE_NAME, aget_profile_version, cache, render_cache_key, render_cache_timeout, render_version,
+    versions_shared,
+)
 
-def public_profile(request, public_slug: str):
-    user = get_object_or_404(User, public_slug=public_slug, is_active=True)
-    details = (
-        BankDetails.objects.filter(owner=user, is_public=True)
-        .order_by("kind", "-updated_at")
-    )
-    return render(
-        request,
-        "bank_details/public_profile.html",
-        {"owner": user, "details": details},
-    )
+qr_cache = namespace("svg")
+
+async def _profile_snapshot(public_slug: str):
+    """Snapshot del perfil (una búsqueda por PK), o None si no existe."""
+    try:
+        snapshot = await PublicProfileSnapshot.objects.aget(pk=public_slug)
+    except PublicProfileSnapshot.DoesNotExist:
+        # Usuarios dados de alta por bulk_create (sin save()) aún no tienen
+        # snapshot: se arma una vez y queda guardado
+        user = await User.objects.filter(public_slug=public_slug, is_active=True).afirst()
+    else:
+        if snapshot.payload.get("format") == PublicProfileSnapshot.PAYLOAD_FORMAT:
+            return snapshot
+        # Armado con una versión anterior del payload
+        user = await User.objects.aget(pk=snapshot.owner_id)
+    if user is None:
+        return None
+    # Upsert por slug: si otro request lo armó primero, se sobreescribe igual
+    return await sync_to_async(PublicProfileSnapshot.rebuild_for)(user)
+
+
+async def _profile_version(public_slug: str, shared: bool):
+    if shared:
+        return await aget_profile_version(public_slug)
+    # Sin caché compartido un bump solo lo vería el proceso que lo hizo: la
+    # versión es el ETag del snapshot (una búsqueda por PK, sin el payload).
+    # None si no hay snapshot (perfil inexistente o por armar)
+    return await PublicProfileSnapshot.objects.filter(pk=public_slug).values_list("etag", flat=True).afirst()
+
+
+# Vista async: bajo ASGI (uvicorn) un proceso atiende muchos clientes lentos
+# sin ocupar un thread por cada uno; bajo WSGI Django la corre igual.
+# no-cache: navegadores y CDN pueden guardarlo pero deben revalidar.
+@cache_control(no_cache=True)
+async def public_profile(request, public_slug: str):
+    shared = versions_shared()
+    version = await _profile_version(public_slug, shared)
+    # (etag, last_modified, html). La página solo cambia cuando el dueño edita
+    # sus datos (ver profile_cache); con Redis un hit no toca la base de datos.
+    cached = None if version is None else await cache.aget(render_cache_key(public_slug, version))
+    if cached is None:
+        snapshot = await _profile_snapshot(public_slug)
+        if snapshot is None:
+            raise Http404("No User matches the given query.")
+        # El payload ya viene ordenado y formateado: solo se renderiza
+        html = render_to_string(TEMPLATE_NAME, snapshot.payload, request=request)
+        # Datos + deploy (plantilla y estáticos): cualquiera de los dos cambia la página
+        deploy_hash, deploy_mtime = render_version()
+        last_modified = int(snapshot.last_modified.timestamp()) if snapshot.last_modified else 0
+        cached = (quote_etag(f"{snapshot.etag}-{deploy_hash}"), max(last_modified, deploy_mtime) or None, html)
+        if not shared:
+            # Pudo reconstruirse arriba (formato viejo): vale el ETag nuevo
+            version = snapshot.etag
+        await cache.aset(render_cache_key(public_slug, version), cached, render_cache_timeout())
+    etag, last_modified, html = cached
+
+    # Si el navegador manda If-None-Match, el ETag tiene prioridad sobre
+    # Last-Modified (que no refleja cambios en el nombre del dueño).
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = HttpResponse(html)
+    response.headers.setdefault("ETag", etag)
+    if last_modified is not None:
+        response.headers.setdefault("Last-Modified", http_date(last_modified))
+    return response
+
+QR_CONTENT_TYPES = {"svg": "image/svg+xml", "png": "image/png"}
+QR_DEFAULT_SIZE = 8  # pixeles por módulo
+QR_MAX_AGE = 60 * 60 * 24 * 365  # el QR solo depende de la URL y el tamaño
+
+
+def public_profile_qr(request, public_slug: str, fmt: str):
+    """
+    QR (SVG o PNG) con el enlace al perfil público, generado en el servidor.
+    Se cachea por formato, tamaño y URL absoluta (que incluye el slug): editar
+    el perfil no cambia el QR, así que no depende de su versión.
+    """
+    try:
+        size = min(max(int(request.GET.get("size", QR_DEFAULT_SIZE)), 1), 20)
+    except ValueError:
+        size = QR_DEFAULT_SIZE
+    url = request.build_absolute_uri(reverse("public_profile", kwargs={"public_slug": public_slug}))
+    url_hash = hashlib.md5(url.encode()).hexdigest()[:12]
+    key = f"qr:{fmt}:{size}:{url_hash}"
+
+    cached = qr_cache.get(key)
+    if cached is None:
+        if not User.objects.filter(public_slug=public_slug, is_active=True).exists():
+            raise Http404
+        buf = io.BytesIO()
+        segno.make(url, error="m", micro=False).save(buf, kind=fmt, scale=size, border=2)
+        body = buf.getvalue()
+        cached = (body, f'"{hashlib.md5(body).hexdigest()}"')
+        qr_cache.set(key, cached, render_cache_timeout())
+
+    body, etag = cached
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(body, content_type=QR_CONTENT_TYPES[fmt])
+    response["ETag"] = etag
+    patch_cache_control(response, public=True, max_age=QR_MAX_AGE)
+    return response
 
 @login_required
 def dashboard(request):
@@ -28,28 +135,25 @@ def dashboard(request):
         Kind.ACCOUNT: "Cuenta bancaria",
     }
 
-    def _get_instance(k):
-        return BankDetails.objects.filter(owner=request.user, kind=k).first()
+    # Una sola consulta para todos los kinds (hay a lo más uno por kind,
+    # ver uniq_bankdetail_owner_kind), agrupados en Python
+    inst_map = {d.kind: d for d in BankDetails.objects.filter(owner=request.user)}
+    instances = {k.lower(): inst_map.get(k) for k in Kind.values}
 
-    phone_inst = _get_instance(Kind.PHONE)
-    clabe_inst = _get_instance(Kind.CLABE)
-    card_inst = _get_instance(Kind.CARD)
-    acct_inst = _get_instance(Kind.ACCOUNT)
+    def _clean_forms():
+        return {
+            k: BankDetailsForm(instance=inst_map.get(k), initial={'kind': k})
+            for k in Kind.values
+        }
 
     if request.method == "POST":
         form_kind = request.POST.get("form_kind")
-        if form_kind not in {Kind.PHONE, Kind.CLABE, Kind.CARD, Kind.ACCOUNT}:
+        if form_kind not in Kind.values:
             messages.error(request, "Tipo de formulario inválido.")
             return redirect("dashboard")
 
         # Escoge la instancia según el kind:
-        inst_map = {
-            Kind.PHONE: phone_inst,
-            Kind.CLABE: clabe_inst,
-            Kind.CARD: card_inst,
-            Kind.ACCOUNT: acct_inst,
-        }
-        instance = inst_map[form_kind]
+        instance = inst_map.get(form_kind)
 
         # Crear una copia mutable del POST data y agregar el kind
         post_data = request.POST.copy()
@@ -66,12 +170,8 @@ def dashboard(request):
         else:
             messages.error(request, "Por favor, corrija los errores a continuación.")
         # Si hay errores, volvemos a construir los otros forms "en limpio"
-        other_forms = {
-            Kind.PHONE: BankDetailsForm(instance=phone_inst, initial={'kind': Kind.PHONE}),
-            Kind.CLABE: BankDetailsForm(instance=clabe_inst, initial={'kind': Kind.CLABE}),
-            Kind.CARD: BankDetailsForm(instance=card_inst, initial={'kind': Kind.CARD}),
-            Kind.ACCOUNT: BankDetailsForm(instance=acct_inst, initial={'kind': Kind.ACCOUNT}),
-        }
+        # (con las instancias que ya cargamos arriba)
+        other_forms = _clean_forms()
         other_forms[form_kind] = form  # conserva el que tiene errores
         return render(
             request,
@@ -79,23 +179,17 @@ def dashboard(request):
             {
                 "owner": request.user,
                 "forms": other_forms,
-                "instances": {"phone": phone_inst, "clabe": clabe_inst, "card": card_inst, "account": acct_inst},
+                "instances": instances,
             },
         )
 
     # GET
-    forms = {
-        Kind.PHONE: BankDetailsForm(instance=phone_inst, initial={'kind': Kind.PHONE}),
-        Kind.CLABE: BankDetailsForm(instance=clabe_inst, initial={'kind': Kind.CLABE}),
-        Kind.CARD: BankDetailsForm(instance=card_inst, initial={'kind': Kind.CARD}),
-        Kind.ACCOUNT: BankDetailsForm(instance=acct_inst, initial={'kind': Kind.ACCOUNT}),
-    }
     return render(
         request,
         "bank_details/dashboard.html",
         {
             "owner": request.user,
-            "forms": forms,
-            "instances": {"phone": phone_inst, "clabe": clabe_inst, "card": card_inst, "account": acct_inst},
+            "forms": _clean_forms(),
+            "instances": instances,
         },
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,101 @@
+"""
+Utilidades comunes para los benchmarks (python -m benchmarks.<nombre>).
+"""
+from __future__ import annotations
+
+import os
+import statistics
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django() -> None:
+    """
+    Carga Django con los settings del proyecto (usa el .env como manage.py).
+    Sin límite de intentos: los benchmarks mandan cientos de POST desde la
+    misma IP y medirían respuestas 429. DJANGO_RATE_LIMIT_ENABLED=True lo
+    vuelve a activar.
+    """
+    if str(BASE_DIR) not in sys.path:
+        sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "cobrando_la.settings")
+    os.environ.setdefault("DJANGO_RATE_LIMIT_ENABLED", "False")
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def test_database(keepdb: bool = False):
+    """
+    Crea una base de datos de prueba (test_<NAME>, como `manage.py test`) y
+    la destruye al salir, para no sembrar datos en la BD real.
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment(debug=False)
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+
+class QueryCounter:
+    """Cuenta consultas SQL por thread con connection.execute_wrapper()."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.count += 1
+                self.time += elapsed
+
+    @contextmanager
+    def track(self):
+        from django.db import connection
+
+        with connection.execute_wrapper(self):
+            yield self
+
+
+def timeit(fn, *args, repeat: int = 3) -> float:
+    """Mejor tiempo (segundos) de `repeat` ejecuciones."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    """p50/p95/p99 de una lista de latencias."""
+    if len(samples) < 2:
+        value = samples[0] if samples else 0.0
+        return {"p50": value, "p95": value, "p99": value}
+    q = statistics.quantiles(samples, n=100, method="inclusive")
+    return {"p50": q[49], "p95": q[94], "p99": q[98]}
+
+
+def print_table(headers: list[str], rows: list[list]) -> None:
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print("  ".join(str(h).rjust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print("  ".join(str(c).rjust(w) for c, w in zip(row, widths)))
@@ -0,0 +1,83 @@
+"""
+Siembra usuarios de prueba con sus cuatro BankDetails (CLABE, tarjeta,
+cuenta y WhatsApp) usando bulk_create. Todos comparten la misma contraseña
+(se hashea una sola vez).
+"""
+from __future__ import annotations
+
+import random
+
+SEED_EMAIL_DOMAIN = "bench.invalid"
+SEED_PASSWORD = "bench-pass-1234"
+
+
+def _clabe(rng: random.Random) -> str:
+    body = "012180" + "".join(rng.choice("0123456789") for _ in range(11))
+    weights = (3, 7, 1)
+    total = sum((int(d) * weights[i % 3]) % 10 for i, d in enumerate(body))
+    return body + str((10 - total % 10) % 10)
+
+
+def _card(rng: random.Random) -> str:
+    body = "4" + "".join(rng.choice("0123456789") for _ in range(14))
+    # Dígito verificador Luhn: se duplica desde el último dígito del cuerpo
+    total = 0
+    for i, d in enumerate(reversed(body)):
+        d = int(d)
+        if i % 2 == 0:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return body + str((10 - total % 10) % 10)
+
+
+def seed_users(n: int, batch_size: int = 1000, seed: int = 1234) -> list[str]:
+    """Crea `n` usuarios con datos completos; regresa sus public_slug."""
+    from django.contrib.auth.hashers import make_password
+
+    from accounts.models import User
+    from bank_details.models import BankDetails, PublicProfileSnapshot
+
+    rng = random.Random(seed)
+    password = make_password(SEED_PASSWORD)
+    Kind = BankDetails.Kind
+    slugs = []
+
+    for start in range(0, n, batch_size):
+        users = [
+            User(
+                email=f"user{i}@{SEED_EMAIL_DOMAIN}",
+                display_name=f"Comercio {i}",
+                public_slug=f"bench-{i}-{rng.randrange(36 ** 4):04x}",
+                password=password,
+            )
+            for i in range(start, min(start + batch_size, n))
+        ]
+        User.objects.bulk_create(users)
+        # PostgreSQL regresa los pk en bulk_create; SQLite puede que no
+        if users and users[0].pk is None:
+            users = list(User.objects.filter(public_slug__in=[u.public_slug for u in users]))
+
+        details = []
+        for u in users:
+            for kind, value in (
+                (Kind.CLABE, _clabe(rng)),
+                (Kind.CARD, _card(rng)),
+                (Kind.ACCOUNT, str(rng.randrange(10 ** 9, 10 ** 10))),
+                (Kind.PHONE, str(rng.randrange(10 ** 9, 10 ** 10))),
+            ):
+                d = BankDetails(owner=u, kind=kind, value=value, alias=f"Alias {kind.lower()}")
+                d.clean()  # misma normalización que save(), sin las consultas
+                details.append(d)
+        BankDetails.objects.bulk_create(details)
+        PublicProfileSnapshot.rebuild_many(u.pk for u in users)
+        slugs.extend(u.public_slug for u in users)
+    return slugs
+
+
+def clear_seed() -> int:
+    from accounts.models import User
+
+    deleted, _ = User.objects.filter(email__endswith=f"@{SEED_EMAIL_DOMAIN}").delete()
+    return deleted
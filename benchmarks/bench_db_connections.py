@@ -0,0 +1,74 @@
+"""
+Costo de abrir una conexión a PostgreSQL por request contra el modo
+configurado en DJANGO_DB_POOL_MODE (conexión persistente, pool o PgBouncer).
+Cada "request" es un SELECT 1; solo lee de la BD configurada.
+
+    DJANGO_DB_POOL_MODE=persistent python -m benchmarks.bench_db_connections
+    DJANGO_DB_POOL_MODE=pool python -m benchmarks.bench_db_connections
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import time
+
+from ._harness import percentiles, print_table, setup_django
+
+
+def _sample(fn, n: int) -> list[float]:
+    samples = []
+    for _ in range(n):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.conf import settings
+    from django.db import connections
+
+    default = connections["default"]
+    Wrapper = type(default)
+
+    # Línea base: conexión nueva por request (DJANGO_DB_POOL_MODE=none)
+    fresh_settings = copy.deepcopy(default.settings_dict)
+    fresh_settings["OPTIONS"].pop("pool", None)
+    fresh_settings["CONN_MAX_AGE"] = 0
+
+    def fresh_request():
+        conn = Wrapper(fresh_settings, alias="bench_fresh")
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        conn.close()
+
+    def configured_request():
+        # Igual que un request real: se usa la conexión y al final
+        # close_old_connections() decide si la cierra, la conserva o la
+        # devuelve al pool
+        with default.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        default.close_if_unusable_or_obsolete()
+
+    configured_request()  # calentar pool / conexión persistente
+    rows = []
+    results = {}
+    for name, fn in (("none (nueva por request)", fresh_request),
+                     (f"{settings.DB_POOL_MODE} (configurado)", configured_request)):
+        samples = _sample(fn, args.requests)
+        p = percentiles(samples)
+        results[name] = sum(samples) / len(samples)
+        rows.append([name, f"{results[name] * 1000:.2f}", f"{p['p50'] * 1000:.2f}",
+                     f"{p['p95'] * 1000:.2f}", f"{p['p99'] * 1000:.2f}"])
+    print_table(["mode", "mean ms", "p50 ms", "p95 ms", "p99 ms"], rows)
+    fresh, configured = results.values()
+    print(f"\nAhorro por request: {(fresh - configured) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
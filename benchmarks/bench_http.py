@@ -0,0 +1,113 @@
+"""
+Línea base de latencia por endpoint, en proceso (django.test.Client), sobre
+una BD de prueba sembrada con N usuarios. Reporta p50/p95/p99, requests/s y
+consultas SQL por request para el perfil público, el dashboard (GET/POST),
+login y signup.
+
+    python -m benchmarks.bench_http --users 1000 --requests 500 --concurrency 4
+
+Para carga real contra gunicorn usa benchmarks/locustfile.py.
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ._harness import QueryCounter, percentiles, print_table, setup_django, test_database
+from ._seed import SEED_EMAIL_DOMAIN, SEED_PASSWORD, seed_users
+
+
+def _run(name, make_client, request, n: int, concurrency: int) -> list:
+    """Corre `request(client, i)` n veces repartidas en `concurrency` threads."""
+    from django.db import connection
+
+    counter = QueryCounter()
+    latencies: list[float] = []
+    lock = threading.Lock()
+    seq = itertools.count()
+
+    def worker(_):
+        client = make_client()
+        local = []
+        try:
+            with counter.track():
+                while (i := next(seq)) < n:
+                    started = time.perf_counter()
+                    response = request(client, i)
+                    local.append(time.perf_counter() - started)
+                    assert response.status_code < 400, f"{name}: HTTP {response.status_code}"
+        finally:
+            connection.close()
+        with lock:
+            latencies.extend(local)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    p = percentiles(latencies)
+    return [
+        name, n,
+        f"{p['p50'] * 1000:.1f}", f"{p['p95'] * 1000:.1f}", f"{p['p99'] * 1000:.1f}",
+        f"{n / elapsed:,.0f}", f"{counter.count / n:.1f}",
+    ]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=500, help="Requests por escenario.")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.test import Client
+
+    from accounts.models import User
+
+    with test_database():
+        slugs = seed_users(args.users)
+        users = list(User.objects.filter(public_slug__in=slugs[: args.concurrency * 4]))
+        rng = random.Random(1)
+        thread_users = itertools.cycle(users)
+
+        def logged_in_client():
+            client = Client()
+            client.force_login(next(thread_users))
+            return client
+
+        def signup(client, i):
+            client.cookies.clear()  # cada alta como visitante nuevo
+            return client.post("/accounts/signup/", {
+                "email": f"signup{i}@{SEED_EMAIL_DOMAIN}", "display_name": "Comercio nuevo",
+                "password1": SEED_PASSWORD, "password2": SEED_PASSWORD,
+            })
+
+        rows = [
+            _run("GET /u/<slug>/", Client,
+                 lambda c, i: c.get(f"/u/{rng.choice(slugs)}/"), args.requests, args.concurrency),
+            _run("GET /dashboard/", logged_in_client,
+                 lambda c, i: c.get("/dashboard/"), args.requests, args.concurrency),
+            _run("POST /dashboard/", logged_in_client,
+                 lambda c, i: c.post("/dashboard/", {
+                     "form_kind": "ACCOUNT", "value": str(10 ** 9 + i),
+                     "alias": "Cuenta", "is_public": "on",
+                 }), args.requests, args.concurrency),
+            _run("POST /accounts/login/", Client,
+                 lambda c, i: c.post("/accounts/login/", {
+                     "username": f"user{rng.randrange(args.users)}@{SEED_EMAIL_DOMAIN}",
+                     "password": SEED_PASSWORD,
+                 }), args.requests, args.concurrency),
+            _run("POST /accounts/signup/", Client, signup, args.requests, args.concurrency),
+        ]
+
+    print_table(["endpoint", "n", "p50 ms", "p95 ms", "p99 ms", "req/s", "queries/req"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Costo de RequestMetricsMiddleware: latencia de /u/<slug>/ y /dashboard/ sin
+medir ningún request, con el muestreo configurado y midiéndolos todos. Corre
+sobre una BD de prueba desechable.
+
+    python -m benchmarks.bench_instrumentation --requests 2000
+    python -m benchmarks.bench_instrumentation --rates 0 0.01 0.05 1
+
+El log JSON se escribe a /dev/null: se mide su costo, no el de la terminal.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import statistics
+import time
+
+from ._harness import percentiles, print_table, setup_django, test_database
+from ._seed import seed_users
+
+
+def _interleaved(clients: dict, path: str, n: int) -> dict[float, list[float]]:
+    """Alterna los clientes request por request para que la deriva de la máquina afecte a todos igual."""
+    latencies = {rate: [] for rate in clients}
+    for client in clients.values():
+        client.get(path)  # calentar
+    for _ in range(n):
+        for rate, client in clients.items():
+            started = time.perf_counter()
+            response = client.get(path)
+            latencies[rate].append(time.perf_counter() - started)
+            assert response.status_code == 200, f"{path}: HTTP {response.status_code}"
+    return latencies
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--rates", type=float, nargs="+", help="Fracciones a medir (default: 0, el setting y 1).")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.conf import settings
+    from django.test import Client, override_settings
+
+    from accounts.models import User
+
+    rates = args.rates or sorted({0.0, settings.REQUEST_METRICS_SAMPLE_RATE, 1.0})
+    requests_logger = logging.getLogger("cobrando_la.requests")
+    requests_logger.handlers = [logging.StreamHandler(open(os.devnull, "w"))]
+
+    with test_database():
+        seed_users(args.users)
+        user = User.objects.order_by("pk").first()
+        paths = {"public_profile": f"/u/{user.public_slug}/", "dashboard": "/dashboard/"}
+
+        clients = {}
+        for rate in rates:
+            # El middleware lee el setting al cargarse, con el primer request
+            with override_settings(REQUEST_METRICS_SAMPLE_RATE=rate):
+                clients[rate] = Client()
+                clients[rate].force_login(user)
+                clients[rate].get("/")
+
+        rows = []
+        for view, path in paths.items():
+            latencies = _interleaved(clients, path, args.requests)
+            baseline = statistics.fmean(latencies[rates[0]])
+            for rate in rates:
+                mean = statistics.fmean(latencies[rate])
+                p = percentiles(latencies[rate])
+                rows.append([view, rate, f"{mean * 1000:.3f}", f"{p['p50'] * 1000:.3f}",
+                             f"{p['p95'] * 1000:.3f}", f"{(mean / baseline - 1) * 100:+.1f}%"])
+        print_table(["view", "sample rate", "mean ms", "p50 ms", "p95 ms", f"vs {rates[0]}"], rows)
+
+
+if __name__ == "__main__":
+    main()
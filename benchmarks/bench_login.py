@@ -0,0 +1,103 @@
+"""
+Costo de un intento de login por escenario (email, teléfono en otro formato,
+contraseña incorrecta, cuenta inexistente): hashes de contraseña, consultas
+y latencia de authenticate(). Con --legacy-backends agrega ModelBackend
+detrás de EmailOrPhoneBackend, como estaba antes, para comparar. Corre sobre
+una BD de prueba desechable.
+
+    python -m benchmarks.bench_login --attempts 20
+    python -m benchmarks.bench_login --iterations 600000 --legacy-backends
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from contextlib import contextmanager
+
+from ._harness import QueryCounter, percentiles, print_table, setup_django, test_database
+from ._seed import SEED_PASSWORD
+
+EMAIL = "login@bench.invalid"
+STORED_PHONE = "9981234567"
+
+
+@contextmanager
+def _count_hashes():
+    """Cuenta llamadas a encode() de los hashers configurados (check y set_password pasan por ahí)."""
+    from django.contrib.auth.hashers import get_hashers
+
+    calls = [0]
+    patched = []
+    for hasher in get_hashers():
+        def encode(*args, _encode=hasher.encode, **kwargs):
+            calls[0] += 1
+            return _encode(*args, **kwargs)
+
+        hasher.encode = encode
+        patched.append(hasher)
+    try:
+        yield calls
+    finally:
+        for hasher in patched:
+            del hasher.encode
+
+
+def _attempts(username: str, password: str, n: int) -> list:
+    from django.contrib.auth import authenticate
+    from django.test import RequestFactory
+
+    request = RequestFactory().post("/accounts/login/")
+    authenticate(request, username=username, password=password)  # calentar
+    counter = QueryCounter()
+    latencies = []
+    with _count_hashes() as hashes, counter.track():
+        for _ in range(n):
+            started = time.perf_counter()
+            user = authenticate(request, username=username, password=password)
+            latencies.append(time.perf_counter() - started)
+    p = percentiles(latencies)
+    return [user is not None, f"{hashes[0] / n:.1f}", f"{counter.count / n:.1f}",
+            f"{p['p50'] * 1000:.1f}", f"{p['p95'] * 1000:.1f}"]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--attempts", type=int, default=20)
+    parser.add_argument("--iterations", type=int, help="PASSWORD_HASH_ITERATIONS (default: el setting).")
+    parser.add_argument("--legacy-backends", action="store_true",
+                        help="Mide también con ModelBackend como segundo backend.")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.conf import settings
+    from django.test import override_settings
+
+    from accounts.models import User
+
+    backends = {"actual": settings.AUTHENTICATION_BACKENDS}
+    if args.legacy_backends:
+        backends["+ ModelBackend"] = [*settings.AUTHENTICATION_BACKENDS, "django.contrib.auth.backends.ModelBackend"]
+    overrides = {} if args.iterations is None else {"PASSWORD_HASH_ITERATIONS": args.iterations}
+
+    scenarios = {
+        "email": (EMAIL, SEED_PASSWORD),
+        "phone +52 con espacios": ("+52 998 123 4567", SEED_PASSWORD),
+        "contraseña incorrecta": (EMAIL, "incorrecta"),
+        "cuenta inexistente": ("nadie@bench.invalid", SEED_PASSWORD),
+    }
+
+    with test_database(), override_settings(**overrides):
+        for user in (User(email=EMAIL), User(phone=STORED_PHONE)):
+            user.set_password(SEED_PASSWORD)
+            user.save()
+
+        rows = []
+        for label, auth_backends in backends.items():
+            with override_settings(AUTHENTICATION_BACKENDS=auth_backends):
+                for scenario, (username, password) in scenarios.items():
+                    rows.append([label, scenario, *_attempts(username, password, args.attempts)])
+        print_table(["backends", "escenario", "ok", "hashes/intento", "consultas/intento", "p50 ms", "p95 ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
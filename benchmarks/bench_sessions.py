@@ -0,0 +1,151 @@
+"""
+Latencia y consultas por request de GET /dashboard/ con cada motor de
+sesión (db, cached_db y cache), y costo de clearsessions por lotes contra un
+solo DELETE. Corre sobre una BD de prueba desechable.
+
+    python -m benchmarks.bench_sessions --requests 500
+    python -m benchmarks.bench_sessions --redis-url redis://127.0.0.1:6379/15
+    python -m benchmarks.bench_sessions --fakeredis --expired 200000
+
+cached_db y cache necesitan Redis: sin --redis-url ni --fakeredis se usa
+DJANGO_CACHE_REDIS_URL, y si tampoco hay, solo se mide db.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import timedelta
+
+from ._harness import QueryCounter, percentiles, print_table, setup_django, test_database
+from ._seed import seed_users
+
+ENGINES = {
+    "db": "cobrando_la.sessions.db",
+    "cached_db": "cobrando_la.sessions.cached_db",
+    "cache": "django.contrib.sessions.backends.cache",
+}
+
+
+def _sessions_cache(redis_url: str | None, use_fakeredis: bool) -> dict | None:
+    """Alias "sessions" apuntando a Redis (real o fakeredis); None si no hay."""
+    from django.conf import settings
+
+    options = {}
+    if use_fakeredis:
+        import fakeredis
+
+        redis_url = "redis://fakeredis:6379/0"
+        options = {"connection_class": fakeredis.FakeConnection, "server": fakeredis.FakeServer()}
+    redis_url = redis_url or settings.CACHE_REDIS_URL
+    if not redis_url:
+        return None
+    return {
+        "BACKEND": "cobrando_la.cache.TieredCache",
+        "LOCATION": "bench-sessions",
+        "KEY_PREFIX": "bench-sessions",
+        "OPTIONS": {
+            "FRONT_MAX_ENTRIES": 0,
+            "SHARED": {
+                "BACKEND": "django.core.cache.backends.redis.RedisCache",
+                "LOCATION": redis_url,
+                "OPTIONS": options,
+            },
+        },
+    }
+
+
+def _dashboard(user, n: int) -> list:
+    from django.test import Client
+
+    client = Client()
+    client.force_login(user)
+    client.get("/dashboard/")  # calentar (y llenar el caché de la sesión)
+    counter = QueryCounter()
+    latencies = []
+    with counter.track():
+        for _ in range(n):
+            started = time.perf_counter()
+            response = client.get("/dashboard/")
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200, f"HTTP {response.status_code}"
+    p = percentiles(latencies)
+    return [f"{p['p50'] * 1000:.2f}", f"{p['p95'] * 1000:.2f}", f"{p['p99'] * 1000:.2f}",
+            f"{counter.count / n:.1f}"]
+
+
+def _seed_expired(n: int) -> None:
+    from django.contrib.sessions.models import Session
+    from django.utils import timezone
+
+    expired = timezone.now() - timedelta(days=1)
+    Session.objects.bulk_create(
+        (Session(session_key=f"bench{i:035d}", session_data="", expire_date=expired) for i in range(n)),
+        batch_size=5000,
+    )
+
+
+def _clear(clear) -> list:
+    """Tiempo total y sentencia DELETE más larga (lo que dura el bloqueo) de `clear`."""
+    from django.db import connection
+
+    longest = [0.0]
+
+    def timing(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if sql.lstrip().upper().startswith("DELETE"):
+                longest[0] = max(longest[0], time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with connection.execute_wrapper(timing):
+        clear()
+    return [f"{time.perf_counter() - started:.2f}", f"{longest[0] * 1000:.1f}"]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--expired", type=int, default=50_000, help="Sesiones vencidas para clearsessions.")
+    parser.add_argument("--redis-url")
+    parser.add_argument("--fakeredis", action="store_true", help="Redis en memoria (sin red).")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.sessions.models import Session
+    from django.test import override_settings
+    from django.utils import timezone
+
+    from accounts.models import User
+    from cobrando_la.sessions import clear_expired_in_batches
+
+    sessions_cache = _sessions_cache(args.redis_url, args.fakeredis)
+    engines = ENGINES if sessions_cache else {"db": ENGINES["db"]}
+    caches = {**settings.CACHES, "sessions": sessions_cache} if sessions_cache else settings.CACHES
+
+    with test_database():
+        seed_users(args.users)
+        user = User.objects.order_by("pk").first()
+
+        rows = []
+        for name, engine in engines.items():
+            with override_settings(SESSION_ENGINE=engine, CACHES=caches):
+                rows.append([name, args.requests, *_dashboard(user, args.requests)])
+        print_table(["engine", "n", "p50 ms", "p95 ms", "p99 ms", "queries/req"], rows)
+
+        rows = []
+        _seed_expired(args.expired)
+        rows.append(["batched", args.expired, *_clear(lambda: clear_expired_in_batches(Session))])
+        _seed_expired(args.expired)
+        rows.append(["single DELETE", args.expired, *_clear(
+            lambda: Session.objects.filter(expire_date__lt=timezone.now()).delete()
+        )])
+        print()
+        print_table(["clearsessions", "expired", "total s", "longest DELETE ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Alta concurrente de usuarios para medir la asignación de public_slug:
+consultas por alta, choques de slug y throughput. Corre sobre una BD de
+prueba que se crea y destruye al terminar.
+
+    python -m benchmarks.bench_slugs --users 100000 --workers 16
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ._harness import QueryCounter, print_table, setup_django, test_database
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--display-name", default="Tacos El Güero",
+                        help="Nombre común para todos: todos los slugs comparten la misma base.")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.db import connection
+
+    import accounts.models
+    from accounts.models import User
+
+    # Cuenta los choques de slug envolviendo el generador
+    generated = [0]
+    original = accounts.models._generate_public_slug
+
+    def counting_generator(base=None):
+        generated[0] += 1
+        return original(base)
+
+    accounts.models._generate_public_slug = counting_generator
+
+    counter = QueryCounter()
+    per_worker = args.users // args.workers
+
+    def worker(n: int) -> None:
+        try:
+            with counter.track():
+                for i in range(per_worker):
+                    User.objects.create(email=f"bench-{n}-{i}@example.com", display_name=args.display_name)
+        finally:
+            connection.close()
+
+    with test_database():
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            list(pool.map(worker, range(args.workers)))
+        elapsed = time.perf_counter() - started
+        total = per_worker * args.workers
+        assert User.objects.count() == total
+
+    print_table(
+        ["users", "workers", "seconds", "users/s", "queries/signup", "slug retries"],
+        [[
+            f"{total:,}", args.workers, f"{elapsed:.1f}", f"{total / elapsed:,.0f}",
+            f"{counter.count / total:.2f}", generated[0] - total,
+        ]],
+    )
+
+
+if __name__ == "__main__":
+    main()
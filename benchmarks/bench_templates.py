@@ -0,0 +1,93 @@
+"""
+Tiempo de render de public_profile.html con los datos ya agrupados por tipo
+(PublicProfileSnapshot.build) contra el esquema anterior de cuatro
+`dictsort` + `{% if d.kind == ... %}` sobre la lista plana. Sin BD.
+
+    python -m benchmarks.bench_templates
+    python -m benchmarks.bench_templates --rows 4 400 4000 --repeat 20
+
+4 filas es un perfil real (un registro por tipo); los tamaños grandes son
+el peor caso y muestran cómo escala cada variante.
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+from datetime import timedelta
+
+from ._harness import print_table, setup_django, timeit
+
+# Solo el esqueleto de las secciones, igual en ambas variantes: así la
+# diferencia es el filtrado y no el HTML de cada tarjeta. La plantilla vieja
+# además cortaba en 99 filas (`slice:":99"`); aquí no, para que ambas
+# variantes rendericen lo mismo.
+_CARD = "<div>{{ d.value }} {{ d.bank_name }} {{ d.alias }} {{ d.updated_display }}</div>"
+LEGACY_SECTIONS = "".join(
+    f'{{% with items=details|dictsort:"kind" %}}{{% for d in items %}}'
+    f"{{% if d.kind == '{kind}' %}}{_CARD}{{% endif %}}{{% endfor %}}{{% endwith %}}"
+    for kind in ("CLABE", "CARD", "ACCOUNT", "PHONE")
+)
+GROUPED_SECTIONS = "".join(
+    f"{{% for d in sections.{key} %}}{_CARD}{{% endfor %}}"
+    for key in ("clabe", "card", "account", "phone")
+)
+
+
+def _details(n: int) -> list:
+    """`n` BankDetails en memoria (sin guardar), repartidos entre los cuatro tipos."""
+    from django.utils import timezone
+
+    from bank_details.models import BankDetails
+
+    now = timezone.now()
+    kinds = itertools.cycle(BankDetails.Kind.values)
+    return [
+        BankDetails(
+            kind=next(kinds), value=str(10 ** 9 + i), bank_name="Banco", alias=f"Alias {i}",
+            created_at=now - timedelta(days=i), updated_at=now - timedelta(minutes=i),
+        )
+        for i in range(n)
+    ]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[4, 40, 400, 4000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.template import Context, Template
+    from django.template.loader import get_template
+
+    from accounts.models import User
+    from bank_details.models import PublicProfileSnapshot
+
+    owner = User(pk=1, email="bench@bench.invalid", display_name="Comercio", public_slug="bench")
+    legacy = Template(LEGACY_SECTIONS)
+    grouped = Template(GROUPED_SECTIONS)
+    page = get_template("bank_details/public_profile.html")
+    page.render({"owner": {}, "sections": {}})  # calentar loaders y templatetags
+
+    rows = []
+    for n in args.rows:
+        details = _details(n)
+        payload = PublicProfileSnapshot.build(owner, details).payload
+        # La variante anterior recibía la lista plana con `kind` en cada fila
+        flat = [{"kind": kind.upper(), **d} for kind, items in payload["sections"].items() for d in items]
+
+        assert legacy.render(Context({"details": flat})) == grouped.render(Context(payload))
+        legacy_t = timeit(lambda: legacy.render(Context({"details": flat})), repeat=args.repeat)
+        grouped_t = timeit(lambda: grouped.render(Context(payload)), repeat=args.repeat)
+        build_t = timeit(PublicProfileSnapshot.build, owner, details, repeat=args.repeat)
+        page_t = timeit(page.render, payload, repeat=args.repeat)
+        rows.append([
+            f"{n:,}",
+            f"{legacy_t * 1000:.3f}", f"{grouped_t * 1000:.3f}", f"{legacy_t / grouped_t:.1f}x",
+            f"{build_t * 1000:.3f}", f"{page_t * 1000:.3f}",
+        ])
+    print_table(["rows", "dictsort x4 ms", "grouped ms", "speedup", "build ms", "full page ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Compara los validadores escalares de bank_details.models contra sus
+versiones por lote (bank_details.batch_validators).
+
+    python -m benchmarks.bench_validators
+    python -m benchmarks.bench_validators --sizes 10000 1000000
+"""
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+
+from ._harness import print_table, setup_django, timeit
+
+
+def _random_digits(rng: np.random.Generator, n: int, width: int) -> np.ndarray:
+    digits = rng.integers(0, 10, size=(n, width), dtype=np.uint8) + ord("0")
+    return digits.view(f"S{width}").reshape(n).astype(f"U{width}")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-scalar-above", type=int, default=None,
+                        help="No medir la versión escalar por encima de este tamaño (es lenta).")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from bank_details.batch_validators import (
+        clabe_checksum_ok_batch, luhn_check_batch, validate_phone_number_batch,
+    )
+    from bank_details.models import clabe_checksum_ok, luhn_check, validate_phone_number
+
+    cases = [
+        ("luhn", 16, luhn_check, luhn_check_batch),
+        ("clabe", 18, clabe_checksum_ok, clabe_checksum_ok_batch),
+        ("phone", 10, validate_phone_number, validate_phone_number_batch),
+    ]
+    rng = np.random.default_rng(42)
+    rows = []
+    for n in args.sizes:
+        for name, width, scalar, batch in cases:
+            arr = _random_digits(rng, n, width)
+            values = arr.tolist()  # la versión escalar recibe una lista de str
+            # Sanidad: ambas versiones deben coincidir
+            assert batch(arr[:1000]).tolist() == [scalar(v) for v in values[:1000]]
+            batch_t = timeit(batch, arr, repeat=args.repeat)
+            if args.skip_scalar_above is not None and n > args.skip_scalar_above:
+                scalar_t = None
+            else:
+                scalar_t = timeit(lambda: [scalar(v) for v in values], repeat=args.repeat)
+            rows.append([
+                f"{n:,}", name,
+                f"{scalar_t:.3f}" if scalar_t is not None else "-",
+                f"{batch_t:.3f}",
+                f"{scalar_t / batch_t:.1f}x" if scalar_t is not None else "-",
+            ])
+    print_table(["n", "validator", "scalar s", "batch s", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Carga HTTP contra un servidor real (gunicorn + PostgreSQL o SQLite).
+
+    python -m benchmarks.seed --users 1000 --slugs-file bench_slugs.txt
+    DJANGO_RATE_LIMIT_ENABLED=False gunicorn --workers 3 --threads 3 cobrando_la.wsgi:application
+    SLUGS_FILE=bench_slugs.txt locust -f benchmarks/locustfile.py \\
+        --host http://127.0.0.1:8000 --headless -u 200 -r 20 -t 2m --csv bench
+
+Sin DJANGO_RATE_LIMIT_ENABLED=False los login y signup de todos los
+usuarios simulados salen de la misma IP y terminan en 429 (ver
+cobrando_la/ratelimit.py). Locust reporta p50/p95/p99 y requests/s por endpoint. Para consultas por
+request usa `python -m benchmarks.bench_http` (en proceso).
+"""
+from __future__ import annotations
+
+import os
+import random
+import sys
+import uuid
+from pathlib import Path
+
+from locust import HttpUser, between, task
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from benchmarks._seed import SEED_EMAIL_DOMAIN, SEED_PASSWORD  # noqa: E402
+
+SLUGS = Path(os.environ.get("SLUGS_FILE", "bench_slugs.txt")).read_text(encoding="utf-8").split()
+
+
+def _post_form(client, url: str, data: dict, name: str):
+    """GET para obtener el csrftoken y luego POST del formulario."""
+    client.get(url, name=f"{name} [GET]")
+    data = {**data, "csrfmiddlewaretoken": client.cookies.get("csrftoken", "")}
+    return client.post(url, data=data, name=f"{name} [POST]", headers={"Referer": client.base_url + url})
+
+
+class Payer(HttpUser):
+    """Quien abre un link compartido: la mayoría del tráfico."""
+    weight = 8
+    wait_time = between(1, 3)
+
+    @task
+    def public_profile(self):
+        self.client.get(f"/u/{random.choice(SLUGS)}/", name="/u/[slug]/")
+
+
+class Merchant(HttpUser):
+    """Dueño que entra a su panel y actualiza datos."""
+    weight = 2
+    wait_time = between(2, 5)
+
+    def on_start(self):
+        i = random.randrange(len(SLUGS))
+        _post_form(self.client, "/accounts/login/", {
+            "username": f"user{i}@{SEED_EMAIL_DOMAIN}",
+            "password": SEED_PASSWORD,
+        }, name="/accounts/login/")
+
+    @task(4)
+    def dashboard(self):
+        self.client.get("/dashboard/", name="/dashboard/ [GET]")
+
+    @task(1)
+    def update_account(self):
+        self.client.post("/dashboard/", data={
+            "form_kind": "ACCOUNT",
+            "value": str(random.randrange(10 ** 9, 10 ** 10)),
+            "alias": "Cuenta de prueba",
+            "is_public": "on",
+            "csrfmiddlewaretoken": self.client.cookies.get("csrftoken", ""),
+        }, name="/dashboard/ [POST]", headers={"Referer": self.client.base_url + "/dashboard/"})
+
+
+class NewMerchant(HttpUser):
+    """Altas nuevas."""
+    weight = 1
+    wait_time = between(5, 10)
+
+    @task
+    def signup(self):
+        self.client.cookies.clear()
+        _post_form(self.client, "/accounts/signup/", {
+            "email": f"signup-{uuid.uuid4().hex[:12]}@{SEED_EMAIL_DOMAIN}",
+            "display_name": "Comercio nuevo",
+            "password1": SEED_PASSWORD,
+            "password2": SEED_PASSWORD,
+        }, name="/accounts/signup/")
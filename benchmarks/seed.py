@@ -0,0 +1,41 @@
+"""
+Siembra la BD configurada (la de tu .env) con usuarios de prueba para correr
+el locustfile contra un gunicorn local. Escribe los slugs en un archivo.
+
+    python -m benchmarks.seed --users 1000 --slugs-file /tmp/slugs.txt
+    python -m benchmarks.seed --clear
+"""
+from __future__ import annotations
+
+import argparse
+
+from ._harness import setup_django
+from ._seed import SEED_EMAIL_DOMAIN, clear_seed, seed_users
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--slugs-file", default="bench_slugs.txt")
+    parser.add_argument("--clear", action="store_true", help=f"Borra los usuarios @{SEED_EMAIL_DOMAIN} y sale.")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.conf import settings
+
+    if not settings.DEBUG:
+        parser.error("Solo con DJANGO_DEBUG=True: esto escribe en la BD configurada.")
+
+    deleted = clear_seed()
+    if args.clear:
+        print(f"{deleted} registros borrados.")
+        return
+
+    slugs = seed_users(args.users)
+    with open(args.slugs_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(slugs) + "\n")
+    print(f"{len(slugs)} usuarios sembrados; slugs en {args.slugs_file}")
+
+
+if __name__ == "__main__":
+    main()
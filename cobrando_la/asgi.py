@@ -12,5 +12,11 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cobrando_la.settings')
+# Sin WhiteNoiseMiddleware (solo sync): los estáticos se sirven antes de Django
+os.environ.setdefault('DJANGO_SERVER', 'asgi')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from cobrando_la.asgi_static import ASGIStaticFiles  # noqa: E402  (necesita settings)
+
+application = ASGIStaticFiles(django_application)
@@ -0,0 +1,65 @@
+"""
+Estáticos bajo ASGI, antes de entrar a Django.
+
+WhiteNoiseMiddleware (6.x) es solo sync: dentro de la cadena de middleware
+Django lo adapta con sync_to_async en cada request, así que hasta la vista
+async del perfil público pasaría por un thread. ASGIStaticFiles envuelve la
+app ASGI y sirve STATIC_URL con el mismo índice y los mismos headers de
+WhiteNoise (nombres con hash, immutable, variantes .br/.gz, ETag y Range);
+todo lo demás sigue a Django sin tocarlo.
+"""
+from __future__ import annotations
+
+from asgiref.sync import sync_to_async
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class ASGIStaticFiles:
+    chunk_size = 64 * 1024
+
+    def __init__(self, application):
+        self.application = application
+        # Solo para configurar y buscar archivos como el middleware (settings
+        # WHITENOISE_*, STATIC_ROOT, manifest); nunca se llama como middleware
+        self.whitenoise = WhiteNoiseMiddleware()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            static_file = await self._find(scope)
+            if static_file is not None:
+                await self._serve(static_file, scope, send)
+                return
+        await self.application(scope, receive, send)
+
+    async def _find(self, scope):
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        if self.whitenoise.autorefresh:
+            # Desarrollo: busca en disco en cada request
+            return await sync_to_async(self.whitenoise.find_file, thread_sensitive=False)(path)
+        return self.whitenoise.files.get(path)
+
+    async def _serve(self, static_file, scope, send) -> None:
+        # WhiteNoise lee los headers del request con nombres de META
+        meta = {
+            "HTTP_" + name.decode("latin1").upper().replace("-", "_"): value.decode("latin1")
+            for name, value in scope.get("headers", [])
+        }
+        response = static_file.get_response(scope["method"], meta)
+        await send({
+            "type": "http.response.start",
+            "status": int(response.status),
+            "headers": [(key.lower().encode("latin1"), value.encode("latin1")) for key, value in response.headers],
+        })
+        if response.file is None:
+            await send({"type": "http.response.body", "body": b""})
+            return
+        read = sync_to_async(response.file.read, thread_sensitive=False)
+        try:
+            while chunk := await read(self.chunk_size):
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            response.file.close()
@@ -0,0 +1,348 @@
+"""
+Backend de caché en dos niveles (settings.CACHES).
+
+Delante va una LRU acotada en la memoria de cada worker, con TTL corto;
+detrás, un backend compartido entre workers (Redis). Las lecturas calientes
+no salen del proceso y las escrituras llegan a los demás workers por Redis.
+Si Redis no responde, el backend sigue sirviendo solo desde la LRU y vuelve
+a intentar después de SHARED_RETRY_AFTER segundos: la app no se cae, solo
+pierde el caché compartido mientras tanto.
+
+    CACHES = {
+        "profiles": {
+            "BACKEND": "cobrando_la.cache.TieredCache",
+            "KEY_PREFIX": "profiles",
+            "OPTIONS": {
+                "FRONT_MAX_ENTRIES": 1000,
+                "FRONT_TIMEOUT": 2,
+                "SHARED": {"BACKEND": "django.core.cache.backends.redis.RedisCache",
+                           "LOCATION": "redis://127.0.0.1:6379/0"},
+            },
+        },
+    }
+
+Sin SHARED se comporta como una LocMemCache por worker (FRONT_TIMEOUT solo
+aplica cuando hay nivel compartido).
+"""
+from __future__ import annotations
+
+import logging
+import pickle
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.connection import ConnectionProxy
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+try:
+    from redis.exceptions import RedisError
+except ImportError:  # sin redis-py solo hay LRU
+    SHARED_ERRORS: tuple[type[BaseException], ...] = (OSError,)
+else:
+    SHARED_ERRORS = (RedisError, OSError)
+
+_MISSING = object()
+
+# Hits/misses del request en curso (los pone RequestMetricsMiddleware; None
+# fuera de un request muestreado)
+request_cache_events: ContextVar[Counter[str] | None] = ContextVar("request_cache_events", default=None)
+
+
+def _count_request(hit: bool) -> None:
+    events = request_cache_events.get()
+    if events is not None:
+        events["hits" if hit else "misses"] += 1
+
+
+class _LRU:
+    """OrderedDict acotada con expiración por entrada. No es thread-safe por sí sola."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.data: OrderedDict[str, tuple[float | None, object]] = OrderedDict()
+
+    def get(self, key: str, now: float):
+        entry = self.data.get(key)
+        if entry is None:
+            return _MISSING, False
+        expires, value = entry
+        if expires is not None and expires <= now:
+            del self.data[key]
+            return _MISSING, True
+        self.data.move_to_end(key)
+        return value, False
+
+    def set(self, key: str, value, expires: float | None) -> int:
+        """Guarda y regresa cuántas entradas se desalojaron por tamaño."""
+        self.data[key] = (expires, value)
+        self.data.move_to_end(key)
+        evicted = 0
+        while len(self.data) > self.max_entries:
+            self.data.popitem(last=False)
+            evicted += 1
+        return evicted
+
+
+class _FrontState:
+    """LRU, lock y contadores de un alias, compartidos por todos los threads del proceso."""
+
+    def __init__(self, max_entries: int):
+        self.lru = _LRU(max_entries)
+        self.lock = threading.Lock()
+        self.metrics: Counter[str] = Counter()
+        self.down_until = 0.0
+
+
+# Django crea una instancia del backend por thread (como LocMemCache, el
+# estado vive a nivel de módulo, por LOCATION)
+_states: dict[str, _FrontState] = {}
+_states_lock = threading.Lock()
+
+
+class TieredCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        with _states_lock:
+            self._state = _states.setdefault(
+                location or self.key_prefix, _FrontState(int(options.get("FRONT_MAX_ENTRIES", 1000)))
+            )
+        # Tope de vida en la LRU cuando hay nivel compartido: cuánto puede
+        # tardar un worker en ver un cambio hecho por otro
+        self._front_timeout = options.get("FRONT_TIMEOUT", 5)
+        # Tope para cualquier timeout (ambos niveles): acota cuánto puede
+        # sobrevivir en Redis un valor que cambió mientras Redis estaba caído
+        self._max_timeout = options.get("MAX_TIMEOUT")
+        self._retry_after = options.get("SHARED_RETRY_AFTER", 30)
+
+        self._shared = None
+        shared = options.get("SHARED")
+        if shared:
+            # Mismo prefijo y versión que este alias: las llaves en Redis
+            # quedan separadas por namespace
+            shared = {**shared, "KEY_PREFIX": params.get("KEY_PREFIX", ""), "VERSION": params.get("VERSION", 1)}
+            self._shared = import_string(shared["BACKEND"])(shared.get("LOCATION", ""), shared)
+
+    # -- nivel compartido -------------------------------------------------
+
+    def _shared_up(self) -> bool:
+        return self._shared is not None and time.monotonic() >= self._state.down_until
+
+    def _call_shared(self, method, *args, default=None, **kwargs):
+        # `method`: nombre de un método del backend compartido, o una función
+        # que lo recibe como primer argumento
+        if not self._shared_up():
+            return default
+        try:
+            if callable(method):
+                return method(self._shared, *args, **kwargs)
+            return getattr(self._shared, method)(*args, **kwargs)
+        except SHARED_ERRORS as e:
+            state = self._state
+            with state.lock:
+                state.metrics["shared_errors"] += 1
+                if time.monotonic() >= state.down_until:
+                    logger.warning("Caché compartido no disponible (%s); solo LRU por %ss", e, self._retry_after)
+                state.down_until = time.monotonic() + self._retry_after
+            return default
+
+    # -- nivel en proceso -------------------------------------------------
+    # Como LocMemCache, la LRU guarda pickles: quien modifique lo que leyó
+    # (p.ej. el dict de una sesión) no altera la copia cacheada.
+
+    def _seconds(self, timeout) -> float | None:
+        # Como get_backend_timeout(), pero en segundos relativos
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def _timeout(self, timeout):
+        if self._max_timeout is None:
+            return timeout
+        timeout = self._seconds(timeout)
+        return self._max_timeout if timeout is None else min(timeout, self._max_timeout)
+
+    def _front_expiry(self, timeout) -> float | None:
+        timeout = self._seconds(timeout)
+        if self._shared is not None and self._front_timeout is not None:
+            timeout = self._front_timeout if timeout is None else min(timeout, self._front_timeout)
+        return None if timeout is None else time.monotonic() + timeout
+
+    def _front_get(self, key: str):
+        state = self._state
+        with state.lock:
+            value, expired = state.lru.get(key, time.monotonic())
+            if expired:
+                state.metrics["front_expired"] += 1
+            state.metrics["front_hits" if value is not _MISSING else "front_misses"] += 1
+        return value if value is _MISSING else pickle.loads(value)
+
+    def _front_set(self, key: str, value, timeout) -> None:
+        if not self._state.lru.max_entries:
+            return  # FRONT_MAX_ENTRIES = 0: sin LRU, todo va a Redis
+        expires = self._front_expiry(timeout)
+        value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        state = self._state
+        with state.lock:
+            state.metrics["evictions"] += state.lru.set(key, value, expires)
+
+    def _front_delete(self, key: str) -> bool:
+        with self._state.lock:
+            return self._state.lru.data.pop(key, None) is not None
+
+    # -- API de Django ----------------------------------------------------
+
+    def get(self, key, default=None, version=None):
+        front_key = self.make_and_validate_key(key, version=version)
+        value = self._front_get(front_key)
+        if value is not _MISSING:
+            _count_request(True)
+            return value
+        if not self._shared_up():
+            _count_request(False)
+            return default
+        value = self._call_shared("get", key, _MISSING, version=version, default=_MISSING)
+        with self._state.lock:
+            self._state.metrics["shared_misses" if value is _MISSING else "shared_hits"] += 1
+        _count_request(value is not _MISSING)
+        if value is _MISSING:
+            return default
+        # TTL real desconocido: se queda solo FRONT_TIMEOUT en la LRU
+        self._front_set(front_key, value, DEFAULT_TIMEOUT)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        front_key = self.make_and_validate_key(key, version=version)
+        timeout = self._timeout(timeout)
+        self._call_shared("set", key, value, timeout, version=version)
+        self._front_set(front_key, value, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        front_key = self.make_and_validate_key(key, version=version)
+        timeout = self._timeout(timeout)
+        added = self._call_shared("add", key, value, timeout, version=version, default=_MISSING)
+        if added is not _MISSING:
+            if added:
+                self._front_set(front_key, value, timeout)
+            else:
+                self._front_delete(front_key)
+            return added
+        if self._front_get(front_key) is not _MISSING:
+            return False
+        self._front_set(front_key, value, timeout)
+        return True
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        front_key = self.make_and_validate_key(key, version=version)
+        timeout = self._timeout(timeout)
+        value = self._front_get(front_key)
+        if value is not _MISSING:
+            self._front_set(front_key, value, timeout)
+        touched = self._call_shared("touch", key, timeout, version=version, default=_MISSING)
+        return value is not _MISSING if touched is _MISSING else touched
+
+    def delete(self, key, version=None):
+        front_key = self.make_and_validate_key(key, version=version)
+        deleted = self._front_delete(front_key)
+        return bool(self._call_shared("delete", key, version=version, default=deleted))
+
+    def incr(self, key, delta=1, version=None):
+        front_key = self.make_and_validate_key(key, version=version)
+        # Atómico en Redis; ValueError si la llave no existe
+        value = self._call_shared("incr", key, delta, version=version, default=_MISSING)
+        if value is not _MISSING:
+            self._front_set(front_key, value, DEFAULT_TIMEOUT)
+            return value
+        # Sin Redis: incremento local conservando la expiración
+        state = self._state
+        with state.lock:
+            value, _ = state.lru.get(front_key, time.monotonic())
+            if value is _MISSING:
+                raise ValueError(f"Key '{key}' not found")
+            value = pickle.loads(value) + delta
+            expires = state.lru.data[front_key][0]
+            state.lru.set(front_key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), expires)
+        return value
+
+    def has_key(self, key, version=None):
+        return self.get(key, _MISSING, version=version) is not _MISSING
+
+    def clear(self):
+        with self._state.lock:
+            self._state.lru.data.clear()
+        self._call_shared(_clear_prefix)
+
+    def close(self, **kwargs):
+        if self._shared is not None:
+            self._shared.close(**kwargs)
+
+    def stats(self) -> dict:
+        """Contadores del proceso (hits/misses por nivel, desalojos, errores)."""
+        state = self._state
+        with state.lock:
+            return {
+                **state.metrics,
+                "front_entries": len(state.lru.data),
+                "shared_configured": self._shared is not None,
+                "shared_up": self._shared_up(),
+            }
+
+
+def _clear_prefix(shared: BaseCache) -> None:
+    """
+    Borra del backend compartido solo las llaves de este alias. RedisCache.clear()
+    es FLUSHDB: se llevaría los demás alias (sesiones, rate limit) y cualquier
+    otra cosa en esa base de Redis.
+    """
+    get_client = getattr(getattr(shared, "_cache", None), "get_client", None)
+    if get_client is None:
+        shared.clear()
+        return
+    client = get_client(write=True)
+    # Mismo formato que make_key(): "<KEY_PREFIX>:<versión>:<llave>"
+    pattern = re.sub(r"([*?\[\]\\])", r"\\\1", shared.key_prefix) + ":*"
+    batch = []
+    for key in client.scan_iter(match=pattern, count=1000):
+        batch.append(key)
+        if len(batch) >= 1000:
+            client.delete(*batch)
+            batch = []
+    if batch:
+        client.delete(*batch)
+
+
+def cache_stats() -> dict[str, dict]:
+    """stats() de cada alias de CACHES que use TieredCache."""
+    return {
+        alias: backend.stats()
+        for alias in caches.settings
+        if isinstance(backend := caches[alias], TieredCache)
+    }
+
+
+def is_shared(alias: str) -> bool:
+    """
+    True si lo que se guarda en `alias` lo ven todos los procesos (TieredCache
+    con nivel compartido, Redis, Memcached...). Una LRU sin SHARED o una
+    LocMemCache solo existen en la memoria del worker que escribió.
+    """
+    backend = caches[alias if alias in settings.CACHES else DEFAULT_CACHE_ALIAS]
+    if isinstance(backend, TieredCache):
+        return backend._shared is not None
+    return not isinstance(backend, (LocMemCache, DummyCache))
+
+
+def namespace(alias: str) -> ConnectionProxy:
+    """
+    Proxy al alias `alias` de CACHES (como django.core.cache.cache para
+    "default"); si el alias no está configurado, usa "default".
+    """
+    return ConnectionProxy(caches, alias if alias in settings.CACHES else DEFAULT_CACHE_ALIAS)
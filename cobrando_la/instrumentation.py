@@ -0,0 +1,268 @@
+"""
+Costo por request de las vistas que importan (settings.REQUEST_METRICS_VIEWS):
+tiempo total, consultas y tiempo en la BD, tiempo de render de plantillas y
+hits/misses de caché.
+
+Solo se mide una fracción de los requests (REQUEST_METRICS_SAMPLE_RATE): en
+los demás el middleware cuesta un random() y nada más. Un request muestreado
+se registra como una línea JSON en el logger "cobrando_la.requests", regresa
+un header Server-Timing y se suma a los contadores de /metrics (formato
+Prometheus, si REQUEST_METRICS_ENDPOINT está activo). Los contadores son por
+proceso: cada worker de gunicorn reporta los suyos.
+
+Las consultas se cuentan con un execute_wrapper instalado en cada conexión y
+el render con el backend de plantillas de este módulo (TEMPLATES.BACKEND). Ambos
+leen el request en curso de un ContextVar, así que también cuentan lo que una
+vista async corre en threads con sync_to_async.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from django.template.backends import django as django_backend
+from django.template.exceptions import TemplateDoesNotExist
+
+from bank_details.bins import bin_index_stats
+
+from .cache import cache_stats, request_cache_events
+from .ratelimit import ratelimit_stats
+
+logger = logging.getLogger("cobrando_la.requests")
+
+DEFAULT_VIEWS = ("public_profile", "dashboard", "SignupView", "LoginView")
+
+
+class RequestMetrics:
+    __slots__ = ("view", "started", "queries", "db_time", "template_time", "cache")
+
+    def __init__(self):
+        self.view = None
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.cache: Counter[str] = Counter()
+
+
+_current: ContextVar[RequestMetrics | None] = ContextVar("request_metrics", default=None)
+
+
+# -- BD ---------------------------------------------------------------------
+
+def _db_wrapper(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - started
+
+
+def _install_db_wrapper(sender, connection, **kwargs):
+    if _db_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_db_wrapper)
+
+
+connection_created.connect(_install_db_wrapper, dispatch_uid="cobrando_la.instrumentation")
+
+
+# -- Plantillas ---------------------------------------------------------------
+
+class TimedTemplate(django_backend.Template):
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return super().render(context, request)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            # Solo plantillas de primer nivel: los {% include %} no pasan por aquí
+            metrics.template_time += time.perf_counter() - started
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    """El backend de Django, midiendo el render de cada plantilla."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            django_backend.reraise(exc, self)
+
+
+# -- Agregados para /metrics --------------------------------------------------
+
+_totals: defaultdict[str, Counter[str]] = defaultdict(Counter)
+_totals_lock = threading.Lock()
+
+
+def _record(metrics: RequestMetrics, total: float) -> None:
+    with _totals_lock:
+        totals = _totals[metrics.view]
+        totals["requests"] += 1
+        totals["seconds"] += total
+        totals["db_queries"] += metrics.queries
+        totals["db_seconds"] += metrics.db_time
+        totals["template_seconds"] += metrics.template_time
+        totals["cache_hits"] += metrics.cache["hits"]
+        totals["cache_misses"] += metrics.cache["misses"]
+
+
+def _server_timing(metrics: RequestMetrics, total: float) -> str:
+    return ", ".join((
+        f"total;dur={total * 1000:.1f}",
+        f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+        f"tpl;dur={metrics.template_time * 1000:.1f}",
+        f'cache;desc="{metrics.cache["hits"]} hit {metrics.cache["misses"]} miss"',
+    ))
+
+
+# -- Middleware ---------------------------------------------------------------
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "REQUEST_METRICS_SAMPLE_RATE", 0.05)
+        self.views = frozenset(getattr(settings, "REQUEST_METRICS_VIEWS", DEFAULT_VIEWS))
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+        metrics, tokens = self._start()
+        try:
+            response = self.get_response(request)
+        finally:
+            self._stop(tokens)
+        return self._finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        if random.random() >= self.sample_rate:
+            return await self.get_response(request)
+        metrics, tokens = self._start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            self._stop(tokens)
+        return self._finish(request, response, metrics)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = _current.get()
+        if metrics is not None:
+            view = getattr(view_func, "view_class", view_func)
+            metrics.view = view.__name__
+
+    @staticmethod
+    def _start():
+        metrics = RequestMetrics()
+        return metrics, (_current.set(metrics), request_cache_events.set(metrics.cache))
+
+    @staticmethod
+    def _stop(tokens):
+        _current.reset(tokens[0])
+        request_cache_events.reset(tokens[1])
+
+    def _finish(self, request, response, metrics: RequestMetrics):
+        if metrics.view not in self.views:
+            return response
+        total = time.perf_counter() - metrics.started
+        response["Server-Timing"] = _server_timing(metrics, total)
+        _record(metrics, total)
+        logger.info(json.dumps({
+            "view": metrics.view,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "ms": round(total * 1000, 2),
+            "db_queries": metrics.queries,
+            "db_ms": round(metrics.db_time * 1000, 2),
+            "template_ms": round(metrics.template_time * 1000, 2),
+            "cache_hits": metrics.cache["hits"],
+            "cache_misses": metrics.cache["misses"],
+        }))
+        return response
+
+
+# -- /metrics -----------------------------------------------------------------
+
+_SERIES = (
+    # (llave en _totals, nombre, tipo, ayuda)
+    ("requests", "cobrando_requests_sampled_total", "counter", "Requests muestreados."),
+    ("seconds", "cobrando_request_seconds_total", "counter", "Tiempo total de los requests muestreados."),
+    ("db_queries", "cobrando_request_db_queries_total", "counter", "Consultas SQL."),
+    ("db_seconds", "cobrando_request_db_seconds_total", "counter", "Tiempo en la BD."),
+    ("template_seconds", "cobrando_request_template_seconds_total", "counter", "Tiempo de render de plantillas."),
+    ("cache_hits", "cobrando_request_cache_hits_total", "counter", "Hits de caché."),
+    ("cache_misses", "cobrando_request_cache_misses_total", "counter", "Misses de caché."),
+)
+
+
+def render_metrics() -> str:
+    """Contadores del proceso en formato de texto de Prometheus."""
+    with _totals_lock:
+        totals = {view: dict(counter) for view, counter in _totals.items()}
+    lines = [
+        "# HELP cobrando_request_sample_rate Fracción de requests medidos.",
+        "# TYPE cobrando_request_sample_rate gauge",
+        f"cobrando_request_sample_rate {getattr(settings, 'REQUEST_METRICS_SAMPLE_RATE', 0.05)}",
+    ]
+    for key, name, kind, help_text in _SERIES:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        lines += [f'{name}{{view="{view}"}} {values.get(key, 0)}' for view, values in sorted(totals.items())]
+
+    stats = cache_stats()
+    for key, help_text in (("front_hits", "Hits en la LRU del proceso."),
+                           ("shared_hits", "Hits en Redis."),
+                           ("shared_misses", "Misses en Redis."),
+                           ("evictions", "Entradas desalojadas de la LRU."),
+                           ("shared_errors", "Errores al hablar con Redis.")):
+        name = f"cobrando_cache_{key}_total"
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        lines += [f'{name}{{alias="{alias}"}} {values.get(key, 0)}' for alias, values in sorted(stats.items())]
+
+    bins = bin_index_stats()
+    for key, kind, help_text in (("hits", "counter", "Tarjetas cuyo BIN está en la tabla."),
+                                 ("misses", "counter", "Tarjetas cuyo BIN no está en la tabla."),
+                                 ("entries", "gauge", "Prefijos en el índice de BINs.")):
+        name = f"cobrando_card_bin_{key}" + ("_total" if kind == "counter" else "")
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {bins.get(key, 0)}"]
+
+    name = "cobrando_ratelimit_requests_total"
+    lines += [f"# HELP {name} POST a vistas con límite de intentos, por resultado.", f"# TYPE {name} counter"]
+    lines += [
+        f'{name}{{scope="{scope}",result="{result}"}} {count}'
+        for scope, counters in sorted(ratelimit_stats().items())
+        for result, count in sorted(counters.items())
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view(request):
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        raise PermissionDenied
+    return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
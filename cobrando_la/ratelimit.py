@@ -0,0 +1,144 @@
+"""
+Límite de intentos por token bucket (settings.RATE_LIMITS), para los POST
+de login, registro y recuperación de contraseña.
+
+Cada scope tiene un bucket por IP y, opcionalmente, uno por identificador
+(email o teléfono): `capacity` fichas que se rellenan por completo en
+`period` segundos. Cada POST toma una ficha de cada bucket; si alguno está
+vacío se responde 429 sin llegar a la vista, es decir, sin correr el hasher.
+Con `refund_if` la ficha del identificador se devuelve cuando el intento
+salió bien (un login correcto), así el dueño de la cuenta no se queda fuera
+por sus propios logins; solo los fallidos agotan su bucket.
+Revisar cuesta una lectura del caché (alias "ratelimit") y, si pasa, una
+escritura.
+
+Leer y escribir no es atómico: con requests simultáneos del mismo cliente
+pueden pasar unos cuantos de más (tantos como threads atendiéndolo), lo que
+no cambia el efecto contra una ráfaga. Sin caché disponible no se limita.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import Counter, defaultdict
+from functools import wraps
+
+from django.conf import settings
+from django.http import HttpResponse
+
+from .cache import namespace
+
+cache = namespace("ratelimit")
+
+_stats: defaultdict[str, Counter[str]] = defaultdict(Counter)
+_stats_lock = threading.Lock()
+
+
+def client_ip(request) -> str:
+    """
+    IP del cliente. Detrás de RATE_LIMIT_PROXY_COUNT proxies se toma de
+    X-Forwarded-For, contando desde la derecha (lo que agregó el proxy
+    propio, no lo que mande el cliente).
+    """
+    proxies = getattr(settings, "RATE_LIMIT_PROXY_COUNT", 0)
+    if proxies:
+        forwarded = [ip.strip() for ip in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",") if ip.strip()]
+        if len(forwarded) >= proxies:
+            return forwarded[-proxies]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def _bucket_key(scope: str, kind: str, value: str) -> str:
+    digest = hashlib.sha256(value.encode()).hexdigest()[:32]  # sin PII en las llaves
+    return f"{scope}:{kind}:{digest}"
+
+
+def take(scope: str, kind: str, value: str, capacity: int, period: float) -> float:
+    """
+    Toma una ficha del bucket (scope, kind, value). Regresa 0 si había, o
+    los segundos que faltan para la siguiente.
+    """
+    key = _bucket_key(scope, kind, value)
+    rate = capacity / period
+    now = time.time()
+    state = cache.get(key)
+    if state is None:
+        tokens = capacity
+    else:
+        tokens, last = state
+        tokens = min(capacity, tokens + (now - last) * rate)
+    if tokens < 1:
+        return (1 - tokens) / rate
+    # Tras `period` sin uso el bucket ya está lleno: la entrada puede expirar
+    cache.set(key, (tokens - 1, now), period)
+    return 0.0
+
+
+def refund(scope: str, kind: str, value: str, capacity: int, period: float) -> None:
+    """Devuelve al bucket la ficha que tomó take()."""
+    key = _bucket_key(scope, kind, value)
+    state = cache.get(key)
+    if state is not None:
+        tokens, last = state
+        cache.set(key, (min(capacity, tokens + 1), last), period)
+
+
+def _count(scope: str, result: str) -> None:
+    with _stats_lock:
+        _stats[scope][result] += 1
+
+
+def ratelimit_stats() -> dict[str, dict[str, int]]:
+    """Contadores del proceso por scope: allowed, denied_ip, denied_identifier."""
+    with _stats_lock:
+        return {scope: dict(counter) for scope, counter in _stats.items()}
+
+
+def too_many_requests(retry_after: float) -> HttpResponse:
+    response = HttpResponse(
+        "Demasiados intentos. Espera un momento y vuelve a intentarlo.\n",
+        status=429,
+        content_type="text/plain; charset=utf-8",
+    )
+    response["Retry-After"] = str(max(1, round(retry_after)))
+    return response
+
+
+def ratelimit(scope: str, identifiers=None, refund_if=None):
+    """
+    Aplica RATE_LIMITS[scope] a los POST de la vista. `identifiers(request)`
+    regresa los identificadores (ya normalizados) que trae el formulario;
+    si `refund_if(request, response)` es verdadero, sus fichas se devuelven.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            rules = getattr(settings, "RATE_LIMITS", {}).get(scope)
+            if request.method != "POST" or not rules or not getattr(settings, "RATE_LIMIT_ENABLED", True):
+                return view(request, *args, **kwargs)
+
+            if "ip" in rules:
+                wait = take(scope, "ip", client_ip(request), *rules["ip"])
+                if wait:
+                    _count(scope, "denied_ip")
+                    return too_many_requests(wait)
+            taken = []
+            if "identifier" in rules and identifiers is not None:
+                for value in identifiers(request):
+                    wait = take(scope, "identifier", value, *rules["identifier"])
+                    if wait:
+                        _count(scope, "denied_identifier")
+                        return too_many_requests(wait)
+                    taken.append(value)
+
+            _count(scope, "allowed")
+            response = view(request, *args, **kwargs)
+            if taken and refund_if is not None and refund_if(request, response):
+                for value in taken:
+                    refund(scope, "identifier", value, *rules["identifier"])
+            return response
+
+        return wrapper
+
+    return decorator
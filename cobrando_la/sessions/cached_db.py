@@ -0,0 +1,10 @@
+from django.contrib.sessions.backends import cached_db
+
+from . import clear_expired_in_batches
+
+
+class SessionStore(cached_db.SessionStore):
+    # Las entradas en caché vencen solas (timeout = edad de la sesión)
+    @classmethod
+    def clear_expired(cls):
+        clear_expired_in_batches(cls.get_model_class())
@@ -0,0 +1,9 @@
+from django.contrib.sessions.backends import db
+
+from . import clear_expired_in_batches
+
+
+class SessionStore(db.SessionStore):
+    @classmethod
+    def clear_expired(cls):
+        clear_expired_in_batches(cls.get_model_class())
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -61,13 +62,25 @@ TAILWIND_APP_NAME = 'theme'
 AUTH_USER_MODEL = 'accounts.User'
 
 # Backend de autenticación personalizado para soportar email o teléfono
+# Un solo backend: email o teléfono (normalizado), una consulta y un hash por intento
 AUTHENTICATION_BACKENDS = [
     'accounts.backends.EmailOrPhoneBackend',
-    'django.contrib.auth.backends.ModelBackend',
 ]
 
+# wsgi o asgi; cobrando_la/asgi.py pone asgi. WhiteNoiseMiddleware es solo
+# sync: bajo ASGI Django lo correría en un thread en cada request (también
+# los de vistas async), así que ahí los estáticos se sirven antes de Django
+# (cobrando_la/asgi_static.py) y la cadena queda toda async.
+SERVER_MODE = config('DJANGO_SERVER', default='wsgi')
+if SERVER_MODE not in ('wsgi', 'asgi'):
+    raise ImproperlyConfigured(f"DJANGO_SERVER inválido: {SERVER_MODE!r} (wsgi o asgi)")
+
 MIDDLEWARE = [
+    # Primero: así mide también sesión y autenticación (ver REQUEST_METRICS_*)
+    'cobrando_la.instrumentation.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # Estáticos con hash, comprimidos y cacheables para siempre (ver cobrando_la/storage.py)
+    *(['whitenoise.middleware.WhiteNoiseMiddleware'] if SERVER_MODE == 'wsgi' else []),
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -86,15 +99,24 @@ ROOT_URLCONF = 'cobrando_la.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates, midiendo el render para RequestMetricsMiddleware
+        'BACKEND': 'cobrando_la.instrumentation.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Plantillas compiladas una sola vez por proceso. Explícito (y sin
+            # APP_DIRS) para no depender del default; en DEBUG el autoreload
+            # de runserver limpia este caché al editar una plantilla.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
@@ -116,6 +138,143 @@ DATABASES = {
         }
     }
 
+# Manejo de conexiones a PostgreSQL (DJANGO_DB_POOL_MODE):
+#   none       -> una conexión nueva por request (comportamiento de Django por defecto)
+#   persistent -> cada thread de gunicorn reutiliza su conexión hasta CONN_MAX_AGE
+#   pool       -> pool nativo de psycopg 3 por proceso (ajusta MAX_SIZE >= --threads)
+#   pgbouncer  -> detrás de PgBouncer en modo transaction: sin cursores del lado
+#                 del servidor ni prepared statements
+DB_POOL_MODE = config('DJANGO_DB_POOL_MODE', default='persistent')
+
+if DB_POOL_MODE == 'none':
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+elif DB_POOL_MODE == 'persistent':
+    DATABASES['default']['CONN_MAX_AGE'] = config('DJANGO_DB_CONN_MAX_AGE', default=60, cast=int)
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+elif DB_POOL_MODE == 'pool':
+    # El pool exige CONN_MAX_AGE = 0. Con CONN_HEALTH_CHECKS Django le pasa
+    # check=ConnectionPool.check_connection: revisa la conexión al prestarla
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': config('DJANGO_DB_POOL_MIN_SIZE', default=1, cast=int),
+            'max_size': config('DJANGO_DB_POOL_MAX_SIZE', default=4, cast=int),
+            'timeout': config('DJANGO_DB_POOL_TIMEOUT', default=10, cast=int),
+        },
+    }
+elif DB_POOL_MODE == 'pgbouncer':
+    DATABASES['default']['CONN_MAX_AGE'] = config('DJANGO_DB_CONN_MAX_AGE', default=60, cast=int)
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+    DATABASES['default']['OPTIONS'] = {'prepare_threshold': None}
+else:
+    raise ImproperlyConfigured(
+        f"DJANGO_DB_POOL_MODE inválido: {DB_POOL_MODE!r} (none, persistent, pool o pgbouncer)"
+    )
+
+
+# Caché (ver cobrando_la/cache.py): LRU por worker delante de Redis compartido.
+# Sin DJANGO_CACHE_REDIS_URL cada worker tiene solo su LRU (como LocMemCache).
+# Un alias por namespace: mismas llaves en Redis separadas por KEY_PREFIX y
+# métricas por separado. FRONT_TIMEOUT es lo que un worker puede tardar en ver
+# lo que escribió otro (los perfiles usan versiones, así que va bajo).
+CACHE_REDIS_URL = config('DJANGO_CACHE_REDIS_URL', default='')
+
+
+def _tiered_cache(namespace, front_max_entries, front_timeout, max_timeout=None):
+    options = {
+        'FRONT_MAX_ENTRIES': front_max_entries,
+        'FRONT_TIMEOUT': front_timeout,
+        'MAX_TIMEOUT': max_timeout,
+        'SHARED_RETRY_AFTER': config('DJANGO_CACHE_RETRY_AFTER', default=30, cast=int),
+    }
+    if CACHE_REDIS_URL:
+        options['SHARED'] = {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+            # Falla rápido si Redis no responde; TieredCache sigue con la LRU
+            'OPTIONS': {'socket_connect_timeout': 0.5, 'socket_timeout': 0.5},
+        }
+    return {
+        'BACKEND': 'cobrando_la.cache.TieredCache',
+        'LOCATION': namespace,
+        'KEY_PREFIX': namespace,
+        'TIMEOUT': 300,
+        'OPTIONS': options,
+    }
+
+
+CACHES = {
+    'default': _tiered_cache('default', 1000, 30),
+    # Versiones, HTML y validadores de /u/<slug>/ (bank_details/profile_cache.py)
+    'profiles': _tiered_cache('profiles', 2000, 2),
+    # QR en SVG/PNG de cada perfil
+    'svg': _tiered_cache('svg', 500, 60),
+    # Catálogo de bancos publicado por sync_bank_codes (bank_details/bank_codes.py)
+    'bank_codes': _tiered_cache('bank_codes', 16, 30),
+}
+
+# Sesiones (DJANGO_SESSION_ENGINE):
+#   db        -> lee django_session en cada request con sesión
+#   cached_db -> lee de Redis (alias "sessions") y escribe en Redis y en la BD;
+#                default cuando hay DJANGO_CACHE_REDIS_URL
+#   cache     -> solo Redis, sin la BD: se pierden si Redis se vacía. Solo para
+#                sesiones cortas (DJANGO_SESSION_COOKIE_AGE)
+# El alias "sessions" no tiene LRU por worker (un logout debe verse en todos
+# los workers al instante). Con cached_db cada entrada vive máximo 15 min en
+# Redis, para que una sesión cambiada mientras Redis estaba caído no reviva.
+# `manage.py clearsessions` borra las vencidas por lotes (cobrando_la/sessions).
+SESSION_ENGINES = {
+    'db': 'cobrando_la.sessions.db',
+    'cached_db': 'cobrando_la.sessions.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+}
+SESSION_MODE = config('DJANGO_SESSION_ENGINE', default='cached_db' if CACHE_REDIS_URL else 'db')
+if SESSION_MODE not in SESSION_ENGINES:
+    raise ImproperlyConfigured(
+        f"DJANGO_SESSION_ENGINE inválido: {SESSION_MODE!r} (db, cached_db o cache)"
+    )
+if SESSION_MODE == 'cache' and not CACHE_REDIS_URL:
+    raise ImproperlyConfigured("DJANGO_SESSION_ENGINE=cache requiere DJANGO_CACHE_REDIS_URL")
+SESSION_ENGINE = SESSION_ENGINES[SESSION_MODE]
+SESSION_CACHE_ALIAS = 'sessions'
+SESSION_COOKIE_AGE = config('DJANGO_SESSION_COOKIE_AGE', default=60 * 60 * 24 * 14, cast=int)
+CACHES['sessions'] = _tiered_cache(
+    'sessions', 0, None, max_timeout=60 * 15 if SESSION_MODE == 'cached_db' else None,
+)
+# Límite de intentos (cobrando_la/ratelimit.py). Con Redis los buckets son de
+# todos los workers y sin LRU; sin Redis, de cada worker
+CACHES['ratelimit'] = _tiered_cache('ratelimit', 0 if CACHE_REDIS_URL else 10000, None)
+SESSION_CLEAR_BATCH_SIZE = config('DJANGO_SESSION_CLEAR_BATCH_SIZE', default=1000, cast=int)
+SESSION_CLEAR_PAUSE = config('DJANGO_SESSION_CLEAR_PAUSE', default=0.1, cast=float)
+
+
+# Límite de POST a login, registro y recuperación de contraseña, por IP y
+# por email/teléfono: (fichas, segundos en rellenarse). Un login fallido
+# cuesta un hash completo, así que una ráfaga sin límite tumba los workers.
+RATE_LIMIT_ENABLED = config('DJANGO_RATE_LIMIT_ENABLED', default=True, cast=bool)
+RATE_LIMITS = {
+    'login': {'ip': (30, 60), 'identifier': (10, 600)},
+    'signup': {'ip': (10, 600)},
+    'password_reset': {'ip': (10, 600), 'identifier': (3, 900)},
+}
+# Proxies propios delante de gunicorn (la IP del cliente se toma de
+# X-Forwarded-For); 0 si gunicorn recibe las conexiones directo
+RATE_LIMIT_PROXY_COUNT = config('DJANGO_RATE_LIMIT_PROXY_COUNT', default=0 if DEBUG else 1, cast=int)
+
+# Costo del hash de contraseñas: cada login (exitoso o no) corre PBKDF2 una
+# vez. 0 = las iteraciones por defecto de Django; subirlo o bajarlo rehace
+# cada hash en el siguiente login del usuario
+PASSWORD_HASH_ITERATIONS = config('DJANGO_PASSWORD_HASH_ITERATIONS', default=0, cast=int)
+
+PASSWORD_HASHERS = [
+    'accounts.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -158,6 +317,13 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
 
+# collectstatic genera nombres con hash de contenido y variantes .br/.gz;
+# hay que correrlo en cada deploy (staticfiles.json se regenera)
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'cobrando_la.storage.StaticFilesStorage'},
+}
+
 # Font configuration
 STATICFILES_FINDERS = [
     'django.contrib.staticfiles.finders.FileSystemFinder',
@@ -181,7 +347,15 @@ REGISTRATION_OPEN = True  # El registro está abierto
 # Configuración de email (para reset de contraseña)
 # En desarrollo, mostrar emails en consola. En producción, enviar por SMTP
 
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Con outbox (default) el request solo encola el correo en QueuedEmail y
+# `manage.py send_queued_mail --loop` lo envía con OUTBOX_EMAIL_BACKEND
+EMAIL_OUTBOX = config('DJANGO_EMAIL_OUTBOX', default=True, cast=bool)
+OUTBOX_EMAIL_BACKEND = config('DJANGO_OUTBOX_EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_BACKEND = 'accounts.mail.QueuedEmailBackend' if EMAIL_OUTBOX else OUTBOX_EMAIL_BACKEND
+# Reintentos del worker: backoff de 1, 2, 4... veces OUTBOX_RETRY_BACKOFF segundos
+OUTBOX_MAX_ATTEMPTS = config('DJANGO_OUTBOX_MAX_ATTEMPTS', default=8, cast=int)
+OUTBOX_RETRY_BACKOFF = config('DJANGO_OUTBOX_RETRY_BACKOFF', default=60, cast=int)
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=10, cast=int)
 EMAIL_HOST = config('EMAIL_HOST')
 EMAIL_PORT = config('EMAIL_PORT', cast=int)
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', cast=bool)
@@ -195,6 +369,46 @@ RESERVED_PUBLIC_SLUGS = {
     "dashboard", "static", "media", "api", "robots.txt", "favicon.ico",
 }
 
+# Segundos que se guarda el HTML renderizado de /u/<slug>/ (se invalida al editar)
+PUBLIC_PROFILE_CACHE_TIMEOUT = config('PUBLIC_PROFILE_CACHE_TIMEOUT', default=60 * 60, cast=int)
+# Se mezcla en el ETag y la llave del HTML de /u/<slug>/ junto con el hash de
+# la plantilla y del manifest de estáticos, p.ej. el commit del deploy
+DEPLOY_VERSION = config('DJANGO_DEPLOY_VERSION', default='')
+
+# Segundos que se guardan las páginas de home/ (respuesta completa para anónimos
+# y fragmentos {% cache %}); `manage.py warm_page_cache` las renueva en cada deploy
+HOME_PAGE_CACHE_TIMEOUT = config('HOME_PAGE_CACHE_TIMEOUT', default=60 * 60 * 24, cast=int)
+
+# Métricas por request (cobrando_la/instrumentation.py): fracción de requests
+# medidos, vistas que se reportan y endpoint /metrics en formato Prometheus
+# (protegido con `Authorization: Bearer <METRICS_TOKEN>` si el token está definido)
+REQUEST_METRICS_SAMPLE_RATE = config('REQUEST_METRICS_SAMPLE_RATE', default=0.05, cast=float)
+REQUEST_METRICS_VIEWS = ['public_profile', 'dashboard', 'SignupView', 'LoginView']
+REQUEST_METRICS_ENDPOINT = config('REQUEST_METRICS_ENDPOINT', default=False, cast=bool)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'requests': {'class': 'logging.StreamHandler', 'formatter': 'message'},
+    },
+    'loggers': {
+        # Una línea JSON por request muestreado
+        'cobrando_la.requests': {'handlers': ['requests'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+# Tabla de BINs para detectar marca/banco de tarjetas (ver bank_details/bins.py)
+BIN_DATA_FILE = config('BIN_DATA_FILE', default=str(BASE_DIR / 'bank_details' / 'data' / 'card_bins.csv'))
+
+# Catálogo de bancos/plazas de Banxico (manage.py sync_bank_codes lo reescribe)
+BANK_CODES_FILE = config('BANK_CODES_FILE', default=str(BASE_DIR / 'bank_details' / 'data' / 'bank_codes.json'))
+BANK_CODES_RELOAD_INTERVAL = config('BANK_CODES_RELOAD_INTERVAL', default=60, cast=int)
+
 # CSRF Configuration for Production
 CSRF_TRUSTED_ORIGINS = [
     "https://www.cobrando.lat",
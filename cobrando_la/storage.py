@@ -0,0 +1,20 @@
+"""
+Storage de archivos estáticos (STORAGES["staticfiles"]).
+
+collectstatic copia cada archivo con el hash de su contenido en el nombre
+(dashboard.3f2a9c1b.js), genera sus variantes .br y .gz, y escribe
+staticfiles.json; {% static %} resuelve con ese manifest. WhiteNoiseMiddleware
+sirve los nombres con hash con `Cache-Control: immutable` de un año y la
+variante comprimida que acepte el navegador: quien vuelve no descarga nada
+hasta que el archivo cambia (y con él, su nombre).
+"""
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+class StaticFilesStorage(CompressedManifestStaticFilesStorage):
+    def stored_name(self, name):
+        # Sin manifest (desarrollo o pruebas sin collectstatic) se usan los
+        # nombres originales; con manifest, un archivo que falte sí es error
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
@@ -0,0 +1,315 @@
+import json
+import os
+import runpy
+import tempfile
+from datetime import timedelta
+from unittest import mock, skipUnless
+
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+
+from django.contrib.sessions.models import Session
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import PermissionDenied
+from django.core.management import call_command
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from accounts.models import User
+from . import sessions
+from .asgi_static import ASGIStaticFiles
+from .cache import TieredCache
+from .instrumentation import metrics_view
+from .ratelimit import cache as ratelimit_cache, ratelimit_stats
+
+try:
+    import redis
+except ImportError:
+    redis = None
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+REDIS_BACKEND = "django.core.cache.backends.redis.RedisCache"
+
+
+def _tiered(location, shared=None, **options):
+    return TieredCache(location, {"KEY_PREFIX": "test", "OPTIONS": {**options, "SHARED": shared}})
+
+
+class TieredCacheFrontTests(SimpleTestCase):
+    """Sin nivel compartido: LRU acotada por proceso."""
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = _tiered(self.id(), FRONT_MAX_ENTRIES=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_entries_expire(self):
+        cache = _tiered(self.id())
+        cache.set("gone", 1, timeout=0)
+        cache.set("forever", 1, timeout=None)
+        self.assertIsNone(cache.get("gone"))
+        self.assertEqual(cache.get("forever"), 1)
+
+    def test_values_are_copies(self):
+        cache = _tiered(self.id())
+        cache.set("session", {"k": 1})
+        cache.get("session")["k"] = 2
+        self.assertEqual(cache.get("session"), {"k": 1})
+
+    def test_incr_without_shared_tier(self):
+        cache = _tiered(self.id())
+        cache.set("n", 1, timeout=None)
+        self.assertEqual(cache.incr("n"), 2)
+        with self.assertRaises(ValueError):
+            cache.incr("missing")
+
+
+@skipUnless(fakeredis, "requiere fakeredis")
+class TieredCacheSharedTests(SimpleTestCase):
+    def setUp(self):
+        self.shared = {
+            "BACKEND": REDIS_BACKEND,
+            "LOCATION": "redis://fake:6379/0",
+            "OPTIONS": {"connection_class": fakeredis.FakeConnection, "server": fakeredis.FakeServer()},
+        }
+
+    def test_writes_reach_other_workers(self):
+        worker_a = _tiered(f"{self.id()}-a", self.shared)
+        worker_b = _tiered(f"{self.id()}-b", self.shared)
+        worker_a.set("k", "v")
+        self.assertEqual(worker_b.get("k"), "v")
+        self.assertEqual(worker_b.get("k"), "v")
+        stats = worker_b.stats()
+        self.assertEqual((stats["shared_hits"], stats["front_hits"]), (1, 1))
+
+    def test_namespaces_do_not_collide(self):
+        profiles = TieredCache(f"{self.id()}-p", {"KEY_PREFIX": "profiles", "OPTIONS": {"SHARED": self.shared}})
+        svg = TieredCache(f"{self.id()}-s", {"KEY_PREFIX": "svg", "OPTIONS": {"SHARED": self.shared}})
+        profiles.set("k", "perfil")
+        self.assertIsNone(svg.get("k"))
+
+    def test_clear_only_removes_its_namespace(self):
+        profiles = TieredCache(f"{self.id()}-p", {"KEY_PREFIX": "profiles", "OPTIONS": {"SHARED": self.shared}})
+        svg = TieredCache(f"{self.id()}-s", {"KEY_PREFIX": "svg", "OPTIONS": {"SHARED": self.shared}})
+        other = fakeredis.FakeRedis(server=self.shared["OPTIONS"]["server"])
+        other.set("celery-task", "x")
+        for i in range(1500):
+            profiles.set(f"k{i}", i)
+        svg.set("k", "qr")
+        profiles.clear()
+        self.assertIsNone(profiles.get("k1"))
+        self.assertEqual(other.keys("profiles:*"), [])
+        self.assertEqual(len(other.keys("svg:*")), 1)
+        self.assertEqual(other.get("celery-task"), b"x")
+
+    def test_incr_is_shared(self):
+        worker_a = _tiered(f"{self.id()}-a", self.shared)
+        worker_b = _tiered(f"{self.id()}-b", self.shared)
+        worker_a.set("n", 1, timeout=None)
+        worker_b.incr("n")
+        self.assertEqual(worker_a.incr("n"), 3)
+
+
+@skipUnless(redis, "requiere redis-py")
+class TieredCacheDegradedTests(SimpleTestCase):
+    def test_serves_from_front_when_shared_is_down(self):
+        # Puerto 1: conexión rechazada al instante
+        cache = _tiered(self.id(), {
+            "BACKEND": REDIS_BACKEND,
+            "LOCATION": "redis://127.0.0.1:1/0",
+            "OPTIONS": {"socket_connect_timeout": 0.2},
+        }, SHARED_RETRY_AFTER=60)
+        with self.assertLogs("cobrando_la.cache", "WARNING"):
+            cache.set("k", "v")
+        self.assertEqual(cache.get("k"), "v")
+        self.assertTrue(cache.add("n", 1))
+        self.assertEqual(cache.incr("n"), 2)
+        stats = cache.stats()
+        # Tras el primer error ya no se intenta hasta SHARED_RETRY_AFTER
+        self.assertEqual(stats["shared_errors"], 1)
+        self.assertFalse(stats["shared_up"])
+
+
+class RequestMetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email="ana@example.com")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=1)
+    def test_sampled_request_is_reported(self):
+        with self.assertLogs("cobrando_la.requests", "INFO") as logs:
+            response = self.client.get(reverse("dashboard"))
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual((line["view"], line["status"]), ("dashboard", 200))
+        # sesión + usuario + BankDetails
+        self.assertEqual(line["db_queries"], 3)
+        self.assertGreater(line["template_ms"], 0)
+        self.assertIn('db;dur=', response["Server-Timing"])
+        self.assertIn('desc="3 queries"', response["Server-Timing"])
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=0)
+    def test_unsampled_request_is_untouched(self):
+        response = self.client.get(reverse("dashboard"))
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=1, METRICS_TOKEN="secreto")
+    def test_metrics_endpoint(self):
+        self.client.get(reverse("dashboard"))
+        factory = RequestFactory()
+        with self.assertRaises(PermissionDenied):
+            metrics_view(factory.get("/metrics"))
+        response = metrics_view(factory.get("/metrics", headers={"Authorization": "Bearer secreto"}))
+        self.assertIn('cobrando_request_db_queries_total{view="dashboard"}', response.content.decode())
+
+
+class StaticFilesTests(SimpleTestCase):
+    def test_collected_files_are_hashed_compressed_and_immutable(self):
+        with tempfile.TemporaryDirectory() as root, override_settings(STATIC_ROOT=root):
+            call_command("collectstatic", interactive=False, verbosity=0)
+            url = staticfiles_storage.url("js/dashboard.js")
+            self.assertRegex(url, r"/static/js/dashboard\.[0-9a-f]{12}\.js$")
+
+            response = self.client.get(url, headers={"Accept-Encoding": "gzip, br"})
+            self.assertEqual(response["Content-Encoding"], "br")
+            self.assertIn("immutable", response["Cache-Control"])
+            response.close()
+
+    def test_without_manifest_names_are_unhashed(self):
+        with tempfile.TemporaryDirectory() as root, override_settings(STATIC_ROOT=root):
+            self.assertEqual(staticfiles_storage.url("js/dashboard.js"), "/static/js/dashboard.js")
+
+
+
+class ASGIProfileTests(SimpleTestCase):
+    """Bajo ASGI ningún middleware debe forzar un thread por request."""
+
+    def _middleware(self, server):
+        with mock.patch.dict(os.environ, {"DJANGO_SERVER": server}):
+            return runpy.run_module("cobrando_la.settings")["MIDDLEWARE"]
+
+    def test_asgi_middleware_chain_is_async_capable(self):
+        middleware = self._middleware("asgi")
+        self.assertNotIn("whitenoise.middleware.WhiteNoiseMiddleware", middleware)
+        for path in middleware:
+            with self.subTest(middleware=path):
+                self.assertTrue(getattr(import_string(path), "async_capable", False))
+        # Bajo WSGI los estáticos siguen en el middleware
+        self.assertIn("whitenoise.middleware.WhiteNoiseMiddleware", self._middleware("wsgi"))
+
+    async def _get(self, app, path, headers=()):
+        communicator = ApplicationCommunicator(app, {
+            "type": "http", "method": "GET", "path": path, "root_path": "",
+            "query_string": b"", "headers": list(headers),
+        })
+        await communicator.send_input({"type": "http.request", "body": b""})
+        start = await communicator.receive_output()
+        body = b""
+        while True:
+            message = await communicator.receive_output()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                return start["status"], dict(start["headers"]), body
+
+    async def test_static_files_are_served_before_django(self):
+        async def django_app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 204, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        with tempfile.TemporaryDirectory() as root, override_settings(STATIC_ROOT=root):
+            await sync_to_async(call_command)("collectstatic", interactive=False, verbosity=0)
+            app = ASGIStaticFiles(django_app)
+            url = staticfiles_storage.url("js/dashboard.js")
+            status, headers, body = await self._get(app, url, [(b"accept-encoding", b"gzip, br")])
+            self.assertEqual(status, 200)
+            self.assertEqual(headers[b"content-encoding"], b"br")
+            self.assertIn(b"immutable", headers[b"cache-control"])
+            self.assertEqual(len(body), int(headers[b"content-length"]))
+            status, _, _ = await self._get(app, "/u/ana/")
+            self.assertEqual(status, 204)
+
+@override_settings(RATE_LIMITS={"login": {"ip": (3, 60), "identifier": (2, 600)}})
+class RateLimitTests(TestCase):
+    def setUp(self):
+        ratelimit_cache.clear()
+
+    def _login(self, username, ip="10.0.0.1"):
+        return self.client.post(reverse("login"), {"username": username, "password": "x"}, REMOTE_ADDR=ip)
+
+    def test_identifier_bucket_is_shared_across_formats(self):
+        self.assertEqual(self._login("9981234567", ip="10.0.0.1").status_code, 200)
+        self.assertEqual(self._login("+52 998 123 4567", ip="10.0.0.2").status_code, 200)
+        response = self._login("(998) 123-4567", ip="10.0.0.3")
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(int(response["Retry-After"]) > 0)
+
+    def test_successful_logins_are_refunded(self):
+        user = User.objects.create(email="ana@example.com")
+        user.set_password("clave-segura-123")
+        user.save()
+        for i in range(3):
+            response = self.client.post(
+                reverse("login"), {"username": "ana@example.com", "password": "clave-segura-123"},
+                REMOTE_ADDR=f"10.0.1.{i}",
+            )
+            self.assertEqual(response.status_code, 302)
+            self.client.logout()
+        # Los logins correctos no gastaron el bucket: aún caben 2 fallidos
+        self.assertEqual(self._login("ana@example.com", ip="10.0.2.1").status_code, 200)
+        self.assertEqual(self._login("ana@example.com", ip="10.0.2.2").status_code, 200)
+        self.assertEqual(self._login("ana@example.com", ip="10.0.2.3").status_code, 429)
+
+    def test_ip_bucket_blocks_before_hashing(self):
+        for i in range(3):
+            self.assertEqual(self._login(f"user{i}@example.com").status_code, 200)
+        denied = ratelimit_stats().get("login", {}).get("denied_ip", 0)
+        with self.assertNumQueries(0):
+            self.assertEqual(self._login("otro@example.com").status_code, 429)
+        self.assertEqual(ratelimit_stats()["login"]["denied_ip"], denied + 1)
+        # GET no cuenta
+        self.assertEqual(self.client.get(reverse("login"), REMOTE_ADDR="10.0.0.1").status_code, 200)
+
+
+class SessionEngineTests(TestCase):
+    def _engine(self, mode):
+        with mock.patch.dict(os.environ, {"DJANGO_SESSION_ENGINE": mode}):
+            return runpy.run_module("cobrando_la.settings")["SESSION_ENGINE"]
+
+    def test_engines_resolve_to_batched_stores(self):
+        for mode in ("db", "cached_db"):
+            with self.subTest(mode=mode):
+                store = import_string(self._engine(mode) + ".SessionStore")
+                self.assertEqual(store.__module__, f"cobrando_la.sessions.{mode}")
+                self.assertIsNot(store.clear_expired.__func__, store.__mro__[1].clear_expired.__func__)
+
+    @override_settings(SESSION_CLEAR_BATCH_SIZE=3, SESSION_CLEAR_PAUSE=0)
+    def test_clearsessions_deletes_only_expired_in_batches(self):
+        now = timezone.now()
+        for engine in ("cobrando_la.sessions.db", "cobrando_la.sessions.cached_db"):
+            with self.subTest(engine=engine), override_settings(SESSION_ENGINE=engine):
+                Session.objects.all().delete()
+                Session.objects.bulk_create(
+                    [Session(session_key=f"old{i}", session_data="", expire_date=now - timedelta(days=1))
+                     for i in range(7)]
+                    + [Session(session_key=f"new{i}", session_data="", expire_date=now + timedelta(days=1))
+                       for i in range(2)]
+                )
+                with mock.patch.object(sessions.time, "sleep") as sleep:
+                    call_command("clearsessions")
+                self.assertEqual(
+                    sorted(Session.objects.values_list("session_key", flat=True)), ["new0", "new1"],
+                )
+                # 7 vencidas en lotes de 3: pausa tras los dos lotes llenos
+                self.assertEqual(sleep.call_count, 2)
@@ -1,8 +1,9 @@
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from bank_details.views import public_profile
+from bank_details.views import public_profile, public_profile_qr
 from home.views import index, about, contact, terms
+from cobrando_la.instrumentation import metrics_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -13,8 +14,15 @@ urlpatterns = [
     path("dashboard/", include("bank_details.urls")),
     path("terms/", terms, name="terms"),
     path("u/<slug:public_slug>/", public_profile, name="public_profile"), # Public profile configured with slug 
+    path("u/<slug:public_slug>/qr.svg", public_profile_qr, {"fmt": "svg"}, name="public_profile_qr_svg"),
+    path("u/<slug:public_slug>/qr.png", public_profile_qr, {"fmt": "png"}, name="public_profile_qr_png"),
 ]
 
+if settings.REQUEST_METRICS_ENDPOINT:
+    urlpatterns += [
+        path("metrics", metrics_view, name="metrics"),
+    ]
+
 if settings.DEBUG:
     # Include django_browser_reload URLs only in DEBUG mode
     urlpatterns += [
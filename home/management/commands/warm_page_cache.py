@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.utils import translation
+
+from accounts.models import User
+from cobrando_la.cache import is_shared
+from home import views
+from home.views import BODY_FRAGMENTS, body_fragment_keys, page_cache_key
+
+PAGES = {
+    "index": views.index,
+    "about": views.about,
+    "contact": views.contact,
+    "terms": views.terms,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra y vuelve a llenar el caché de las páginas de home/ (respuesta "
+        "completa para anónimos y fragmentos {% cache %}). Córrelo en cada deploy. "
+        "Sin caché compartido no hace nada: cada worker tiene el suyo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clear-only", action="store_true",
+                            help="Solo borra las entradas; se llenan con el primer request.")
+
+    def handle(self, *args, **opts):
+        if not is_shared("default"):
+            # Llenaría (y borraría) solo la memoria de este proceso, que termina
+            # al salir; los workers se llenan solos con su primer request
+            self.stderr.write(self.style.WARNING(
+                "El alias 'default' de CACHES no es compartido (DJANGO_CACHE_REDIS_URL): no hay nada que renovar."
+            ))
+            return
+        language = settings.LANGUAGE_CODE
+        with translation.override(language):
+            # Las llaves no cambian entre deploys: hay que borrar lo viejo
+            cache.delete_many([
+                key for page in BODY_FRAGMENTS
+                for key in (page_cache_key(page, language), *body_fragment_keys(page, language))
+            ])
+            if opts["clear_only"]:
+                self.stdout.write("Caché de páginas borrado.")
+                return
+
+            factory = RequestFactory()
+            # Usuario sin guardar: solo sirve para renderizar la variante con sesión
+            member = User(email="warm@cache.invalid", public_slug="warm-cache")
+            for page, view in PAGES.items():
+                for user in (AnonymousUser(), member):
+                    request = factory.get("/")
+                    request.user = user
+                    response = view(request)
+                    if response.status_code != 200:
+                        self.stderr.write(f"{page}: HTTP {response.status_code}")
+                self.stdout.write(f"{page}: ok")
+        self.stdout.write(self.style.SUCCESS("Caché de páginas listo."))
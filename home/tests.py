@@ -1,3 +1,41 @@
-from django.test import TestCase
+from io import StringIO
+from unittest import skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from .views import page_cache_key
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+
+class WarmPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_skips_without_shared_cache(self):
+        err = StringIO()
+        call_command("warm_page_cache", stdout=StringIO(), stderr=err)
+        self.assertIn("no es compartido", err.getvalue())
+        self.assertIsNone(cache.get(page_cache_key("about", settings.LANGUAGE_CODE)))
+
+    @skipUnless(fakeredis, "requiere fakeredis")
+    def test_warms_shared_cache(self):
+        shared = {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": "redis://fake:6379/0",
+            "OPTIONS": {"connection_class": fakeredis.FakeConnection, "server": fakeredis.FakeServer()},
+        }
+        caches = {**settings.CACHES, "default": {
+            **settings.CACHES["default"], "LOCATION": self.id(),
+            "OPTIONS": {**settings.CACHES["default"].get("OPTIONS", {}), "SHARED": shared},
+        }}
+        with override_settings(CACHES=caches):
+            call_command("warm_page_cache", stdout=StringIO(), stderr=StringIO())
+            self.assertIsNotNone(cache.get(page_cache_key("about", settings.LANGUAGE_CODE)))
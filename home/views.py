@@ -1,16 +1,77 @@
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.http import HttpResponse
 from django.shortcuts import render, redirect
+from django.utils.translation import get_language
+
+# Fragmento {% cache %} con el cuerpo estático de cada plantilla de home/
+BODY_FRAGMENTS = {
+    "index": "home_index_body",
+    "about": "home_about_body",
+    "contact": "home_contact_body",
+    "terms": "home_terms_body",
+}
+
+
+def page_cache_timeout() -> int:
+    return getattr(settings, "HOME_PAGE_CACHE_TIMEOUT", 60 * 60 * 24)
+
+
+def page_cache_key(page: str, language: str | None = None) -> str:
+    return f"home:page:{page}:{language or get_language()}"
+
+
+def body_fragment_keys(page: str, language: str | None = None) -> list[str]:
+    """Llaves del fragmento de `page` (una por estado de sesión)."""
+    language = language or get_language()
+    return [
+        make_template_fragment_key(BODY_FRAGMENTS[page], [language, authenticated])
+        for authenticated in (False, True)
+    ]
+
+
+def _context(**extra):
+    return {"home_cache_timeout": page_cache_timeout(), **extra}
+
+
+def anonymous_page_cache(page: str):
+    """
+    Sirve la respuesta completa desde caché a visitantes anónimos. La única
+    parte dinámica de estas páginas es el menú según la sesión, así que con
+    sesión iniciada se renderiza normal (y el cuerpo sale de {% cache %}).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD") or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+            key = page_cache_key(page)
+            content = cache.get(key)
+            if content is not None:
+                return HttpResponse(content)
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.content, page_cache_timeout())
+            return response
+        return wrapper
+    return decorator
+
 
 def index(request):
     # Render the home page with user context
-    return render(request, 'home/index.html', {
-        'user': request.user
-    })
+    return render(request, 'home/index.html', _context(user=request.user))
 
+@anonymous_page_cache("about")
 def about(request):
-    return render(request, 'home/about.html')
+    return render(request, 'home/about.html', _context())
 
+@anonymous_page_cache("contact")
 def contact(request):
-    return render(request, 'home/contact.html')
+    return render(request, 'home/contact.html', _context())
 
+@anonymous_page_cache("terms")
 def terms(request):
-    return render(request, 'home/terms.html')
\ No newline at end of file
+    return render(request, 'home/terms.html', _context())
@@ -1,6 +1,6 @@
 /**
  * Public Profile JavaScript
- * Handles QR code generation, clipboard operations, and UI interactions
+ * Handles the QR modal, clipboard operations, and UI interactions
  */
 
 // Toast system con Tailwind
@@ -63,11 +63,11 @@ async function copyPublicLink() {
   }
 }
 
-// QR Code Generator using QRCode.js
+// QR Code: la imagen la genera el servidor (/u/<slug>/qr.svg)
 let qrCodeInstance = null;
 
-function generateQR(text) {
-  if (!text) {
+function generateQR(src) {
+  if (!src) {
     return;
   }
 
@@ -76,26 +76,16 @@ function generateQR(text) {
   // Clear previous QR code
   container.innerHTML = '';
   
-  // Generate new QR code
-  try {
-    // Check if QRCode is available
-    if (typeof QRCode === 'undefined') {
-      container.innerHTML = '<p class="text-red-400 p-5">La librería QR no se cargó correctamente</p>';
-      return;
-    }
-
-    qrCodeInstance = new QRCode(container, {
-      text: text,
-      width: 256,
-      height: 256,
-      colorDark: '#000000',
-      colorLight: '#ffffff',
-      correctLevel: QRCode.CorrectLevel.M
-    });
-  } catch (error) {
-    console.error('Error generating QR:', error);
-    container.innerHTML = '<p class="text-red-400 p-5">Error al generar el código QR</p>';
-  }
+  const img = document.createElement('img');
+  img.src = src;
+  img.alt = 'Código QR del perfil público';
+  img.width = 256;
+  img.height = 256;
+  img.onerror = () => {
+    container.innerHTML = '<p class="text-red-400 p-5">Error al cargar el código QR</p>';
+  };
+  container.appendChild(img);
+  qrCodeInstance = img;
 }
 
 // Toggle QR modal con Tailwind
@@ -123,7 +113,7 @@ function toggleQR() {
     
     // Generate QR on first open or regenerate if needed
     if (!qrCodeInstance) {
-      generateQR(window.PUBLIC_URL);
+      generateQR(window.QR_URL);
     }
   }
 }